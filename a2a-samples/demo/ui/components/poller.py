@@ -15,8 +15,11 @@ def polling_buttons():
         )
     ):
         me.button_toggle(
-            value=[str(state.polling_interval)],
+            value=[
+                'live' if state.live_updates else str(state.polling_interval)
+            ],
             buttons=[
+                me.ButtonToggleButton(label='Live', value='live'),
                 me.ButtonToggleButton(label='1s', value='1'),
                 me.ButtonToggleButton(label='5s', value='5'),
                 me.ButtonToggleButton(label='30s', value='30'),
@@ -40,7 +43,8 @@ def polling_buttons():
 
 def on_change(e: me.ButtonToggleChangeEvent):
     state = me.state(AppState)
-    state.polling_interval = int(e.value)
+    state.live_updates = e.value == 'live'
+    state.polling_interval = 0 if state.live_updates else int(e.value)
 
 
 async def force_refresh(e: me.ClickEvent):
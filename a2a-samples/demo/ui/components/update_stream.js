@@ -0,0 +1,78 @@
+import {
+  LitElement,
+  html,
+} from 'https://cdn.jsdelivr.net/gh/lit/dist@3/core/lit-core.min.js';
+
+const UPDATE_KINDS = [
+  'reset',
+  'conversation',
+  'message',
+  'task',
+  'artifact',
+  'pending',
+];
+
+class UpdateStream extends LitElement {
+  static properties = {
+    updatesEvent: {type: String},
+    url: {type: String},
+    since: {type: Number},
+    conversationId: {type: String},
+    batchMillis: {type: Number},
+  };
+
+  render() {
+    return html`<div></div>`;
+  }
+
+  firstUpdated() {
+    this.pending = [];
+    this.lastSeq = this.since || 0;
+    // Resumes after `since`; the browser sends Last-Event-ID on reconnects
+    const url = this.since > 0 ? `${this.url}?since=${this.since}` : this.url;
+    this.source = new EventSource(url);
+    const onUpdate = (e) => this.queue(JSON.parse(e.data));
+    for (const kind of UPDATE_KINDS) {
+      this.source.addEventListener(kind, onUpdate);
+    }
+  }
+
+  updated(changed) {
+    // Messages are only kept for the open conversation, so switching to
+    // another one needs a full refresh
+    const previous = changed.get('conversationId');
+    if (previous !== undefined && previous !== this.conversationId) {
+      this.queue({seq: this.lastSeq, kind: 'reset', data: {}});
+    }
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    if (this.source) {
+      this.source.close();
+    }
+    clearTimeout(this.flushTimer);
+  }
+
+  queue(update) {
+    this.pending.push(update);
+    this.lastSeq = Math.max(this.lastSeq, update.seq);
+    // Updates arriving close together go to the server as one event
+    if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.batchMillis);
+    }
+  }
+
+  flush() {
+    this.flushTimer = null;
+    const updates = this.pending;
+    this.pending = [];
+    this.dispatchEvent(
+      new MesopEvent(this.updatesEvent, {
+        updates: updates,
+      }),
+    );
+  }
+}
+
+customElements.define('update-stream-component', UpdateStream);
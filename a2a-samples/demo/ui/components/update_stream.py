@@ -0,0 +1,40 @@
+from collections.abc import Callable
+from typing import Any
+
+import mesop.labs as mel
+
+
+@mel.web_component(path='./update_stream.js')
+def update_stream(  # noqa: PLR0913
+    *,
+    updates_event: Callable[[mel.WebEvent], Any],
+    since: int = 0,
+    conversation_id: str = '',
+    url: str = '/updates/stream',
+    batch_millis: int = 100,
+    key: str | None = None,
+):
+    """Creates an invisible component that listens to the update stream.
+
+    Updates from the server are sent to `updates_event` in batches.
+
+    The event value is `{'updates': [...]}`, each update a dict with its
+    `seq`, `kind` and `data`. Pass the last sequence number applied as
+    `since` so a reloaded page only receives what it missed.
+
+    Returns:
+      The web component that was created.
+    """
+    return mel.insert_web_component(
+        name='update-stream-component',
+        key=key,
+        events={
+            'updatesEvent': updates_event,
+        },
+        properties={
+            'url': url,
+            'since': since,
+            'conversationId': conversation_id,
+            'batchMillis': batch_millis,
+        },
+    )
@@ -182,6 +182,7 @@ async def lifespan(app: FastAPI):
     )
     app.setup()
     yield
+    await agent_server.aclose()
     await httpx_client_wrapper.stop()
 
 
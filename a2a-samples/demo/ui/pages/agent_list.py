@@ -9,7 +9,7 @@ from components.page_scaffold import page_frame, page_scaffold
 from state.agent_state import AgentState
 from state.host_agent_service import AddRemoteAgent, ListRemoteAgents
 from state.state import AppState
-from utils.agent_card import get_agent_card
+from utils.agent_card import get_agent_card_async
 
 
 def agent_list_page(app_state: AppState):
@@ -70,11 +70,11 @@ def set_agent_address(e: me.InputBlurEvent):
     state.agent_address = e.value
 
 
-def load_agent_info(e: me.ClickEvent):
+async def load_agent_info(e: me.ClickEvent):
     state = me.state(AgentState)
     try:
         state.error = None
-        agent_card_response = get_agent_card(state.agent_address)
+        agent_card_response = await get_agent_card_async(state.agent_address)
         state.agent_name = agent_card_response.name
         state.agent_description = agent_card_response.description
         state.agent_framework_type = (
@@ -7,6 +7,8 @@ import httpx
 from service.types import (
     AgentClientHTTPError,
     AgentClientJSONError,
+    AgentHealthRequest,
+    AgentHealthResponse,
     CreateConversationRequest,
     CreateConversationResponse,
     GetEventRequest,
@@ -24,6 +26,8 @@ from service.types import (
     PendingMessageResponse,
     RegisterAgentRequest,
     RegisterAgentResponse,
+    RegisterAgentsRequest,
+    RegisterAgentsResponse,
     SendMessageRequest,
     SendMessageResponse,
 )
@@ -87,5 +91,15 @@ class ConversationClient:
     ) -> RegisterAgentResponse:
         return RegisterAgentResponse(**await self._send_request(payload))
 
+    async def register_agents(
+        self, payload: RegisterAgentsRequest
+    ) -> RegisterAgentsResponse:
+        return RegisterAgentsResponse(**await self._send_request(payload))
+
+    async def get_agent_health(
+        self, payload: AgentHealthRequest
+    ) -> AgentHealthResponse:
+        return AgentHealthResponse(**await self._send_request(payload))
+
     async def list_agents(self, payload: ListAgentRequest) -> ListAgentResponse:
         return ListAgentResponse(**await self._send_request(payload))
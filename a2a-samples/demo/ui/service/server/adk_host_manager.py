@@ -1,4 +1,3 @@
-import asyncio
 import base64
 import datetime
 import json
@@ -35,9 +34,13 @@ from hosts.multiagent.host_agent import HostAgent
 from hosts.multiagent.remote_agent_connection import (
     TaskCallbackArg,
 )
-from utils.agent_card import get_agent_card
+from utils.agent_card import get_agent_card_async
 
-from service.server.application_manager import ApplicationManager
+from service.server.application_manager import (
+    ApplicationManager,
+    task_still_open,
+)
+from service.server.event_log import EventLog
 from service.types import Conversation, Event
 
 
@@ -54,17 +57,23 @@ class ADKHostManager(ApplicationManager):
         http_client: httpx.AsyncClient,
         api_key: str = '',
         uses_vertex_ai: bool = False,
+        event_log: EventLog | None = None,
     ):
-        self._conversations: list[Conversation] = []
+        # Keyed by id; dicts keep insertion order for the list views
+        self._conversations: dict[str, Conversation] = {}
         self._messages: list[Message] = []
-        self._tasks: list[Task] = []
-        self._events: dict[str, Event] = {}
+        self._tasks: dict[str, Task] = {}
+        # Ids of the messages in each task's history
+        self._task_message_ids: dict[str, set[str]] = {}
+        self._events = event_log if event_log is not None else EventLog()
         self._pending_message_ids: list[str] = []
-        self._agents: list[AgentCard] = []
+        # Keyed by the address each agent was registered with
+        self._agents: dict[str, AgentCard] = {}
         self._artifact_chunks: dict[str, list[Artifact]] = {}
         self._session_service = InMemorySessionService()
         self._artifact_service = InMemoryArtifactService()
         self._memory_service = InMemoryMemoryService()
+        self._http_client = http_client
         self._host_agent = HostAgent([], http_client, self.task_callback)
         self._context_to_conversation: dict[str, str] = {}
         self.user_id = 'test_user'
@@ -109,7 +118,8 @@ class ADKHostManager(ApplicationManager):
         )
         conversation_id = session.id
         c = Conversation(conversation_id=conversation_id, is_active=True)
-        self._conversations.append(c)
+        self._conversations[conversation_id] = c
+        self.notify('conversation', {'conversation': c})
         return c
 
     def update_api_key(self, api_key: str):
@@ -134,24 +144,25 @@ class ADKHostManager(ApplicationManager):
             # Check if the last event in the conversation was tied to a task.
             if conversation.messages:
                 task_id = conversation.messages[-1].taskId
-                if task_id and task_still_open(
-                    next(
-                        filter(lambda x: x and x.id == task_id, self._tasks),
-                        None,
-                    )
-                ):
+                if task_id and task_still_open(self._tasks.get(task_id)):
                     message.taskId = task_id
         return message
 
-    async def process_message(self, message: Message):
+    def mark_pending(self, message: Message):
         message_id = message.messageId
-        if message_id:
+        if message_id and message_id not in self._pending_message_ids:
             self._pending_message_ids.append(message_id)
+            self.notify_pending()
+
+    async def process_message(self, message: Message):
+        message_id = message.messageId
+        self.mark_pending(message)
         context_id = message.contextId
         conversation = self.get_conversation(context_id)
         self._messages.append(message)
         if conversation:
             conversation.messages.append(message)
+            self.notify('message', {'message': message})
         self.add_event(
             Event(
                 id=str(uuid.uuid4()),
@@ -218,16 +229,25 @@ class ADKHostManager(ApplicationManager):
 
         if conversation and response:
             conversation.messages.append(response)
+            self.notify('message', {'message': response})
         self._pending_message_ids.remove(message_id)
+        self.notify_pending()
 
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._tasks[task.id] = task
+        self._task_message_ids[task.id] = {
+            m.messageId for m in task.history or [] if m.messageId
+        }
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        current = self._tasks.get(task.id)
+        if current is None:
+            return
+        self._tasks[task.id] = task
+        if current is not task:
+            self._task_message_ids[task.id] = {
+                m.messageId for m in task.history or [] if m.messageId
+            }
 
     def task_callback(self, task: TaskCallbackArg, agent_card: AgentCard):
         self.emit_event(task, agent_card)
@@ -237,6 +257,7 @@ class ADKHostManager(ApplicationManager):
             self.attach_message_to_task(task.status.message, current_task.id)
             self.insert_message_history(current_task, task.status.message)
             self.update_task(current_task)
+            self.notify_task(current_task)
             return current_task
         if isinstance(task, TaskArtifactUpdateEvent):
             current_task = self.add_or_get_task(task)
@@ -244,14 +265,35 @@ class ADKHostManager(ApplicationManager):
             self.update_task(current_task)
             return current_task
         # Otherwise this is a Task, either new or updated
-        if not any(filter(lambda x: x and x.id == task.id, self._tasks)):
+        if task.id not in self._tasks:
             self.attach_message_to_task(task.status.message, task.id)
             self.add_task(task)
+            self.notify_task(task)
             return task
         self.attach_message_to_task(task.status.message, task.id)
         self.update_task(task)
+        self.notify_task(task)
         return task
 
+    def notify_task(self, task: Task):
+        self.notify('task', {'task': task})
+        # The progress text of pending messages follows their task's history
+        if self._pending_message_ids:
+            self.notify_pending()
+
+    def notify_artifact(self, task: Task, artifact: Artifact):
+        self.notify(
+            'artifact',
+            {
+                'task_id': task.id,
+                'context_id': task.contextId,
+                'artifact': artifact,
+            },
+        )
+
+    def notify_pending(self):
+        self.notify('pending', {'pending': self.get_pending_messages()})
+
     def emit_event(self, task: TaskCallbackArg, agent_card: AgentCard):
         content = None
         context_id = task.contextId
@@ -317,14 +359,20 @@ class ADKHostManager(ApplicationManager):
         message_id = message.messageId
         if not message_id:
             return
+        message_ids = self._task_message_ids.setdefault(task.id, set())
+        status_message = task.status.message
         if task.history and (
-            task.status.message
-            and task.status.message.messageId
-            not in [x.messageId for x in task.history]
+            status_message
+            and status_message.messageId
+            and status_message.messageId not in message_ids
         ):
-            task.history.append(task.status.message)
-        elif not task.history and task.status.message:
-            task.history = [task.status.message]
+            task.history.append(status_message)
+            message_ids.add(status_message.messageId)
+        elif not task.history and status_message:
+            task.history = [status_message]
+            message_ids.clear()
+            if status_message.messageId:
+                message_ids.add(status_message.messageId)
         else:
             print(
                 'Message id already in history',
@@ -342,9 +390,7 @@ class ADKHostManager(ApplicationManager):
             task_id = event.taskId
         if not task_id:
             task_id = str(uuid.uuid4())
-        current_task = next(
-            filter(lambda x: x.id == task_id, self._tasks), None
-        )
+        current_task = self._tasks.get(task_id)
         if not current_task:
             context_id = event.contextId
             current_task = Task(
@@ -374,6 +420,7 @@ class ADKHostManager(ApplicationManager):
                 if not current_task.artifacts:
                     current_task.artifacts = []
                 current_task.artifacts.append(artifact)
+                self.notify_artifact(current_task, artifact)
             else:
                 # this is a chunk of an artifact, stash it in temp store for assembling
                 if artifact.artifactId not in self._artifact_chunks:
@@ -392,31 +439,37 @@ class ADKHostManager(ApplicationManager):
                 else:
                     current_task.artifacts = [current_temp_artifact]
                 del self._artifact_chunks[artifact.artifactId][-1]
+                self.notify_artifact(current_task, current_temp_artifact)
 
     def add_event(self, event: Event):
-        self._events[event.id] = event
+        self._events.add(event)
 
     def get_conversation(
         self, conversation_id: str | None
     ) -> Conversation | None:
         if not conversation_id:
             return None
-        return next(
-            filter(
-                lambda c: c and c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._conversations.get(conversation_id)
+
+    def get_task(self, task_id: str) -> Task | None:
+        return self._tasks.get(task_id)
+
+    def list_events(
+        self,
+        since: int | None = None,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> tuple[list[Event], int, bool]:
+        # The cursor is the log's sequence number, which stays valid as old
+        # events are dropped
+        return self._events.page(since, limit, conversation_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
         rval = []
         for message_id in self._pending_message_ids:
             if message_id in self._task_map:
                 task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
+                task = self._tasks.get(task_id)
                 if not task:
                     rval.append((message_id, ''))
                 elif task.history and task.history[-1].parts:
@@ -436,30 +489,31 @@ class ADKHostManager(ApplicationManager):
                 rval.append((message_id, ''))
         return rval
 
-    def register_agent(self, url):
-        agent_data = get_agent_card(url)
+    async def register_agent(self, url: str) -> AgentCard:
+        agent_data = await get_agent_card_async(url, self._http_client)
         if not agent_data.url:
             agent_data.url = url
-        self._agents.append(agent_data)
+        self._agents[url] = agent_data
         self._host_agent.register_agent_card(agent_data)
         # Now update the host agent definition
         self._initialize_host()
+        return agent_data
 
     @property
     def agents(self) -> list[AgentCard]:
-        return self._agents
+        return list(self._agents.values())
 
     @property
     def conversations(self) -> list[Conversation]:
-        return self._conversations
+        return list(self._conversations.values())
 
     @property
     def tasks(self) -> list[Task]:
-        return self._tasks
+        return list(self._tasks.values())
 
     @property
     def events(self) -> list[Event]:
-        return sorted(self._events.values(), key=lambda x: x.timestamp)
+        return sorted(self._events.events(), key=lambda x: x.timestamp)
 
     def adk_content_from_message(self, message: Message) -> types.Content:
         parts: list[types.Part] = []
@@ -617,29 +671,8 @@ class ADKHostManager(ApplicationManager):
             )
         return parts
 
-    def process_message_threadsafe(
-        self, message: Message, loop: asyncio.AbstractEventLoop
-    ):
-        """Safely run process_message from a thread using the given event loop."""
-        future = asyncio.run_coroutine_threadsafe(
-            self.process_message(message), loop
-        )
-        return (
-            future  # You can call future.result() to get the result if needed
-        )
-
 
 def get_message_id(m: Message | None) -> str | None:
     if not m or not m.metadata or 'message_id' not in m.metadata:
         return None
     return m.metadata['message_id']
-
-
-def task_still_open(task: Task | None) -> bool:
-    if not task:
-        return False
-    return task.status.state in [
-        TaskState.submitted,
-        TaskState.working,
-        TaskState.input_required,
-    ]
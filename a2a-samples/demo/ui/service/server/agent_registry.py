@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import time
+
+from collections.abc import Iterable
+
+import httpx
+
+from a2a.types import AgentCard
+from utils.agent_card import get_agent_card_async
+
+from service.server.application_manager import ApplicationManager
+from service.types import AgentHealth
+
+
+class AgentRegistry:
+    """Registers agents with a manager and keeps checking they're reachable.
+
+    Agent cards are fetched concurrently, at most `max_concurrency` at a
+    time, each giving up after `timeout` seconds. Every `interval` seconds
+    (None to never check) the registered agents' cards are revalidated in the
+    background; an agent whose card changed is registered again.
+    """
+
+    def __init__(
+        self,
+        manager: ApplicationManager,
+        http_client: httpx.AsyncClient | None = None,
+        interval: float | None = 60,
+        timeout: float = 10,
+        max_concurrency: int = 16,
+    ):
+        self.manager = manager
+        self.http_client = http_client
+        self.interval = interval
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._health: dict[str, AgentHealth] = {}
+        self._cards: dict[str, AgentCard] = {}
+        self._task: asyncio.Task | None = None
+
+    async def register(self, url: str) -> AgentCard:
+        async with self._semaphore:
+            card = await asyncio.wait_for(
+                self.manager.register_agent(url), self.timeout
+            )
+        self._cards[url] = card
+        self._record(url, card)
+        self._start()
+        return card
+
+    async def register_all(
+        self, urls: Iterable[str]
+    ) -> dict[str, AgentCard | Exception]:
+        """Register many agents concurrently.
+
+        Returns the card, or the exception raised registering it, per url.
+        """
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(
+            *(self.register(url) for url in urls), return_exceptions=True
+        )
+        return dict(zip(urls, results, strict=True))
+
+    def status(self) -> list[AgentHealth]:
+        return list(self._health.values())
+
+    def _record(
+        self, url: str, card: AgentCard | None, error: str = ''
+    ) -> None:
+        previous = self._health.get(url)
+        self._health[url] = AgentHealth(
+            url=url,
+            name=card.name if card else previous.name if previous else '',
+            healthy=card is not None,
+            last_checked=time.time(),
+            error=error or None,
+        )
+
+    def _start(self) -> None:
+        if self.interval is None or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def check(self):
+        """Revalidate every registered agent's card once."""
+        await asyncio.gather(*(self._check(url) for url in list(self._cards)))
+
+    async def _check(self, url: str) -> None:
+        async with self._semaphore:
+            try:
+                # A conditional request, so an unchanged card is a cheap 304
+                card = await asyncio.wait_for(
+                    get_agent_card_async(
+                        url, self.http_client, force_refresh=True
+                    ),
+                    self.timeout,
+                )
+            except Exception as e:
+                self._record(url, None, str(e) or type(e).__name__)
+                return
+        if not card.url:
+            card.url = url
+        if card != self._cards.get(url):
+            try:
+                # Served from the card cache just refreshed
+                card = await self.manager.register_agent(url)
+            except Exception as e:
+                self._record(url, None, str(e) or type(e).__name__)
+                return
+            self._cards[url] = card
+        self._record(url, card)
+
+    async def aclose(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
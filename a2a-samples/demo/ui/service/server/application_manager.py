@@ -1,11 +1,88 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
 
-from a2a.types import AgentCard, Message, Task
+from a2a.types import AgentCard, Message, Task, TaskState
 
 from service.types import Conversation, Event
 
 
+# Called with the kind of change ('conversation', 'message', 'task',
+# 'artifact' or 'pending') and its data
+ChangeListener = Callable[[str, dict[str, Any]], None]
+
+
+class ChangeLog:
+    """Ids of the changed items of a collection, oldest change first.
+
+    Each change gets the next sequence number and moves its item to the end,
+    so there is one entry per item and reading the changes after a cursor
+    takes time proportional to the number of changes since.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+    def record(self, item_id: str):
+        self.seq += 1
+        self._entries[item_id] = self.seq
+        self._entries.move_to_end(item_id)
+
+    def since(
+        self, cursor: int, limit: int | None = None
+    ) -> tuple[list[str], int, bool]:
+        """Returns the ids changed after `cursor`, oldest change first.
+
+        At most `limit` ids are returned, with the cursor to continue from and
+        whether more changes remain.
+        """
+        changed = []
+        for item_id in reversed(self._entries):
+            if self._entries[item_id] <= cursor:
+                break
+            changed.append(item_id)
+        changed.reverse()
+        if limit is not None and len(changed) > max(1, limit):
+            changed = changed[: max(1, limit)]
+            return changed, self._entries[changed[-1]], True
+        return changed, self.seq, False
+
+
 class ApplicationManager(ABC):
+    _listeners: list[ChangeListener] | None = None
+    _change_logs: dict[str, ChangeLog] | None = None
+
+    def add_listener(self, listener: ChangeListener):
+        if self._listeners is None:
+            self._listeners = []
+        self._listeners.append(listener)
+
+    def change_log(self, collection: str) -> ChangeLog:
+        if self._change_logs is None:
+            self._change_logs = {}
+        if collection not in self._change_logs:
+            self._change_logs[collection] = ChangeLog()
+        return self._change_logs[collection]
+
+    def notify(self, kind: str, data: dict[str, Any]):
+        if kind == 'conversation':
+            self.change_log('conversations').record(
+                data['conversation'].conversation_id
+            )
+        elif kind == 'message' and data['message'].contextId:
+            self.change_log('conversations').record(data['message'].contextId)
+        elif kind == 'task':
+            self.change_log('tasks').record(data['task'].id)
+        elif kind == 'artifact':
+            self.change_log('tasks').record(data['task_id'])
+        for listener in self._listeners or ():
+            try:
+                listener(kind, data)
+            except Exception as e:
+                print('Change listener failed:', e)
+
     @abstractmethod
     def create_conversation(self) -> Conversation:
         pass
@@ -14,13 +91,23 @@ class ApplicationManager(ABC):
     def sanitize_message(self, message: Message) -> Message:
         pass
 
+    @abstractmethod
+    def mark_pending(self, message: Message):
+        """Show a message as pending from the moment it is accepted.
+
+        Called before the message is processed.
+        """
+
     @abstractmethod
     async def process_message(self, message: Message):
         pass
 
     @abstractmethod
-    def register_agent(self, url: str):
-        pass
+    async def register_agent(self, url: str) -> AgentCard:
+        """Fetch the agent's card and make the agent available.
+
+        Any earlier registration of the same url is replaced.
+        """
 
     @abstractmethod
     def get_pending_messages(self) -> list[tuple[str, str]]:
@@ -32,6 +119,74 @@ class ApplicationManager(ABC):
     ) -> Conversation | None:
         pass
 
+    @abstractmethod
+    def get_task(self, task_id: str) -> Task | None:
+        """Look up a task by id.
+
+        `list_tasks` calls this for every changed id, so it must not scan
+        `tasks`.
+        """
+
+    def list_conversations(
+        self, since: int | None = None, limit: int | None = None
+    ) -> tuple[list[Conversation], int, bool]:
+        """Conversations changed after the `since` cursor.
+
+        The most recently changed come last. All conversations are returned
+        if neither `since` nor `limit` is given.
+
+        Returns the conversations, the cursor for the next call and whether
+        more remain.
+        """
+        log = self.change_log('conversations')
+        if since is None and limit is None:
+            return self.conversations, log.seq, False
+        ids, cursor, has_more = log.since(since or 0, limit)
+        conversations = [self.get_conversation(i) for i in ids]
+        return [c for c in conversations if c], cursor, has_more
+
+    def list_tasks(
+        self, since: int | None = None, limit: int | None = None
+    ) -> tuple[list[Task], int, bool]:
+        """Tasks changed after the `since` cursor, or all of them."""
+        log = self.change_log('tasks')
+        if since is None and limit is None:
+            return self.tasks, log.seq, False
+        ids, cursor, has_more = log.since(since or 0, limit)
+        tasks = [self.get_task(i) for i in ids]
+        return [t for t in tasks if t], cursor, has_more
+
+    def list_messages(
+        self,
+        conversation_id: str,
+        since: int | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Message], int, bool]:
+        """Messages of a conversation, after the first `since` of them.
+
+        Conversations only grow, so the cursor is a message count.
+        """
+        conversation = self.get_conversation(conversation_id)
+        messages = conversation.messages if conversation else []
+        return _paginate(messages, since or 0, limit)
+
+    def list_events(
+        self,
+        since: int | None = None,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> tuple[list[Event], int, bool]:
+        """Events after the `since` cursor, optionally of one conversation.
+
+        By default the cursor is a count of events.
+        """
+        events = self.events
+        if conversation_id is not None:
+            events = [
+                e for e in events if e.content.contextId == conversation_id
+            ]
+        return _paginate(events, since or 0, limit)
+
     @property
     @abstractmethod
     def conversations(self) -> list[Conversation]:
@@ -51,3 +206,23 @@ class ApplicationManager(ABC):
     @abstractmethod
     def events(self) -> list[Event]:
         pass
+
+
+def _paginate(
+    items: list, start: int, limit: int | None
+) -> tuple[list, int, bool]:
+    # A cursor past the end comes back smaller, telling the client to resync
+    start = min(start, len(items))
+    end = len(items) if limit is None else start + max(1, limit)
+    page = items[start:end]
+    return page, start + len(page), end < len(items)
+
+
+def task_still_open(task: Task | None) -> bool:
+    if not task:
+        return False
+    return task.status.state in [
+        TaskState.submitted,
+        TaskState.working,
+        TaskState.input_required,
+    ]
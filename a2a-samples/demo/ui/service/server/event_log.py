@@ -0,0 +1,177 @@
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+from service.types import Event
+
+
+@dataclass
+class _Entry:
+    seq: int
+    event: Event
+    added_at: float
+
+    @property
+    def conversation_id(self) -> str:
+        return self.event.content.contextId or ''
+
+
+class EventLog:
+    """Events in the order they were added, capped in count and age.
+
+    Events are kept at most `max_events` at a time and for at most
+    `max_age` seconds (None for no limit). Each gets a sequence number to
+    page through them with, overall or per conversation.
+
+    With `path` set, events are also appended to that file as JSON lines and
+    reloaded from it on start. The file is rewritten with just the retained
+    events once it holds `compact_ratio` times as many lines.
+    """
+
+    def __init__(
+        self,
+        max_events: int = 10_000,
+        max_age: float | None = 24 * 60 * 60,
+        path: str | Path | None = None,
+        compact_ratio: float = 2.0,
+    ):
+        self.max_events = max(1, max_events)
+        self.max_age = max_age
+        self.path = Path(path) if path else None
+        self.compact_ratio = max(1.0, compact_ratio)
+        self._seq = 0
+        self._entries: deque[_Entry] = deque()
+        self._by_id: dict[str, _Entry] = {}
+        self._by_conversation: dict[str, deque[_Entry]] = {}
+        self._file: TextIO | None = None
+        self._file_lines = 0
+        if path:
+            self._load()
+            self._file = self._open_for_append()
+
+    def __len__(self) -> int:
+        """The number of events currently retained."""
+        return len(self._entries)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def add(self, event: Event):
+        """Add an event, or replace the one with the same id in place."""
+        self._add(event, time.time())
+        if self._file is not None:
+            self._file.write(event.model_dump_json(exclude_none=True) + '\n')
+            self._file.flush()
+            self._file_lines += 1
+            if self._file_lines > self.compact_ratio * max(
+                len(self._entries), 1
+            ):
+                self.compact()
+
+    def _open_for_append(self) -> TextIO:
+        # Kept open across calls and closed by `compact` or `close`
+        return self.path.open('a', encoding='utf-8')
+
+    def _add(self, event: Event, added_at: float) -> None:
+        entry = self._by_id.get(event.id)
+        if entry is not None:
+            entry.event = event
+            return
+        self._seq += 1
+        entry = _Entry(self._seq, event, added_at)
+        self._entries.append(entry)
+        self._by_id[event.id] = entry
+        self._by_conversation.setdefault(entry.conversation_id, deque()).append(
+            entry
+        )
+        self._trim(added_at)
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.max_age if self.max_age is not None else None
+        while self._entries and (
+            len(self._entries) > self.max_events
+            or (cutoff is not None and self._entries[0].added_at < cutoff)
+        ):
+            entry = self._entries.popleft()
+            del self._by_id[entry.event.id]
+            # Per-conversation entries are in the same order, so the oldest
+            # event overall is also the oldest of its conversation
+            conversation = self._by_conversation[entry.conversation_id]
+            conversation.popleft()
+            if not conversation:
+                del self._by_conversation[entry.conversation_id]
+
+    def events(self, conversation_id: str | None = None) -> list[Event]:
+        self._trim(time.time())
+        return [e.event for e in self._select(conversation_id)]
+
+    def _select(self, conversation_id: str | None) -> deque[_Entry]:
+        if conversation_id is None:
+            return self._entries
+        return self._by_conversation.get(conversation_id, deque())
+
+    def page(
+        self,
+        since: int | None = None,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> tuple[list[Event], int, bool]:
+        """Events added after the `since` cursor, oldest first.
+
+        Returns at most `limit` events, the cursor for the next call and
+        whether more remain. Events dropped by retention are skipped.
+        """
+        self._trim(time.time())
+        entries = self._select(conversation_id)
+        since = since or 0
+        # Find the first entry after the cursor, scanning from the newer end
+        # since clients usually ask for what was just added
+        start = len(entries)
+        while start > 0 and entries[start - 1].seq > since:
+            start -= 1
+        end = len(entries) if limit is None else start + max(1, limit)
+        page = [entries[i].event for i in range(start, min(end, len(entries)))]
+        has_more = end < len(entries)
+        cursor = entries[end - 1].seq if has_more else self._seq
+        return page, cursor, has_more
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding='utf-8') as f:
+            for line in f:
+                self._file_lines += 1
+                try:
+                    event = Event.model_validate_json(line)
+                except ValueError:
+                    # A partly written last line
+                    continue
+                # Age is counted from each event's own timestamp
+                self._add(event, event.timestamp)
+        self._trim(time.time())
+        if self._file_lines > len(self._entries):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with only the events currently retained."""
+        if not self.path:
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            for entry in self._entries:
+                f.write(entry.event.model_dump_json(exclude_none=True) + '\n')
+        if self._file is not None:
+            self._file.close()
+        tmp_path.replace(self.path)
+        self._file_lines = len(self._entries)
+        if self._file is not None:
+            self._file = self._open_for_append()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file: TextIO | None = None
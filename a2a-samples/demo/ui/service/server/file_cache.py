@@ -0,0 +1,116 @@
+import contextlib
+import threading
+import uuid
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class CachedFile:
+    """A cached file, held in memory or spilled to disk."""
+
+    id: str
+    mime_type: str
+    size: int
+    # Exactly one of these is set
+    data: bytes | None = None
+    path: Path | None = None
+
+    def read(self, start: int = 0, end: int | None = None) -> bytes:
+        """The bytes from `start` up to and including `end`."""
+        end = self.size - 1 if end is None else end
+        if self.data is not None:
+            return self.data[start : end + 1]
+        with self.path.open('rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+
+class FileCache:
+    """Decoded file parts served by the UI, least recently used evicted first.
+
+    Files are kept in memory up to `max_bytes` in total. With `spill_dir`
+    set, files of at least `spill_threshold` bytes are written there instead,
+    up to `max_disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        spill_dir: str | Path | None = None,
+        spill_threshold: int = 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_threshold = spill_threshold
+        self.max_disk_bytes = max_disk_bytes
+        self._files: OrderedDict[str, CachedFile] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        # Files are read from the request thread pool
+        self._lock = threading.Lock()
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def __contains__(self, file_id: str) -> bool:
+        """Whether a file is cached, without marking it as recently used."""
+        with self._lock:
+            return file_id in self._files
+
+    def put(self, file_id: str, data: bytes, mime_type: str) -> CachedFile:
+        file = CachedFile(id=file_id, mime_type=mime_type, size=len(data))
+        if self.spill_dir and file.size >= self.spill_threshold:
+            file.path = self.spill_dir / uuid.uuid4().hex
+            file.path.write_bytes(data)
+        else:
+            file.data = data
+        with self._lock:
+            self._remove(file_id)
+            self._files[file_id] = file
+            self._account(file, 1)
+            self._evict()
+        return file
+
+    def get(self, file_id: str) -> CachedFile | None:
+        with self._lock:
+            file = self._files.get(file_id)
+            if file is not None:
+                self._files.move_to_end(file_id)
+            return file
+
+    def _account(self, file: CachedFile, sign: int) -> None:
+        if file.path:
+            self._disk_bytes += sign * file.size
+        else:
+            self._memory_bytes += sign * file.size
+
+    def _remove(self, file_id: str) -> None:
+        file = self._files.pop(file_id, None)
+        if file is None:
+            return
+        self._account(file, -1)
+        if file.path:
+            # Readers that already opened it keep their handle
+            with contextlib.suppress(OSError):
+                file.path.unlink()
+
+    def _evict(self) -> None:
+        for file_id in list(self._files):
+            if (
+                self._memory_bytes <= self.max_bytes
+                and self._disk_bytes <= self.max_disk_bytes
+            ):
+                return
+            file = self._files[file_id]
+            if (file.path and self._disk_bytes > self.max_disk_bytes) or (
+                not file.path and self._memory_bytes > self.max_bytes
+            ):
+                self._remove(file_id)
+
+    def clear(self):
+        with self._lock:
+            for file_id in list(self._files):
+                self._remove(file_id)
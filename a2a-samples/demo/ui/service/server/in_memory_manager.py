@@ -2,6 +2,8 @@ import asyncio
 import datetime
 import uuid
 
+import httpx
+
 from a2a.types import (
     AgentCard,
     Artifact,
@@ -14,10 +16,13 @@ from a2a.types import (
     TaskStatus,
     TextPart,
 )
-from utils.agent_card import get_agent_card
+from utils.agent_card import get_agent_card_async
 
 from service.server import test_image
-from service.server.application_manager import ApplicationManager
+from service.server.application_manager import (
+    ApplicationManager,
+    task_still_open,
+)
 from service.types import Conversation, Event
 
 
@@ -29,60 +34,61 @@ class InMemoryFakeAgentManager(ApplicationManager):
     uses to send messages to the agent and provide information for the frontend.
     """
 
-    _conversations: list[Conversation]
+    _conversations: dict[str, Conversation]
     _messages: list[Message]
-    _tasks: list[Task]
+    _tasks: dict[str, Task]
     _events: list[Event]
     _pending_message_ids: list[str]
     _next_message_idx: int
-    _agents: list[AgentCard]
+    _agents: dict[str, AgentCard]
 
-    def __init__(self):
-        self._conversations = []
+    def __init__(self, http_client: httpx.AsyncClient | None = None):
+        self._http_client = http_client
+        # Keyed by id, in creation order
+        self._conversations = {}
         self._messages = []
-        self._tasks = []
+        self._tasks = {}
         self._events = []
         self._pending_message_ids = []
         self._next_message_idx = 0
-        self._agents = []
+        self._agents = {}
         self._task_map = {}
 
     def create_conversation(self) -> Conversation:
         conversation_id = str(uuid.uuid4())
         c = Conversation(conversation_id=conversation_id, is_active=True)
-        self._conversations.append(c)
+        self._conversations[conversation_id] = c
+        self.notify('conversation', {'conversation': c})
         return c
 
     def sanitize_message(self, message: Message) -> Message:
-        if message.contextId:
-            conversation = self.get_conversation(message.contextId)
+        conversation = self.get_conversation(message.contextId)
         if not conversation:
             return message
         # Check if the last event in the conversation was tied to a task.
         if conversation.messages:
-            if conversation.messages[-1].taskId and task_still_open(
-                next(
-                    filter(
-                        lambda x: x.id == conversation.messages[-1].taskId,
-                        self._tasks,
-                    ),
-                    None,
-                )
-            ):
-                message.taskId = conversation.messages[-1].taskId
+            task_id = conversation.messages[-1].taskId
+            if task_id and task_still_open(self._tasks.get(task_id)):
+                message.taskId = task_id
 
         return message
 
+    def mark_pending(self, message: Message):
+        message_id = message.messageId
+        if message_id and message_id not in self._pending_message_ids:
+            self._pending_message_ids.append(message_id)
+            self.notify('pending', {'pending': self.get_pending_messages()})
+
     async def process_message(self, message: Message):
         self._messages.append(message)
         message_id = message.messageId
         context_id = message.contextId or ''
         task_id = message.taskId or ''
-        if message_id:
-            self._pending_message_ids.append(message_id)
+        self.mark_pending(message)
         conversation = self.get_conversation(context_id)
         if conversation:
             conversation.messages.append(message)
+            self.notify('message', {'message': message})
         self._events.append(
             Event(
                 id=str(uuid.uuid4()),
@@ -103,12 +109,15 @@ class InMemoryFakeAgentManager(ApplicationManager):
             ),
             history=[message],
         )
-        if self._next_message_idx != 0:
+        task_added = self._next_message_idx != 0
+        if task_added:
             self.add_task(task)
+            self.notify('task', {'task': task})
         await asyncio.sleep(self._next_message_idx)
         response = self.next_message()
         if conversation:
             conversation.messages.append(response)
+            self.notify('message', {'message': response})
         self._events.append(
             Event(
                 id=str(uuid.uuid4()),
@@ -118,6 +127,7 @@ class InMemoryFakeAgentManager(ApplicationManager):
             )
         )
         self._pending_message_ids.remove(message_id)
+        self.notify('pending', {'pending': self.get_pending_messages()})
         # Now clean up the task
         if task:
             task.status.state = TaskState.completed
@@ -133,15 +143,15 @@ class InMemoryFakeAgentManager(ApplicationManager):
             else:
                 task.history.append(response)
             self.update_task(task)
+            if task_added:
+                self.notify('task', {'task': task})
 
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._tasks[task.id] = task
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        if task.id in self._tasks:
+            self._tasks[task.id] = task
 
     def add_event(self, event: Event):
         self._events.append(event)
@@ -158,22 +168,16 @@ class InMemoryFakeAgentManager(ApplicationManager):
     ) -> Conversation | None:
         if not conversation_id:
             return None
-        return next(
-            filter(
-                lambda c: c and c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._conversations.get(conversation_id)
+
+    def get_task(self, task_id: str) -> Task | None:
+        return self._tasks.get(task_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
         rval: list[tuple[str, str]] = []
         for message_id in self._pending_message_ids:
             if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
+                task = self._tasks.get(self._task_map[message_id])
                 if not task:
                     rval.append((message_id, ''))
                 elif task.history and task.history[-1].parts:
@@ -194,23 +198,24 @@ class InMemoryFakeAgentManager(ApplicationManager):
             return rval
         return [(x, '') for x in self._pending_message_ids]
 
-    def register_agent(self, url):
-        agent_data = get_agent_card(url)
+    async def register_agent(self, url: str) -> AgentCard:
+        agent_data = await get_agent_card_async(url, self._http_client)
         if not agent_data.url:
             agent_data.url = url
-        self._agents.append(agent_data)
+        self._agents[url] = agent_data
+        return agent_data
 
     @property
     def agents(self) -> list[AgentCard]:
-        return self._agents
+        return list(self._agents.values())
 
     @property
     def conversations(self) -> list[Conversation]:
-        return self._conversations
+        return list(self._conversations.values())
 
     @property
     def tasks(self) -> list[Task]:
-        return self._tasks
+        return list(self._tasks.values())
 
     @property
     def events(self) -> list[Event]:
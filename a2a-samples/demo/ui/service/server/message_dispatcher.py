@@ -0,0 +1,143 @@
+import asyncio
+import time
+import traceback
+
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from a2a.types import Message
+
+
+@dataclass
+class _QueuedMessage:
+    message: Message
+    enqueued_at: float
+
+
+class MessageDispatcher:
+    """Processes incoming messages on the server's event loop.
+
+    Messages wait in a bounded queue and are handled by `max_concurrency`
+    worker tasks. Messages of the same conversation are processed one at a
+    time, in the order they were submitted; different conversations are
+    served round-robin. `on_submit`, if given, is called with each message
+    as soon as it is accepted.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Message], Awaitable[Any]],
+        max_concurrency: int = 8,
+        max_pending: int = 256,
+        on_submit: Callable[[Message], Any] | None = None,
+    ):
+        self._handler = handler
+        self._on_submit = on_submit
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max_pending
+        # conversation id -> messages waiting for that conversation
+        self._queues: dict[str, deque[_QueuedMessage]] = {}
+        # Conversations with a message waiting and none in progress
+        self._ready: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._pending = 0
+        self._in_flight = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_wait = 0.0
+        self._total_wait = 0.0
+        self._total_processing = 0.0
+
+    def _start(self) -> None:
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.max_concurrency)
+        ]
+
+    def submit(self, message: Message) -> bool:
+        """Queue a message for processing.
+
+        Returns:
+            False, without queueing the message, if the queue is full.
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            return False
+        if self._ready is None:
+            self._start()
+        key = message.contextId or ''
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._ready.put_nowait(key)
+        queue.append(_QueuedMessage(message, time.monotonic()))
+        self._pending += 1
+        self._submitted += 1
+        if self._on_submit is not None:
+            self._on_submit(message)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            queue = self._queues[key]
+            item = queue.popleft()
+            self._pending -= 1
+            self._in_flight += 1
+            started = time.monotonic()
+            wait = started - item.enqueued_at
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            try:
+                await self._handler(item.message)
+                self._completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._failed += 1
+                print('Failed to process message', item.message.messageId)
+                traceback.print_exc()
+            finally:
+                self._in_flight -= 1
+                self._total_processing += time.monotonic() - started
+            # The conversation goes to the back of the line if it has more
+            # messages waiting, so one busy conversation can't starve others
+            if queue:
+                self._ready.put_nowait(key)
+            else:
+                del self._queues[key]
+
+    def metrics(self) -> dict[str, Any]:
+        finished = self._completed + self._failed
+        started = finished + self._in_flight
+        return {
+            'pending': self._pending,
+            'in_flight': self._in_flight,
+            'conversations': len(self._queues),
+            'max_concurrency': self.max_concurrency,
+            'max_pending': self.max_pending,
+            'submitted': self._submitted,
+            'rejected': self._rejected,
+            'completed': self._completed,
+            'failed': self._failed,
+            'avg_wait': self._total_wait / started if started else 0.0,
+            'max_wait': self._max_wait,
+            'avg_processing': (
+                self._total_processing / finished if finished else 0.0
+            ),
+        }
+
+    async def aclose(self):
+        """Stop the workers. Messages still queued are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues.clear()
+        self._pending = 0
+        self._ready = None
@@ -1,33 +1,48 @@
-import asyncio
 import base64
+import binascii
+import hashlib
+import hmac
+import json
 import os
-import threading
-import uuid
 
-from typing import cast
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from typing import Any
 
 import httpx
 
 from a2a.types import FilePart, FileWithUri, Message, Part
-from fastapi import FastAPI, Request, Response
+from common.utils.http_range import byte_range
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from service.server.adk_host_manager import ADKHostManager, get_message_id
+from service.server.agent_registry import AgentRegistry
+from service.server.application_manager import ApplicationManager
+from service.server.event_log import EventLog
+from service.server.file_cache import FileCache
+from service.server.in_memory_manager import InMemoryFakeAgentManager
+from service.server.message_dispatcher import MessageDispatcher
+from service.server.update_stream import UpdateBroadcaster
 from service.types import (
+    AgentHealthResponse,
     CreateConversationResponse,
     GetEventResponse,
+    JSONRPCError,
     ListAgentResponse,
     ListConversationResponse,
+    ListEventParams,
+    ListMessageParams,
     ListMessageResponse,
+    ListParams,
     ListTaskResponse,
     MessageInfo,
     PendingMessageResponse,
     RegisterAgentResponse,
+    RegisterAgentsResponse,
     SendMessageResponse,
 )
 
-from .adk_host_manager import ADKHostManager, get_message_id
-from .application_manager import ApplicationManager
-from .in_memory_manager import InMemoryFakeAgentManager
-
 
 class ConversationServer:
     """ConversationServer is the backend to serve the agent interactions in the UI
@@ -47,15 +62,48 @@ class ConversationServer:
         )
 
         if agent_manager.upper() == 'ADK':
+            self._event_log = EventLog(
+                max_events=int(os.environ.get('A2A_UI_MAX_EVENTS', '10000')),
+                max_age=float(os.environ.get('A2A_UI_EVENT_MAX_AGE', '86400')),
+                path=os.environ.get('A2A_UI_EVENT_LOG_PATH') or None,
+            )
             self.manager = ADKHostManager(
                 http_client,
                 api_key=api_key,
                 uses_vertex_ai=uses_vertex_ai,
+                event_log=self._event_log,
             )
         else:
-            self.manager = InMemoryFakeAgentManager()
-        self._file_cache = {}  # dict[str, FilePart] maps file id to message data
-        self._message_to_cache = {}  # dict[str, str] maps message id to cache id
+            self._event_log = None
+            self.manager = InMemoryFakeAgentManager(http_client)
+        self._file_cache = FileCache(
+            max_bytes=int(
+                os.environ.get('A2A_UI_FILE_CACHE_BYTES', '67108864')
+            ),
+            spill_dir=os.environ.get('A2A_UI_FILE_CACHE_DIR') or None,
+        )
+        # File ids are derived from the message part, so no map is needed to
+        # give a part the same id every time; the key keeps them unguessable
+        self._file_id_key = os.urandom(32)
+        self._dispatcher = MessageDispatcher(
+            self.manager.process_message,
+            max_concurrency=int(
+                os.environ.get('A2A_UI_MESSAGE_CONCURRENCY', '8')
+            ),
+            max_pending=int(
+                os.environ.get('A2A_UI_MAX_PENDING_MESSAGES', '256')
+            ),
+            on_submit=self.manager.mark_pending,
+        )
+        interval = os.environ.get('A2A_UI_AGENT_HEALTH_INTERVAL', '60')
+        self._agents = AgentRegistry(
+            self.manager,
+            http_client,
+            interval=float(interval) if float(interval) > 0 else None,
+            timeout=float(os.environ.get('A2A_UI_AGENT_TIMEOUT', '10')),
+        )
+        self._updates = UpdateBroadcaster()
+        self.manager.add_listener(self._publish_update)
 
         app.add_api_route(
             '/conversation/create', self._create_conversation, methods=['POST']
@@ -64,6 +112,9 @@ class ConversationServer:
             '/conversation/list', self._list_conversation, methods=['POST']
         )
         app.add_api_route('/message/send', self._send_message, methods=['POST'])
+        app.add_api_route(
+            '/message/queue', self._message_queue, methods=['POST']
+        )
         app.add_api_route('/events/get', self._get_events, methods=['POST'])
         app.add_api_route(
             '/message/list', self._list_messages, methods=['POST']
@@ -75,9 +126,16 @@ class ConversationServer:
         app.add_api_route(
             '/agent/register', self._register_agent, methods=['POST']
         )
+        app.add_api_route(
+            '/agent/register_many', self._register_agents, methods=['POST']
+        )
         app.add_api_route('/agent/list', self._list_agents, methods=['POST'])
+        app.add_api_route('/agent/health', self._agent_health, methods=['POST'])
+        app.add_api_route(
+            '/updates/stream', self._update_stream, methods=['GET']
+        )
         app.add_api_route(
-            '/message/file/{file_id}', self._files, methods=['GET']
+            '/message/file/{file_id}', self._files, methods=['GET', 'HEAD']
         )
         app.add_api_route(
             '/api_key/update', self._update_api_key, methods=['POST']
@@ -88,6 +146,13 @@ class ConversationServer:
         if isinstance(self.manager, ADKHostManager):
             self.manager.update_api_key(api_key)
 
+    async def aclose(self):
+        await self._dispatcher.aclose()
+        await self._agents.aclose()
+        self._file_cache.clear()
+        if self._event_log is not None:
+            self._event_log.close()
+
     async def _create_conversation(self):
         c = await self.manager.create_conversation()
         return CreateConversationResponse(result=c)
@@ -96,20 +161,17 @@ class ConversationServer:
         message_data = await request.json()
         message = Message(**message_data['params'])
         message = self.manager.sanitize_message(message)
-        loop = asyncio.get_event_loop()
-        if isinstance(self.manager, ADKHostManager):
-            t = threading.Thread(
-                target=lambda: cast(
-                    ADKHostManager, self.manager
-                ).process_message_threadsafe(message, loop)
+        if not self._dispatcher.submit(message):
+            return JSONResponse(
+                status_code=429,
+                headers={'Retry-After': '1'},
+                content=SendMessageResponse(
+                    id=message_data.get('id'),
+                    error=JSONRPCError(
+                        code=-32000, message='Too many pending messages'
+                    ),
+                ).model_dump(mode='json', exclude_none=True),
             )
-        else:
-            t = threading.Thread(
-                target=lambda: asyncio.run(
-                    self.manager.process_message(message)
-                )
-            )
-        t.start()
         return SendMessageResponse(
             result=MessageInfo(
                 message_id=message.messageId,
@@ -117,15 +179,29 @@ class ConversationServer:
             )
         )
 
+    async def _list_params(
+        self, request: Request, model: type[ListParams] = ListParams
+    ) -> ListParams:
+        body = await request.body()
+        params = json.loads(body).get('params') if body else None
+        return model(**params) if params else model()
+
     async def _list_messages(self, request: Request):
         message_data = await request.json()
-        conversation_id = message_data['params']
-        conversation = self.manager.get_conversation(conversation_id)
-        if conversation:
-            return ListMessageResponse(
-                result=self.cache_content(conversation.messages)
-            )
-        return ListMessageResponse(result=[])
+        params = message_data['params']
+        if isinstance(params, str):
+            params = ListMessageParams(conversation_id=params)
+        else:
+            params = ListMessageParams(**params)
+        messages, cursor, has_more = self.manager.list_messages(
+            params.conversation_id, params.since, params.limit
+        )
+        # Only the page returned has its file parts rewritten
+        return ListMessageResponse(
+            result=self.cache_content(messages),
+            cursor=cursor,
+            has_more=has_more,
+        )
 
     def cache_content(self, messages: list[Message]):
         rval = []
@@ -137,15 +213,24 @@ class ConversationServer:
             new_parts: list[Part] = []
             for i, p in enumerate(m.parts):
                 part = p.root
-                if part.kind != 'file':
+                if part.kind != 'file' or isinstance(part.file, FileWithUri):
                     new_parts.append(p)
                     continue
-                message_part_id = f'{message_id}:{i}'
-                if message_part_id in self._message_to_cache:
-                    cache_id = self._message_to_cache[message_part_id]
-                else:
-                    cache_id = str(uuid.uuid4())
-                    self._message_to_cache[message_part_id] = cache_id
+                cache_id = hmac.new(
+                    self._file_id_key,
+                    f'{message_id}:{i}'.encode(),
+                    hashlib.sha256,
+                ).hexdigest()[:32]
+                if cache_id not in self._file_cache:
+                    try:
+                        data = base64.b64decode(part.file.bytes, validate=True)
+                    except binascii.Error:
+                        data = part.file.bytes.encode()
+                    self._file_cache.put(
+                        cache_id,
+                        data,
+                        part.file.mimeType or 'application/octet-stream',
+                    )
                 # Replace the part data with a url reference
                 new_parts.append(
                     Part(
@@ -157,45 +242,152 @@ class ConversationServer:
                         )
                     )
                 )
-                if cache_id not in self._file_cache:
-                    self._file_cache[cache_id] = part
-            m.parts = new_parts
-            rval.append(m)
+            # The stored message keeps its inline bytes, so a file evicted
+            # from the cache is rebuilt the next time the message is listed
+            rval.append(m.model_copy(update={'parts': new_parts}))
         return rval
 
+    def _publish_update(self, kind: str, data: dict[str, Any]) -> None:
+        if kind == 'message':
+            # Same file part rewriting as /message/list
+            data = {'message': self.cache_content([data['message']])[0]}
+        self._updates.publish(kind, data)
+
+    async def _update_stream(self, request: Request) -> StreamingResponse:
+        """Server-sent events with the changes to the application state.
+
+        Changes to conversations, messages, tasks and pending messages are
+        sent. Each event's id is its sequence number; pass the last one seen
+        as `since` (or Last-Event-ID) to resume.
+        """
+        since = request.headers.get(
+            'last-event-id', request.query_params.get('since')
+        )
+
+        async def stream() -> AsyncIterator[str]:
+            async for update in self._updates.updates(
+                int(since) if since and since.isdigit() else None
+            ):
+                if update is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield (
+                    f'id: {update["seq"]}\n'
+                    f'event: {update["kind"]}\n'
+                    f'data: {json.dumps(update)}\n\n'
+                )
+
+        return StreamingResponse(
+            stream(),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
+    async def _message_queue(self) -> dict[str, Any]:
+        return self._dispatcher.metrics()
+
     async def _pending_messages(self):
         return PendingMessageResponse(
             result=self.manager.get_pending_messages()
         )
 
-    def _list_conversation(self):
-        return ListConversationResponse(result=self.manager.conversations)
+    async def _list_conversation(self, request: Request):
+        params = await self._list_params(request)
+        conversations, cursor, has_more = self.manager.list_conversations(
+            params.since, params.limit
+        )
+        return ListConversationResponse(
+            result=conversations, cursor=cursor, has_more=has_more
+        )
 
-    def _get_events(self):
-        return GetEventResponse(result=self.manager.events)
+    async def _get_events(self, request: Request):
+        params = await self._list_params(request, ListEventParams)
+        events, cursor, has_more = self.manager.list_events(
+            params.since, params.limit, params.conversation_id
+        )
+        return GetEventResponse(result=events, cursor=cursor, has_more=has_more)
 
-    def _list_tasks(self):
-        return ListTaskResponse(result=self.manager.tasks)
+    async def _list_tasks(self, request: Request):
+        params = await self._list_params(request)
+        tasks, cursor, has_more = self.manager.list_tasks(
+            params.since, params.limit
+        )
+        return ListTaskResponse(result=tasks, cursor=cursor, has_more=has_more)
 
     async def _register_agent(self, request: Request):
         message_data = await request.json()
         url = message_data['params']
-        self.manager.register_agent(url)
+        try:
+            await self._agents.register(url)
+        except Exception as e:
+            return RegisterAgentResponse(
+                id=message_data.get('id'),
+                error=JSONRPCError(
+                    code=-32000,
+                    message=f'Failed to register agent at {url}: {e!r}',
+                ),
+            )
         return RegisterAgentResponse()
 
+    async def _register_agents(
+        self, request: Request
+    ) -> RegisterAgentsResponse:
+        message_data = await request.json()
+        results = await self._agents.register_all(message_data['params'])
+        return RegisterAgentsResponse(
+            result={
+                url: repr(result) if isinstance(result, Exception) else None
+                for url, result in results.items()
+            }
+        )
+
+    async def _agent_health(self) -> AgentHealthResponse:
+        return AgentHealthResponse(result=self._agents.status())
+
     async def _list_agents(self):
         return ListAgentResponse(result=self.manager.agents)
 
-    def _files(self, file_id):
-        if file_id not in self._file_cache:
-            raise Exception('file not found')
-        part = self._file_cache[file_id]
-        if 'image' in part.file.mimeType:
+    def _files(self, file_id: str, request: Request):
+        file = self._file_cache.get(file_id)
+        if file is None:
+            raise HTTPException(status_code=404, detail='File not found')
+
+        etag = f'"{file.id}"'
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': etag,
+            # A file id always refers to the same message part
+            'Cache-Control': 'private, max-age=31536000, immutable',
+        }
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+
+        status_code, start, end = byte_range(
+            request.headers, file.size, etag, headers
+        )
+        if status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            return Response(status_code=status_code, headers=headers)
+
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(end - start + 1)
             return Response(
-                content=base64.b64decode(part.file.bytes),
-                media_type=part.file.mimeType,
+                status_code=status_code,
+                headers=headers,
+                media_type=file.mime_type,
             )
-        return Response(content=part.file.bytes, media_type=part.file.mimeType)
+        try:
+            content = file.read(start, end) if file.size else b''
+        except OSError:
+            # Evicted from disk since it was looked up
+            raise HTTPException(
+                status_code=404, detail='File not found'
+            ) from None
+        return Response(
+            content=content,
+            status_code=status_code,
+            headers=headers,
+            media_type=file.mime_type,
+        )
 
     async def _update_api_key(self, request: Request):
         """Update the API key"""
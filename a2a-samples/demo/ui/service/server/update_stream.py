@@ -0,0 +1,82 @@
+import asyncio
+
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+
+class UpdateBroadcaster:
+    """Fans out changes to the application state as numbered updates.
+
+    Every update gets the next sequence number. Recent updates are kept so
+    a client reconnecting with the last number it saw receives only what it
+    missed; a client too far behind (or without a number) receives a 'reset'
+    update instead, telling it to fetch the full state once.
+
+    Updates must be published from the event loop's thread.
+    """
+
+    def __init__(self, history: int = 1000, max_queued: int = 1000):
+        self.max_queued = max_queued
+        self._seq = 0
+        self._history: deque[dict[str, Any]] = deque(maxlen=history)
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def _reset(self) -> dict[str, Any]:
+        return {'seq': self._seq, 'kind': 'reset', 'data': {}}
+
+    def publish(self, kind: str, data: dict[str, Any]):
+        self._seq += 1
+        update = {
+            'seq': self._seq,
+            'kind': kind,
+            # Serialize now, the objects may be changed after this returns
+            'data': to_jsonable_python(data, exclude_none=True),
+        }
+        self._history.append(update)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(update)
+            except asyncio.QueueFull:
+                # The client isn't keeping up, have it start over instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._reset())
+
+    def _can_replay(self, since: int) -> bool:
+        if since > self._seq:
+            # From before a server restart
+            return False
+        if not self._history:
+            return since == self._seq
+        return since >= self._history[0]['seq'] - 1
+
+    async def updates(
+        self, since: int | None = None, keepalive: float = 15
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """Updates after `since`, then new ones as they are published.
+
+        Yields None after `keepalive` seconds without an update.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued)
+        self._subscribers.add(queue)
+        try:
+            if since is None or not self._can_replay(since):
+                yield self._reset()
+            else:
+                for update in list(self._history):
+                    if update['seq'] > since:
+                        yield update
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), keepalive)
+                except TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(queue)
@@ -46,6 +46,35 @@ class Event(BaseModel):
     timestamp: float
 
 
+class ListParams(BaseModel):
+    """Paging parameters of the list methods."""
+
+    # Cursor returned by the previous call; only changes after it are listed
+    since: int | None = None
+    limit: int | None = None
+
+
+class ListResponse(JSONRPCResponse):
+    """A page of a list method's results."""
+
+    # Pass as `since` in the next call to get only what changed after this one
+    cursor: int | None = None
+    has_more: bool = False
+
+
+class ListMessageParams(ListParams):
+    """Paging parameters of `message/list`."""
+
+    conversation_id: str
+
+
+class ListEventParams(ListParams):
+    """Paging parameters of `events/get`."""
+
+    # Only the events of this conversation
+    conversation_id: str | None = None
+
+
 class SendMessageRequest(JSONRPCRequest):
     method: Literal['message/send'] = 'message/send'
     params: Message
@@ -53,11 +82,11 @@ class SendMessageRequest(JSONRPCRequest):
 
 class ListMessageRequest(JSONRPCRequest):
     method: Literal['message/list'] = 'message/list'
-    # This is the conversation id
-    params: str
+    # The conversation id, or the conversation id with a cursor
+    params: str | ListMessageParams
 
 
-class ListMessageResponse(JSONRPCResponse):
+class ListMessageResponse(ListResponse):
     result: list[Message] | None = None
 
 
@@ -72,17 +101,19 @@ class SendMessageResponse(JSONRPCResponse):
 
 class GetEventRequest(JSONRPCRequest):
     method: Literal['events/get'] = 'events/get'
+    params: ListEventParams | None = None
 
 
-class GetEventResponse(JSONRPCResponse):
+class GetEventResponse(ListResponse):
     result: list[Event] | None = None
 
 
 class ListConversationRequest(JSONRPCRequest):
     method: Literal['conversation/list'] = 'conversation/list'
+    params: ListParams | None = None
 
 
-class ListConversationResponse(JSONRPCResponse):
+class ListConversationResponse(ListResponse):
     result: list[Conversation] | None = None
 
 
@@ -104,9 +135,10 @@ class CreateConversationResponse(JSONRPCResponse):
 
 class ListTaskRequest(JSONRPCRequest):
     method: Literal['task/list'] = 'task/list'
+    params: ListParams | None = None
 
 
-class ListTaskResponse(JSONRPCResponse):
+class ListTaskResponse(ListResponse):
     result: list[Task] | None = None
 
 
@@ -120,6 +152,43 @@ class RegisterAgentResponse(JSONRPCResponse):
     result: str | None = None
 
 
+class RegisterAgentsRequest(JSONRPCRequest):
+    """Registers several agents at once."""
+
+    method: Literal['agent/register_many'] = 'agent/register_many'
+    # Base urls of the agent cards, fetched concurrently
+    params: list[str] = Field(default_factory=list)
+
+
+class RegisterAgentsResponse(JSONRPCResponse):
+    """Result of `agent/register_many`."""
+
+    # The error registering each url, None where it succeeded
+    result: dict[str, str | None] | None = None
+
+
+class AgentHealth(BaseModel):
+    """Result of the latest check of an agent's card."""
+
+    url: str
+    name: str = ''
+    healthy: bool
+    last_checked: float
+    error: str | None = None
+
+
+class AgentHealthRequest(JSONRPCRequest):
+    """Lists the health of the registered agents."""
+
+    method: Literal['agent/health'] = 'agent/health'
+
+
+class AgentHealthResponse(JSONRPCResponse):
+    """Result of `agent/health`."""
+
+    result: list[AgentHealth] | None = None
+
+
 class ListAgentRequest(JSONRPCRequest):
     method: Literal['agent/list'] = 'agent/list'
 
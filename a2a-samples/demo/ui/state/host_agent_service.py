@@ -6,7 +6,15 @@ import uuid
 
 from typing import Any
 
-from a2a.types import FileWithBytes, Message, Part, Role, Task, TaskState
+from a2a.types import (
+    Artifact,
+    FileWithBytes,
+    Message,
+    Part,
+    Role,
+    Task,
+    TaskState,
+)
 from service.client.client import ConversationClient
 from service.types import (
     Conversation,
@@ -15,7 +23,9 @@ from service.types import (
     GetEventRequest,
     ListAgentRequest,
     ListConversationRequest,
+    ListMessageParams,
     ListMessageRequest,
+    ListParams,
     ListTaskRequest,
     MessageInfo,
     PendingMessageRequest,
@@ -83,7 +93,11 @@ async def ListRemoteAgents():
 async def AddRemoteAgent(path: str):
     client = ConversationClient(server_url)
     try:
-        await client.register_agent(RegisterAgentRequest(params=path))
+        response = await client.register_agent(
+            RegisterAgentRequest(params=path)
+        )
+        if response.error:
+            print('Failed to register the agent', response.error.message)
     except Exception as e:
         print('Failed to register the agent', e)
 
@@ -132,32 +146,61 @@ async def ListMessages(conversation_id: str) -> list[Message]:
     return []
 
 
-async def UpdateAppState(state: AppState, conversation_id: str):
-    """Update the app state."""
+async def UpdateAppState(
+    state: AppState, conversation_id: str, full: bool = False
+):
+    """Update the app state.
+
+    Only the messages, conversations and tasks that changed since the last
+    update are fetched, using the cursors kept in the state, unless `full`
+    is set.
+    """
+    client = ConversationClient(server_url)
     try:
         if conversation_id:
-            state.current_conversation_id = conversation_id
-            messages = await ListMessages(conversation_id)
-            if not messages:
+            if full or conversation_id != state.messages_conversation_id:
                 state.messages = []
-            else:
-                state.messages = [convert_message_to_state(x) for x in messages]
-        conversations = await ListConversations()
-        if not conversations:
-            state.conversations = []
-        else:
-            state.conversations = [
-                convert_conversation_to_state(x) for x in conversations
-            ]
-
-        state.task_list = []
-        for task in await GetTasks():
-            state.task_list.append(
-                SessionTask(
-                    context_id=extract_conversation_id(task),
-                    task=convert_task_to_state(task),
+                state.messages_cursor = 0
+                state.messages_conversation_id = conversation_id
+            state.current_conversation_id = conversation_id
+            response = await client.list_messages(
+                ListMessageRequest(
+                    params=ListMessageParams(
+                        conversation_id=conversation_id,
+                        since=state.messages_cursor,
+                    )
                 )
             )
+            if _cursor_reset(state.messages_cursor, response.cursor):
+                return await UpdateAppState(state, conversation_id, full=True)
+            for message in response.result or []:
+                add_message(state, convert_message_to_state(message))
+            state.messages_cursor = response.cursor or 0
+
+        since = None if full else state.conversations_cursor or None
+        response = await client.list_conversation(
+            ListConversationRequest(params=ListParams(since=since))
+        )
+        if _cursor_reset(since, response.cursor):
+            return await UpdateAppState(state, conversation_id, full=True)
+        if since is None:
+            state.conversations = []
+        for conversation in response.result or []:
+            upsert_conversation(state, conversation)
+        state.conversations_cursor = response.cursor or 0
+
+        since = None if full else state.tasks_cursor or None
+        response = await client.list_tasks(
+            ListTaskRequest(params=ListParams(since=since))
+        )
+        if _cursor_reset(since, response.cursor):
+            return await UpdateAppState(state, conversation_id, full=True)
+        if since is None:
+            state.task_list = []
+        for task in response.result or []:
+            upsert_task(state, task)
+        state.tasks_cursor = response.cursor or 0
+
         state.background_tasks = await GetProcessingMessages()
         state.message_aliases = GetMessageAliases()
     except Exception as e:
@@ -165,6 +208,93 @@ async def UpdateAppState(state: AppState, conversation_id: str):
         traceback.print_exc(file=sys.stdout)
 
 
+def _cursor_reset(since: int | None, cursor: int | None) -> bool:
+    # A cursor going backwards means the server restarted
+    return bool(since) and (cursor is None or cursor < since)
+
+
+def upsert_conversation(state: AppState, conversation: Conversation):
+    """Add a conversation to the state, or replace it if already listed."""
+    state_conversation = convert_conversation_to_state(conversation)
+    for i, c in enumerate(state.conversations):
+        if c.conversation_id == state_conversation.conversation_id:
+            state.conversations[i] = state_conversation
+            return
+    state.conversations.append(state_conversation)
+
+
+def upsert_task(state: AppState, task: Task):
+    """Add a task to the state, or replace it if already listed."""
+    session_task = SessionTask(
+        context_id=extract_conversation_id(task),
+        task=convert_task_to_state(task),
+    )
+    for i, t in enumerate(state.task_list):
+        if t.task.task_id == task.id:
+            state.task_list[i] = session_task
+            return
+    state.task_list.append(session_task)
+
+
+def add_message(state: AppState, message: StateMessage):
+    """Show a message in the current conversation unless already shown."""
+    # Messages sent from this page are already shown
+    if not any(m.message_id == message.message_id for m in state.messages):
+        state.messages.append(message)
+
+
+async def ApplyUpdates(  # noqa: N802
+    state: AppState, updates: list[dict[str, Any]]
+):
+    """Apply a batch of updates from the server's update stream.
+
+    A 'reset' update replaces the state with a full refresh; the others
+    change just the conversation, message, task or pending messages they
+    carry, and can safely be applied more than once.
+    """
+    resets = [i for i, u in enumerate(updates) if u['kind'] == 'reset']
+    if resets:
+        reset = updates[resets[-1]]
+        await UpdateAppState(state, state.current_conversation_id, full=True)
+        state.last_update_seq = reset['seq']
+        updates = updates[resets[-1] + 1 :]
+    for update in updates:
+        if update['seq'] <= state.last_update_seq:
+            continue
+        try:
+            apply_update(state, update['kind'], update['data'])
+        except Exception as e:
+            print('Failed to apply update', update['seq'], e)
+        state.last_update_seq = update['seq']
+
+
+def apply_update(state: AppState, kind: str, data: dict[str, Any]):
+    """Apply a single change of the given kind to the state."""
+    if kind == 'conversation':
+        upsert_conversation(state, Conversation(**data['conversation']))
+    elif kind == 'message':
+        message = convert_message_to_state(Message(**data['message']))
+        for c in state.conversations:
+            if c.conversation_id == message.context_id:
+                if message.message_id not in c.message_ids:
+                    c.message_ids.append(message.message_id)
+                break
+        if message.context_id == state.current_conversation_id:
+            add_message(state, message)
+    elif kind == 'task':
+        upsert_task(state, Task(**data['task']))
+    elif kind == 'artifact':
+        artifact = Artifact(**data['artifact'])
+        for t in state.task_list:
+            if t.task.task_id == data['task_id']:
+                content = extract_content(artifact.parts)
+                if content not in t.task.artifacts:
+                    t.task.artifacts.append(content)
+                return
+    elif kind == 'pending':
+        state.background_tasks = dict(data['pending'])
+
+
 async def UpdateApiKey(api_key: str):
     """Update the API key"""
     import httpx
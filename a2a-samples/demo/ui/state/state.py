@@ -88,7 +88,16 @@ class AppState:
     )
     # This is used to track the message sent to agent with form data
     form_responses: dict[str, str] = dataclasses.field(default_factory=dict)
-    polling_interval: int = 1
+    # Follow the server's update stream instead of polling
+    live_updates: bool = True
+    # Sequence number of the last update applied from the stream
+    last_update_seq: int = 0
+    # Cursors of the last incremental refresh, see UpdateAppState
+    messages_conversation_id: str = ''
+    messages_cursor: int = 0
+    conversations_cursor: int = 0
+    tasks_cursor: int = 0
+    polling_interval: int = 0
 
     # Added for API key management
     api_key: str = ''
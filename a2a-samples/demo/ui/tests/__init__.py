@@ -0,0 +1,8 @@
+import sys
+
+from pathlib import Path
+
+
+# The demo imports `common` and `hosts` from the samples, which main.py puts
+# on the path at startup; do the same when running the tests
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'samples' / 'python'))
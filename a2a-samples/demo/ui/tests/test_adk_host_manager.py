@@ -1,8 +1,26 @@
+import json
 import unittest
 
-from a2a.types import DataPart, FilePart, TextPart
+from types import SimpleNamespace
+
+import httpx
+
+from a2a.types import (
+    DataPart,
+    FilePart,
+    Message,
+    Part,
+    Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
 from google.genai import types
 from service.server.adk_host_manager import ADKHostManager
+from service.server.event_log import EventLog
+from service.types import Event
+from utils.agent_card import clear_agent_card_cache
 
 
 class ADKHostManagerTest(unittest.TestCase):
@@ -155,5 +173,216 @@ class ADKHostManagerTest(unittest.TestCase):
         )
 
 
+class ADKHostManagerStateTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for the bookkeeping ADKHostManager keeps for the UI.
+
+    The manager's host agent needs a running event loop, so managers are
+    built in async setup and tests.
+    """
+
+    async def asyncSetUp(self) -> None:  # noqa: N802
+        self.http_client = httpx.AsyncClient()
+        self.manager = ADKHostManager(self.http_client)
+        self.changes: list[tuple[str, dict]] = []
+        self.manager.add_listener(
+            lambda kind, data: self.changes.append((kind, data))
+        )
+
+    async def asyncTearDown(self) -> None:  # noqa: N802
+        await self.http_client.aclose()
+
+    def make_message(self, message_id: str, text: str = "hi") -> Message:
+        return Message(
+            messageId=message_id,
+            contextId="test_conversation",
+            role="user",
+            parts=[Part(root=TextPart(text=text))],
+        )
+
+    def test_mark_pending_is_idempotent(self) -> None:
+        """A message is listed as pending once, however often it is marked."""
+        message = self.make_message("m1")
+        self.manager.mark_pending(message)
+        self.manager.mark_pending(message)
+        self.assertEqual(self.manager.get_pending_messages(), [("m1", "")])
+        self.assertEqual([kind for kind, _ in self.changes], ["pending"])
+
+    def make_task(self, task_id: str, message: Message) -> Task:
+        return Task(
+            id=task_id,
+            contextId="test_conversation",
+            status=TaskStatus(state=TaskState.working, message=message),
+            history=[message],
+        )
+
+    def status_update(
+        self, task_id: str, message: Message
+    ) -> TaskStatusUpdateEvent:
+        return TaskStatusUpdateEvent(
+            taskId=task_id,
+            contextId="test_conversation",
+            status=TaskStatus(state=TaskState.working, message=message),
+            final=False,
+        )
+
+    async def test_conversations_are_looked_up_by_id(self) -> None:
+        """Conversations are kept by id, in creation order."""
+        first = await self.manager.create_conversation()
+        second = await self.manager.create_conversation()
+        self.assertIs(
+            self.manager.get_conversation(second.conversation_id), second
+        )
+        self.assertIsNone(self.manager.get_conversation("missing"))
+        self.assertIsNone(self.manager.get_conversation(None))
+        self.assertEqual(self.manager.conversations, [first, second])
+
+    def test_task_updates_add_each_message_to_history_once(self) -> None:
+        """Status updates find their task by id and dedupe history by id."""
+        agent = SimpleNamespace(name="agent")
+        self.manager.task_callback(
+            self.make_task("t1", self.make_message("m1")), agent
+        )
+        update = self.status_update("t1", self.make_message("m2", "working"))
+        self.manager.task_callback(update, agent)
+        self.manager.task_callback(update, agent)
+        task = self.manager.get_task("t1")
+        self.assertEqual([m.messageId for m in task.history], ["m1", "m2"])
+        self.assertEqual(self.manager.tasks, [task])
+        self.assertIsNone(self.manager.get_task("missing"))
+
+    def test_replaced_task_reindexes_its_history(self) -> None:
+        """A task object replacing the stored one brings its own history."""
+        agent = SimpleNamespace(name="agent")
+        self.manager.task_callback(
+            self.make_task("t1", self.make_message("m1")), agent
+        )
+        self.manager.task_callback(
+            self.make_task("t1", self.make_message("m3")), agent
+        )
+        self.manager.task_callback(
+            self.status_update("t1", self.make_message("m1")), agent
+        )
+        task = self.manager.get_task("t1")
+        self.assertEqual([m.messageId for m in task.history], ["m3", "m1"])
+
+    async def test_changes_are_pushed_to_listeners(self) -> None:
+        """Listeners hear about conversations, tasks and pending messages."""
+        agent = SimpleNamespace(name="agent")
+        conversation = await self.manager.create_conversation()
+        self.manager.mark_pending(self.make_message("m1"))
+        self.manager.task_callback(
+            self.make_task("t1", self.make_message("m2")), agent
+        )
+        kinds = [kind for kind, _ in self.changes]
+        self.assertEqual(kinds, ["conversation", "pending", "task", "pending"])
+        self.assertIs(self.changes[0][1]["conversation"], conversation)
+        self.assertEqual(self.changes[2][1]["task"].id, "t1")
+
+    async def test_list_conversations_returns_changes_since_a_cursor(
+        self,
+    ) -> None:
+        """Conversation listings page through changes by cursor."""
+        first = await self.manager.create_conversation()
+        second = await self.manager.create_conversation()
+        page, cursor, has_more = self.manager.list_conversations(
+            since=0, limit=1
+        )
+        self.assertEqual((page, has_more), ([first], True))
+        page, cursor, has_more = self.manager.list_conversations(since=cursor)
+        self.assertEqual((page, has_more), ([second], False))
+        self.assertEqual(self.manager.list_conversations(since=cursor)[0], [])
+        # A new message moves its conversation back into the changes
+        message = self.make_message("m1").model_copy(
+            update={"contextId": first.conversation_id}
+        )
+        first.messages.append(message)
+        self.manager.notify("message", {"message": message})
+        self.assertEqual(
+            self.manager.list_conversations(since=cursor)[0], [first]
+        )
+
+    async def test_list_tasks_and_messages_page_by_cursor(self) -> None:
+        """Tasks page by change cursor and messages by position."""
+        agent = SimpleNamespace(name="agent")
+        for task_id in ("t1", "t2"):
+            self.manager.task_callback(
+                self.make_task(task_id, self.make_message(f"{task_id}-m")),
+                agent,
+            )
+        tasks, cursor, _ = self.manager.list_tasks(since=0)
+        self.assertEqual([t.id for t in tasks], ["t1", "t2"])
+        self.assertEqual(self.manager.list_tasks(since=cursor)[0], [])
+
+        conversation = await self.manager.create_conversation()
+        conversation.messages.extend(
+            self.make_message(f"m{i}") for i in range(3)
+        )
+        messages, cursor, has_more = self.manager.list_messages(
+            conversation.conversation_id, limit=2
+        )
+        self.assertEqual([m.messageId for m in messages], ["m0", "m1"])
+        self.assertEqual((cursor, has_more), (2, True))
+        messages, cursor, has_more = self.manager.list_messages(
+            conversation.conversation_id, since=cursor
+        )
+        self.assertEqual([m.messageId for m in messages], ["m2"])
+        self.assertEqual((cursor, has_more), (3, False))
+
+    async def test_list_events_pages_through_the_retained_log(self) -> None:
+        """Events are paged by log sequence and capped by the event log."""
+        manager = ADKHostManager(
+            httpx.AsyncClient(), event_log=EventLog(max_events=3)
+        )
+        for i in range(5):
+            manager.add_event(
+                Event(
+                    id=f"e{i}",
+                    actor="user",
+                    content=self.make_message(f"m{i}"),
+                    timestamp=float(i),
+                )
+            )
+        self.assertEqual([e.id for e in manager.events], ["e2", "e3", "e4"])
+        events, cursor, has_more = manager.list_events(since=0, limit=2)
+        self.assertEqual([e.id for e in events], ["e2", "e3"])
+        self.assertEqual((cursor, has_more), (4, True))
+        events, cursor, has_more = manager.list_events(
+            since=cursor, conversation_id="test_conversation"
+        )
+        self.assertEqual([e.id for e in events], ["e4"])
+        self.assertEqual((cursor, has_more), (5, False))
+
+    async def test_register_agent_uses_the_shared_client(self) -> None:
+        """Agent cards are fetched with the manager's shared client."""
+        clear_agent_card_cache()
+        names = iter(["Agent", "Agent v2"])
+        requested: list[str] = []
+
+        def serve_card(request: httpx.Request) -> httpx.Response:
+            requested.append(str(request.url))
+            card = {
+                "name": next(names),
+                "description": "test agent",
+                "url": "http://agent",
+                "version": "1.0.0",
+                "capabilities": {},
+                "defaultInputModes": ["text"],
+                "defaultOutputModes": ["text"],
+                "skills": [],
+            }
+            return httpx.Response(200, content=json.dumps(card))
+
+        manager = ADKHostManager(
+            httpx.AsyncClient(transport=httpx.MockTransport(serve_card))
+        )
+        await manager.register_agent("http://agent")
+        clear_agent_card_cache()
+        card = await manager.register_agent("http://agent")
+        self.assertEqual(len(requested), 2)
+        # Registering the same url again replaces the earlier card
+        self.assertEqual(manager.agents, [card])
+        self.assertEqual(card.name, "Agent v2")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from service.server.agent_registry import AgentRegistry
+from service.server.in_memory_manager import InMemoryFakeAgentManager
+from utils.agent_card import clear_agent_card_cache
+
+
+def card_json(name: str, url: str) -> dict:
+    return {
+        'name': name,
+        'description': 'test agent',
+        'url': url,
+        'version': '1.0.0',
+        'capabilities': {},
+        'defaultInputModes': ['text'],
+        'defaultOutputModes': ['text'],
+        'skills': [],
+    }
+
+
+class AgentRegistryTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for AgentRegistry registration and health checks."""
+
+    async def asyncSetUp(self) -> None:  # noqa: N802
+        clear_agent_card_cache()
+        self.names: dict[str, str] = {}
+        self.down: set[str] = set()
+        self.requests: list[str] = []
+        self.delay = 0.0
+        self.http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.serve_card)
+        )
+        self.manager = InMemoryFakeAgentManager(self.http_client)
+        self.registry = AgentRegistry(
+            self.manager, self.http_client, interval=None, timeout=1
+        )
+
+    async def asyncTearDown(self) -> None:  # noqa: N802
+        await self.registry.aclose()
+        await self.http_client.aclose()
+
+    async def serve_card(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests.append(host)
+        await asyncio.sleep(self.delay)
+        if host in self.down or host not in self.names:
+            return httpx.Response(503)
+        body = json.dumps(card_json(self.names[host], f'http://{host}'))
+        return httpx.Response(
+            200, content=body, headers={'Content-Type': 'application/json'}
+        )
+
+    async def test_register_all_reports_each_agent(self) -> None:
+        self.names = {'a': 'Agent A', 'b': 'Agent B'}
+        results = await self.registry.register_all(
+            ['http://a', 'http://b', 'http://c', 'http://a']
+        )
+        self.assertEqual(list(results), ['http://a', 'http://b', 'http://c'])
+        self.assertEqual(results['http://a'].name, 'Agent A')
+        # Cards are fetched through the shared client
+        self.assertIn('a', self.requests)
+        self.assertIsInstance(results['http://c'], Exception)
+        self.assertEqual(
+            sorted(card.name for card in self.manager.agents),
+            ['Agent A', 'Agent B'],
+        )
+        health = {h.url: h for h in self.registry.status()}
+        self.assertTrue(health['http://a'].healthy)
+        # Failed registrations aren't tracked
+        self.assertNotIn('http://c', health)
+
+    async def test_registration_times_out(self) -> None:
+        self.names = {'slow': 'Slow'}
+        self.delay = 0.2
+        self.registry.timeout = 0.05
+        results = await self.registry.register_all(['http://slow'])
+        self.assertIsInstance(results['http://slow'], TimeoutError)
+
+    async def test_cards_are_fetched_concurrently(self) -> None:
+        self.names = {str(i): f'Agent {i}' for i in range(8)}
+        self.delay = 0.05
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self.registry.register_all(f'http://{i}' for i in range(8))
+        self.assertLess(loop.time() - started, 8 * self.delay)
+        self.assertEqual(len(self.manager.agents), 8)
+
+    async def test_check_tracks_health_and_card_changes(self) -> None:
+        self.names = {'a': 'Agent A'}
+        await self.registry.register('http://a')
+
+        self.down.add('a')
+        await self.registry.check()
+        [health] = self.registry.status()
+        self.assertFalse(health.healthy)
+        self.assertTrue(health.error)
+        # The last known name is kept while the agent is down
+        self.assertEqual(health.name, 'Agent A')
+
+        self.down.clear()
+        self.names['a'] = 'Agent A v2'
+        await self.registry.check()
+        [health] = self.registry.status()
+        self.assertTrue(health.healthy)
+        self.assertEqual(health.name, 'Agent A v2')
+        self.assertEqual([c.name for c in self.manager.agents], ['Agent A v2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
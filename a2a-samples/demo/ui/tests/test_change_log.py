@@ -0,0 +1,54 @@
+import unittest
+
+from service.server.application_manager import ChangeLog
+
+
+class ChangeLogTest(unittest.TestCase):
+    """Tests for paging through ChangeLog with cursors."""
+
+    def test_changes_after_a_cursor(self) -> None:
+        log = ChangeLog()
+        for item_id in 'abc':
+            log.record(item_id)
+        self.assertEqual(log.since(0), (['a', 'b', 'c'], 3, False))
+        self.assertEqual(log.since(1), (['b', 'c'], 3, False))
+        self.assertEqual(log.since(3), ([], 3, False))
+
+    def test_item_changed_again_moves_to_the_end(self) -> None:
+        log = ChangeLog()
+        for item_id in 'abca':
+            log.record(item_id)
+        self.assertEqual(log.since(0), (['b', 'c', 'a'], 4, False))
+        # 'a' changed after cursor 2, so it is reported once, not twice
+        self.assertEqual(log.since(2), (['c', 'a'], 4, False))
+
+    def test_limit_pages_through_the_changes(self) -> None:
+        log = ChangeLog()
+        for item_id in 'abcde':
+            log.record(item_id)
+        ids, cursor, has_more = log.since(0, limit=2)
+        self.assertEqual((ids, cursor, has_more), (['a', 'b'], 2, True))
+        ids, cursor, has_more = log.since(cursor, limit=2)
+        self.assertEqual((ids, cursor, has_more), (['c', 'd'], 4, True))
+        ids, cursor, has_more = log.since(cursor, limit=2)
+        self.assertEqual((ids, cursor, has_more), (['e'], 5, False))
+
+    def test_change_during_paging_is_not_lost(self) -> None:
+        log = ChangeLog()
+        for item_id in 'abc':
+            log.record(item_id)
+        ids, cursor, _ = log.since(0, limit=2)
+        self.assertEqual(ids, ['a', 'b'])
+        log.record('a')
+        ids, cursor, has_more = log.since(cursor, limit=2)
+        self.assertEqual((ids, cursor, has_more), (['c', 'a'], 4, False))
+
+    def test_limit_is_at_least_one(self) -> None:
+        log = ChangeLog()
+        log.record('a')
+        log.record('b')
+        self.assertEqual(log.since(0, limit=0), (['a'], 1, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import base64
+import os
+import unittest
+
+from unittest import mock
+
+from a2a.types import FilePart, FileWithBytes, FileWithUri, Message, Part
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from service.server.server import ConversationServer
+
+
+DATA = bytes(range(256)) * 4
+
+
+def make_message(message_id: str = 'm1') -> Message:
+    return Message(
+        messageId=message_id,
+        role='user',
+        metadata={'message_id': message_id},
+        parts=[
+            Part(
+                root=FilePart(
+                    file=FileWithBytes(
+                        bytes=base64.b64encode(DATA).decode(),
+                        mimeType='image/png',
+                    )
+                )
+            )
+        ],
+    )
+
+
+class ConversationServerFilesTest(unittest.TestCase):
+    """Tests for the file parts ConversationServer caches and serves."""
+
+    def setUp(self) -> None:
+        self.start_server()
+
+    def start_server(self, **environ: str) -> None:
+        environ = {'A2A_HOST': 'fake', **environ}
+        with mock.patch.dict(os.environ, environ):
+            app = FastAPI()
+            self.server = ConversationServer(app, None)
+        self.client = TestClient(app)
+
+    def cached_uri(self, message: Message) -> str:
+        cached = self.server.cache_content([message])[0]
+        file = cached.parts[0].root.file
+        self.assertIsInstance(file, FileWithUri)
+        return file.uri
+
+    def test_cache_content_leaves_the_message_untouched(self) -> None:
+        message = make_message()
+        uri = self.cached_uri(message)
+        self.assertIsInstance(message.parts[0].root.file, FileWithBytes)
+        # The same part always gets the same url
+        self.assertEqual(self.cached_uri(message), uri)
+
+    def test_evicted_file_is_cached_again_on_next_listing(self) -> None:
+        # Room for one file, so caching another evicts the first
+        self.start_server(A2A_UI_FILE_CACHE_BYTES=str(len(DATA)))
+        message = make_message()
+        uri = self.cached_uri(message)
+        self.cached_uri(make_message('m2'))
+        self.assertEqual(self.client.get(uri).status_code, 404)
+        self.assertEqual(self.cached_uri(message), uri)
+        self.assertEqual(self.client.get(uri).content, DATA)
+
+    def test_full_and_partial_downloads(self) -> None:
+        uri = self.cached_uri(make_message())
+        response = self.client.get(uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, DATA)
+        self.assertEqual(response.headers['content-type'], 'image/png')
+
+        response = self.client.get(uri, headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, DATA[10:20])
+        self.assertEqual(
+            response.headers['content-range'], f'bytes 10-19/{len(DATA)}'
+        )
+
+        response = self.client.get(uri, headers={'Range': 'bytes=-4'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, DATA[-4:])
+
+        response = self.client.get(uri, headers={'Range': 'bytes=5000-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(
+            response.headers['content-range'], f'bytes */{len(DATA)}'
+        )
+
+    def test_not_modified_head_and_missing(self) -> None:
+        uri = self.cached_uri(make_message())
+        etag = self.client.get(uri).headers['etag']
+        response = self.client.get(uri, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.head(uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-length'], str(len(DATA)))
+
+        self.assertEqual(
+            self.client.get('/message/file/unknown').status_code, 404
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
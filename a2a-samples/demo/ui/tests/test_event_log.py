@@ -0,0 +1,102 @@
+import tempfile
+import time
+import unittest
+
+from pathlib import Path
+from unittest import mock
+
+from a2a.types import Message, Part, TextPart
+from service.server.event_log import EventLog
+from service.types import Event
+
+
+def make_event(event_id: str, context_id: str = 'c1', timestamp=None) -> Event:
+    return Event(
+        id=event_id,
+        actor='user',
+        content=Message(
+            messageId=event_id,
+            contextId=context_id,
+            role='user',
+            parts=[Part(root=TextPart(text=event_id))],
+        ),
+        timestamp=time.time() if timestamp is None else timestamp,
+    )
+
+
+def ids(events: list[Event]) -> list[str]:
+    return [e.id for e in events]
+
+
+class EventLogTest(unittest.TestCase):
+    """Tests for EventLog paging, retention and persistence."""
+
+    def test_page_with_cursor_and_limit(self) -> None:
+        log = EventLog()
+        for i in range(5):
+            log.add(make_event(str(i)))
+        events, cursor, has_more = log.page(limit=2)
+        self.assertEqual((ids(events), cursor, has_more), (['0', '1'], 2, True))
+        events, cursor, has_more = log.page(cursor, limit=2)
+        self.assertEqual((ids(events), cursor, has_more), (['2', '3'], 4, True))
+        events, cursor, has_more = log.page(cursor, limit=2)
+        self.assertEqual((ids(events), cursor, has_more), (['4'], 5, False))
+        self.assertEqual(log.page(cursor), ([], 5, False))
+
+    def test_page_one_conversation(self) -> None:
+        log = EventLog()
+        for i, context_id in enumerate(['a', 'b', 'a', 'b', 'a']):
+            log.add(make_event(str(i), context_id))
+        events, cursor, _ = log.page(conversation_id='a', limit=2)
+        self.assertEqual(ids(events), ['0', '2'])
+        events, cursor, has_more = log.page(cursor, conversation_id='a')
+        self.assertEqual((ids(events), has_more), (['4'], False))
+        self.assertEqual(ids(log.events('b')), ['1', '3'])
+        self.assertEqual(log.page(conversation_id='missing'), ([], 5, False))
+
+    def test_same_id_is_replaced_in_place(self) -> None:
+        log = EventLog()
+        log.add(make_event('x'))
+        log.add(make_event('y'))
+        log.add(make_event('x', 'other'))
+        self.assertEqual(len(log), 2)
+        self.assertEqual(log.seq, 2)
+        self.assertEqual(ids(log.events()), ['x', 'y'])
+
+    def test_max_events_drops_the_oldest(self) -> None:
+        log = EventLog(max_events=3)
+        for i in range(5):
+            log.add(make_event(str(i), 'a' if i % 2 else 'b'))
+        self.assertEqual(ids(log.events()), ['2', '3', '4'])
+        self.assertEqual(ids(log.events('b')), ['2', '4'])
+        # A cursor from before the dropped events resumes at the oldest kept
+        events, cursor, _ = log.page(1)
+        self.assertEqual((ids(events), cursor), (['2', '3', '4'], 5))
+
+    def test_max_age_drops_old_events(self) -> None:
+        log = EventLog(max_age=60)
+        with mock.patch('time.time', return_value=time.time() - 120):
+            log.add(make_event('old'))
+        log.add(make_event('new'))
+        self.assertEqual(ids(log.events()), ['new'])
+
+    def test_events_are_reloaded_and_compacted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'events.jsonl'
+            log = EventLog(max_events=2, path=path)
+            for i in range(6):
+                log.add(make_event(str(i)))
+            log.close()
+            # Compacted whenever the file held twice the retained events
+            self.assertLessEqual(len(path.read_text().splitlines()), 4)
+
+            with path.open('a') as f:
+                f.write('{"id": "partial')
+            reloaded = EventLog(max_events=2, path=path)
+            self.assertEqual(ids(reloaded.events()), ['4', '5'])
+            reloaded.close()
+            self.assertEqual(len(path.read_text().splitlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+
+from service.server.file_cache import FileCache
+
+
+class FileCacheTest(unittest.TestCase):
+    """Tests for FileCache limits, eviction and spilling to disk."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_put_get_and_read_ranges(self) -> None:
+        cache = FileCache()
+        cache.put('a', b'0123456789', 'text/plain')
+        self.assertIn('a', cache)
+        file = cache.get('a')
+        self.assertEqual(file.mime_type, 'text/plain')
+        self.assertEqual(file.size, 10)
+        self.assertEqual(file.read(), b'0123456789')
+        self.assertEqual(file.read(2, 4), b'234')
+        self.assertIsNone(cache.get('missing'))
+
+    def test_memory_limit_evicts_least_recently_used(self) -> None:
+        cache = FileCache(max_bytes=25)
+        cache.put('a', b'x' * 10, 'text/plain')
+        cache.put('b', b'x' * 10, 'text/plain')
+        cache.get('a')
+        cache.put('c', b'x' * 10, 'text/plain')
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+
+    def test_large_files_spill_to_disk(self) -> None:
+        cache = FileCache(spill_dir=self.tmp.name, spill_threshold=8)
+        small = cache.put('small', b'tiny', 'text/plain')
+        large = cache.put('large', b'0123456789', 'image/png')
+        self.assertIsNone(small.path)
+        self.assertIsNone(large.data)
+        self.assertTrue(large.path.exists())
+        self.assertEqual(cache.get('large').read(5, 9), b'56789')
+
+    def test_disk_limit_removes_spilled_files(self) -> None:
+        cache = FileCache(
+            spill_dir=self.tmp.name, spill_threshold=1, max_disk_bytes=15
+        )
+        first = cache.put('a', b'x' * 10, 'text/plain')
+        cache.put('b', b'x' * 10, 'text/plain')
+        self.assertNotIn('a', cache)
+        self.assertFalse(first.path.exists())
+        self.assertIn('b', cache)
+
+    def test_replacing_a_file_releases_the_old_copy(self) -> None:
+        cache = FileCache(spill_dir=self.tmp.name, spill_threshold=5)
+        old = cache.put('a', b'x' * 10, 'text/plain')
+        cache.put('a', b'y', 'text/plain')
+        self.assertFalse(old.path.exists())
+        self.assertEqual(cache.get('a').read(), b'y')
+
+    def test_clear_removes_everything(self) -> None:
+        cache = FileCache(spill_dir=self.tmp.name, spill_threshold=5)
+        spilled = cache.put('a', b'x' * 10, 'text/plain')
+        cache.put('b', b'y', 'text/plain')
+        cache.clear()
+        self.assertNotIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertFalse(spilled.path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from a2a.types import Message, Part, Task, TaskState, TaskStatus, TextPart
+
+from service.server.in_memory_manager import InMemoryFakeAgentManager
+
+
+def make_task(task_id: str, state: TaskState = TaskState.working) -> Task:
+    return Task(
+        id=task_id, contextId='c', status=TaskStatus(state=state), history=[]
+    )
+
+
+def make_message(
+    message_id: str, context_id: str | None = None, task_id: str | None = None
+) -> Message:
+    return Message(
+        messageId=message_id,
+        contextId=context_id,
+        taskId=task_id,
+        role='user',
+        parts=[Part(root=TextPart(text='hi'))],
+    )
+
+
+class InMemoryFakeAgentManagerTest(unittest.TestCase):
+    """Tests for the lookups InMemoryFakeAgentManager keeps by id."""
+
+    def setUp(self) -> None:
+        self.manager = InMemoryFakeAgentManager()
+
+    def add(self, task: Task) -> None:
+        self.manager.add_task(task)
+        self.manager.notify('task', {'task': task})
+
+    def test_conversations_are_looked_up_by_id(self) -> None:
+        first = self.manager.create_conversation()
+        second = self.manager.create_conversation()
+        self.assertIs(
+            self.manager.get_conversation(second.conversation_id), second
+        )
+        self.assertIsNone(self.manager.get_conversation('missing'))
+        self.assertEqual(self.manager.conversations, [first, second])
+
+    def test_list_tasks_since_a_cursor(self) -> None:
+        for task_id in ('t1', 't2'):
+            self.add(make_task(task_id))
+        _, cursor, _ = self.manager.list_tasks(since=0)
+        done = make_task('t1', TaskState.completed)
+        self.manager.update_task(done)
+        self.manager.notify('task', {'task': done})
+        tasks, _, has_more = self.manager.list_tasks(since=cursor)
+        self.assertEqual(tasks, [done])
+        self.assertFalse(has_more)
+        self.assertIs(self.manager.get_task('t1'), done)
+        self.assertEqual(
+            self.manager.tasks, [done, self.manager.get_task('t2')]
+        )
+
+    def test_follow_up_message_joins_the_open_task(self) -> None:
+        conversation = self.manager.create_conversation()
+        self.add(make_task('t1'))
+        conversation.messages.append(
+            make_message('m1', conversation.conversation_id, task_id='t1')
+        )
+        follow_up = self.manager.sanitize_message(
+            make_message('m2', conversation.conversation_id)
+        )
+        self.assertEqual(follow_up.taskId, 't1')
+        self.manager.update_task(make_task('t1', TaskState.completed))
+        follow_up = self.manager.sanitize_message(
+            make_message('m3', conversation.conversation_id)
+        )
+        self.assertIsNone(follow_up.taskId)
+        self.assertIsNone(
+            self.manager.sanitize_message(make_message('m4')).taskId
+        )
+
+    def test_update_of_unknown_task_is_ignored(self) -> None:
+        self.manager.update_task(make_task('missing'))
+        self.assertIsNone(self.manager.get_task('missing'))
+        self.assertEqual(self.manager.tasks, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
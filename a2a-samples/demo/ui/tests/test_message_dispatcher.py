@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+
+from a2a.types import Message, Part, TextPart
+from service.server.message_dispatcher import MessageDispatcher
+
+
+def make_message(message_id: str, context_id: str) -> Message:
+    return Message(
+        messageId=message_id,
+        contextId=context_id,
+        role='user',
+        parts=[Part(root=TextPart(text=message_id))],
+    )
+
+
+class MessageDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for MessageDispatcher ordering, limits and metrics."""
+
+    async def asyncSetUp(self) -> None:  # noqa: N802
+        self.handled: list[str] = []
+        self.dispatcher = MessageDispatcher(self.handle, max_concurrency=4)
+
+    async def asyncTearDown(self) -> None:  # noqa: N802
+        await self.dispatcher.aclose()
+
+    async def handle(self, message: Message) -> None:
+        # Later messages finish faster, so only the dispatcher keeps order
+        await asyncio.sleep(0.01 / (len(self.handled) + 1))
+        self.handled.append(message.messageId)
+
+    async def drain(self) -> None:
+        while True:
+            metrics = self.dispatcher.metrics()
+            if not metrics['pending'] and not metrics['in_flight']:
+                return
+            await asyncio.sleep(0.001)
+
+    async def test_same_conversation_is_processed_in_order(self):
+        for i in range(5):
+            self.assertTrue(self.dispatcher.submit(make_message(f'a{i}', 'a')))
+        await self.drain()
+        self.assertEqual(self.handled, [f'a{i}' for i in range(5)])
+
+    async def test_conversations_are_processed_concurrently(self):
+        running = 0
+        peak = 0
+
+        async def handle(message: Message) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        self.dispatcher = MessageDispatcher(handle, max_concurrency=4)
+        for conversation in 'abcd':
+            self.dispatcher.submit(make_message(conversation, conversation))
+        await self.drain()
+        self.assertEqual(peak, 4)
+
+    async def test_busy_conversation_does_not_starve_others(self):
+        dispatcher = MessageDispatcher(self.handle, max_concurrency=1)
+        for i in range(3):
+            dispatcher.submit(make_message(f'a{i}', 'a'))
+        dispatcher.submit(make_message('b0', 'b'))
+        self.dispatcher = dispatcher
+        await self.drain()
+        self.assertEqual(self.handled, ['a0', 'b0', 'a1', 'a2'])
+
+    async def test_full_queue_rejects_messages(self):
+        self.dispatcher = MessageDispatcher(self.handle, max_pending=2)
+        self.assertTrue(self.dispatcher.submit(make_message('1', 'a')))
+        self.assertTrue(self.dispatcher.submit(make_message('2', 'a')))
+        self.assertFalse(self.dispatcher.submit(make_message('3', 'a')))
+        metrics = self.dispatcher.metrics()
+        self.assertEqual(metrics['pending'], 2)
+        self.assertEqual(metrics['rejected'], 1)
+        await self.drain()
+        self.assertEqual(self.handled, ['1', '2'])
+        self.assertTrue(self.dispatcher.submit(make_message('4', 'a')))
+
+    async def test_on_submit_sees_only_accepted_messages(self):
+        accepted: list[str] = []
+        self.dispatcher = MessageDispatcher(
+            self.handle,
+            max_pending=1,
+            on_submit=lambda message: accepted.append(message.messageId),
+        )
+        self.dispatcher.submit(make_message('1', 'a'))
+        self.dispatcher.submit(make_message('2', 'a'))
+        # Marked as soon as it is queued, before any worker has run
+        self.assertEqual(accepted, ['1'])
+        await self.drain()
+
+    async def test_failed_message_does_not_stop_the_conversation(self):
+        async def handle(message: Message) -> None:
+            if message.messageId == 'bad':
+                raise RuntimeError('boom')
+            self.handled.append(message.messageId)
+
+        self.dispatcher = MessageDispatcher(handle)
+        self.dispatcher.submit(make_message('bad', 'a'))
+        self.dispatcher.submit(make_message('good', 'a'))
+        await self.drain()
+        self.assertEqual(self.handled, ['good'])
+        metrics = self.dispatcher.metrics()
+        self.assertEqual(metrics['failed'], 1)
+        self.assertEqual(metrics['completed'], 1)
+        self.assertEqual(metrics['conversations'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
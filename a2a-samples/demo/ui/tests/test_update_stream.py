@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+
+from service.server.update_stream import UpdateBroadcaster
+
+
+class UpdateBroadcasterTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for UpdateBroadcaster replay, fan-out and resets."""
+
+    async def next_updates(self, stream, count: int) -> list:
+        return [await anext(stream) for _ in range(count)]
+
+    async def test_new_subscriber_starts_with_a_reset(self) -> None:
+        updates = UpdateBroadcaster()
+        updates.publish('task', {'id': 't1'})
+        stream = updates.updates()
+        self.assertEqual(
+            await anext(stream), {'seq': 1, 'kind': 'reset', 'data': {}}
+        )
+        await stream.aclose()
+
+    async def test_reconnect_replays_missed_updates(self) -> None:
+        updates = UpdateBroadcaster()
+        for i in range(3):
+            updates.publish('task', {'id': f't{i}'})
+        stream = updates.updates(since=1)
+        received = await self.next_updates(stream, 2)
+        self.assertEqual([u['seq'] for u in received], [2, 3])
+        self.assertEqual(received[0]['data'], {'id': 't1'})
+        await stream.aclose()
+
+    async def test_up_to_date_subscriber_gets_new_updates(self) -> None:
+        updates = UpdateBroadcaster()
+        first = updates.updates(since=0)
+        second = updates.updates(since=0)
+        # Start both subscriptions before publishing
+        pending = [
+            asyncio.create_task(anext(first)),
+            asyncio.create_task(anext(second)),
+        ]
+        await asyncio.sleep(0)
+        updates.publish('message', {'text': 'hi'})
+        received = await asyncio.gather(*pending)
+        self.assertEqual([u['kind'] for u in received], ['message', 'message'])
+        await first.aclose()
+        await second.aclose()
+
+    async def test_too_far_behind_gets_a_reset(self) -> None:
+        updates = UpdateBroadcaster(history=2)
+        for i in range(5):
+            updates.publish('task', {'id': f't{i}'})
+        stream = updates.updates(since=1)
+        self.assertEqual((await anext(stream))['kind'], 'reset')
+        await stream.aclose()
+        # A cursor from before a restart is ahead of the sequence
+        stream = updates.updates(since=99)
+        self.assertEqual((await anext(stream))['kind'], 'reset')
+        await stream.aclose()
+
+    async def test_slow_subscriber_queue_is_replaced_by_a_reset(self) -> None:
+        updates = UpdateBroadcaster(max_queued=2)
+        stream = updates.updates(since=0)
+        waiting = asyncio.create_task(anext(stream))
+        await asyncio.sleep(0)
+        updates.publish('task', {'id': 't0'})
+        self.assertEqual((await waiting)['seq'], 1)
+        for i in range(1, 4):
+            updates.publish('task', {'id': f't{i}'})
+        self.assertEqual((await anext(stream))['kind'], 'reset')
+        await stream.aclose()
+
+    async def test_keepalive_yields_none(self) -> None:
+        updates = UpdateBroadcaster()
+        stream = updates.updates(since=0, keepalive=0.01)
+        self.assertIsNone(await anext(stream))
+        await stream.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,43 @@
-import requests
+import httpx
 
 from a2a.types import AgentCard
+from common.client.card_resolver import A2ACardResolver, AgentCardCache
 
 
-def get_agent_card(remote_agent_address: str) -> AgentCard:
-    """Get the agent card."""
+# The demo parses cards with the a2a SDK's AgentCard, so they are cached
+# apart from the common client's cards
+_cache = AgentCardCache()
+
+
+def _resolver(
+    remote_agent_address: str, httpx_client: httpx.AsyncClient | None
+) -> A2ACardResolver:
     if not remote_agent_address.startswith(('http://', 'https://')):
         remote_agent_address = 'http://' + remote_agent_address
-    agent_card = requests.get(f'{remote_agent_address}/.well-known/agent.json')
-    return AgentCard(**agent_card.json())
+    return A2ACardResolver(
+        remote_agent_address,
+        httpx_client=httpx_client,
+        cache=_cache,
+        card_model=AgentCard,
+    )
+
+
+def clear_agent_card_cache() -> None:
+    """Forget every cached agent card."""
+    _cache.invalidate()
+
+
+async def get_agent_card_async(
+    remote_agent_address: str,
+    httpx_client: httpx.AsyncClient | None = None,
+    force_refresh: bool = False,
+) -> AgentCard:
+    """Get the agent card without blocking the event loop.
+
+    Cards are cached for the agent's Cache-Control max-age, then revalidated
+    with a conditional request. With `force_refresh`, a cached card is
+    revalidated even if still fresh; an unchanged card costs a 304.
+    """
+    return await _resolver(
+        remote_agent_address, httpx_client
+    ).get_agent_card_async(force_refresh)
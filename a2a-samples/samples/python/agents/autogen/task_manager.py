@@ -20,7 +20,6 @@ from common.types import (
     SendTaskStreamingResponse,
     Task,
     TaskArtifactUpdateEvent,
-    TaskIdParams,
     TaskSendParams,
     TaskState,
     TaskStatus,
@@ -28,6 +27,7 @@ from common.types import (
     TextPart,
 )
 from common.utils.push_notification_auth import PushNotificationSenderAuth
+from common.utils.push_notification_delivery import PushNotificationDelivery
 
 
 logger = logging.getLogger(__name__)
@@ -42,6 +42,9 @@ class AgentTaskManager(InMemoryTaskManager):
         super().__init__()
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        self.notification_delivery = PushNotificationDelivery(
+            notification_sender_auth
+        )
 
     async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
         """Runs the agent in streaming mode and updates the task store with results."""
@@ -249,31 +252,10 @@ class AgentTaskManager(InMemoryTaskManager):
         push_info = await self.get_push_notification_info(task.id)
 
         logger.info(f'Notifying for task {task.id} => {task.status.state}')
-        await self.notification_sender_auth.send_push_notification(
-            push_info.url, data=task.model_dump(exclude_none=True)
+        self.notification_delivery.enqueue(
+            push_info.url, data=task.model_dump(exclude_none=True), key=task.id
         )
 
-    async def on_resubscribe_to_task(
-        self, request
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-        """Handles reconnection to task streaming."""
-        task_id_params: TaskIdParams = request.params
-        try:
-            sse_event_queue = await self.setup_sse_consumer(
-                task_id_params.id, True
-            )
-            return self.dequeue_events_for_sse(
-                request.id, task_id_params.id, sse_event_queue
-            )
-        except Exception as e:
-            logger.error(f'Error while reconnecting to SSE stream: {e}')
-            return JSONRPCResponse(
-                id=request.id,
-                error=InternalError(
-                    message=f'An error occurred while reconnecting to stream: {e}'
-                ),
-            )
-
     async def set_push_notification_info(
         self, task_id: str, push_notification_config: PushNotificationConfig
     ):
@@ -19,6 +19,7 @@ from a2a.types import (
 )
 from agent import ImageGenerationAgent
 from agent_executor import ImageGenerationAgentExecutor
+from common.utils.artifact_store import LocalArtifactStore
 from dotenv import load_dotenv
 
 
@@ -78,16 +79,20 @@ def main(host, port):
             skills=[skill],
         )
 
+        # Generated images are served from /artifacts/{id} and sent by URI
+        artifact_store = LocalArtifactStore(base_url=agent_host_url)
         request_handler = DefaultRequestHandler(
-            agent_executor=ImageGenerationAgentExecutor(),
+            agent_executor=ImageGenerationAgentExecutor(artifact_store),
             task_store=InMemoryTaskStore(),
         )
         server = A2AStarletteApplication(
             agent_card=agent_card, http_handler=request_handler
         )
+        app = server.build()
+        artifact_store.mount(app)
         import uvicorn
 
-        uvicorn.run(server.build(), host=host, port=port)
+        uvicorn.run(app, host=host, port=port)
 
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
@@ -14,6 +14,7 @@ from typing import Any
 from uuid import uuid4
 
 from PIL import Image
+from common.utils.artifact_store import LocalArtifactStore
 from common.utils.in_memory_cache import InMemoryCache
 from crewai import LLM, Agent, Crew, Task
 from crewai.process import Process
@@ -28,6 +29,10 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Images of an idle session are dropped after an hour; the cache's size
+# limits evict the least recently used sessions before that if needed.
+SESSION_IMAGES_TTL = 60 * 60
+
 
 class Imagedata(BaseModel):
     """Represents image data.
@@ -37,6 +42,7 @@ class Imagedata(BaseModel):
       name: Name of the image.
       mime_type: MIME type of the image.
       bytes: Base64 encoded image data.
+      uri: URI of the image in the artifact store, instead of bytes.
       error: Error message if there was an issue with the image.
     """
 
@@ -44,14 +50,44 @@ class Imagedata(BaseModel):
     name: str | None = None
     mime_type: str | None = None
     bytes: str | None = None
+    uri: str | None = None
     error: str | None = None
 
 
-@tool('ImageGenerationTool')
-def generate_image_tool(
-    prompt: str, session_id: str, artifact_file_id: str = None
+def _image_data(
+    inline_data: types.Blob, artifact_store: LocalArtifactStore | None
+) -> Imagedata:
+    if artifact_store is not None:
+        stored = artifact_store.put(
+            inline_data.data,
+            mime_type=inline_data.mime_type,
+            name='generated_image.png',
+        )
+        return Imagedata(
+            uri=stored.uri,
+            mime_type=stored.mime_type,
+            name=stored.name,
+            id=stored.id,
+        )
+    return Imagedata(
+        bytes=base64.b64encode(inline_data.data).decode('utf-8'),
+        mime_type=inline_data.mime_type,
+        name='generated_image.png',
+        id=uuid4().hex,
+    )
+
+
+def generate_image(
+    prompt: str,
+    session_id: str,
+    artifact_file_id: str = None,
+    artifact_store: LocalArtifactStore | None = None,
 ) -> str:
-    """Image generation tool that generates images or modifies a given image based on a prompt."""
+    """Generate an image, or modify a given image, based on a prompt.
+
+    With `artifact_store` set, generated images are written there once and
+    sent by URI instead of being kept and shipped as base64.
+    """
     if not prompt:
         raise ValueError('Prompt cannot be empty')
 
@@ -75,7 +111,7 @@ def generate_image_tool(
     try:
         ref_image_data = None
         # image_id = session_cache[session_id][-1]
-        session_image_data = cache.get(session_id)
+        session_image_data = cache.get(session_id, namespace='images')
         if artifact_file_id:
             try:
                 ref_image_data = session_image_data[artifact_file_id]
@@ -87,7 +123,10 @@ def generate_image_tool(
             latest_image_key = list(session_image_data.keys())[-1]
             ref_image_data = session_image_data[latest_image_key]
 
-        ref_bytes = base64.b64decode(ref_image_data.bytes)
+        if ref_image_data.uri:
+            ref_bytes = artifact_store.read(ref_image_data.id)
+        else:
+            ref_bytes = base64.b64decode(ref_image_data.bytes)
         ref_image = Image.open(BytesIO(ref_bytes))
     except Exception:
         ref_image = None
@@ -114,21 +153,16 @@ def generate_image_tool(
         if part.inline_data is not None:
             try:
                 print('Creating image data')
-                data = Imagedata(
-                    bytes=base64.b64encode(part.inline_data.data).decode(
-                        'utf-8'
-                    ),
-                    mime_type=part.inline_data.mime_type,
-                    name='generated_image.png',
-                    id=uuid4().hex,
+                data = _image_data(part.inline_data, artifact_store)
+                session_data = cache.get(session_id, namespace='images') or {}
+                session_data[data.id] = data
+                # Set it again so the cache accounts for the new image's size
+                cache.set(
+                    session_id,
+                    session_data,
+                    ttl=SESSION_IMAGES_TTL,
+                    namespace='images',
                 )
-                session_data = cache.get(session_id)
-                if session_data is None:
-                    # Session doesn't exist, create it with the new item
-                    cache.set(session_id, {data.id: data})
-                else:
-                    # Session exists, update the existing dictionary directly
-                    session_data[data.id] = data
 
                 return data.id
             except Exception as e:
@@ -137,12 +171,28 @@ def generate_image_tool(
     return -999999999
 
 
+def make_image_generation_tool(artifact_store: LocalArtifactStore | None):
+    """Build the image generation tool, bound to one agent's artifact store."""
+
+    @tool('ImageGenerationTool')
+    def generate_image_tool(
+        prompt: str, session_id: str, artifact_file_id: str = None
+    ) -> str:
+        """Image generation tool that generates images or modifies a given image based on a prompt."""
+        return generate_image(
+            prompt, session_id, artifact_file_id, artifact_store
+        )
+
+    return generate_image_tool
+
+
 class ImageGenerationAgent:
     """Agent that generates images based on user prompts."""
 
     SUPPORTED_CONTENT_TYPES = ['text', 'text/plain', 'image/png']
 
-    def __init__(self):
+    def __init__(self, artifact_store: LocalArtifactStore | None = None):
+        self.artifact_store = artifact_store
         if os.getenv('GOOGLE_GENAI_USE_VERTEXAI'):
             self.model = LLM(model='vertex_ai/gemini-2.0-flash')
         elif os.getenv('GOOGLE_API_KEY'):
@@ -168,7 +218,7 @@ class ImageGenerationAgent:
             ),
             verbose=False,
             allow_delegation=False,
-            tools=[generate_image_tool],
+            tools=[make_image_generation_tool(artifact_store)],
             llm=self.model,
         )
 
@@ -228,10 +278,9 @@ class ImageGenerationAgent:
     def get_image_data(self, session_id: str, image_key: str) -> Imagedata:
         """Return Imagedata given a key. This is a helper method from the agent."""
         cache = InMemoryCache()
-        session_data = cache.get(session_id)
+        session_data = cache.get(session_id, namespace='images')
         try:
-            cache.get(session_id)
             return session_data[image_key]
-        except KeyError:
+        except (KeyError, TypeError):
             logger.error('Error generating image')
             return Imagedata(error='Error generating image, please try again.')
@@ -3,6 +3,7 @@ from a2a.server.events import EventQueue
 from a2a.types import (
     FilePart,
     FileWithBytes,
+    FileWithUri,
     InvalidParamsError,
     Part,
     Task,
@@ -15,13 +16,14 @@ from a2a.utils import (
 )
 from a2a.utils.errors import ServerError
 from agent import ImageGenerationAgent
+from common.utils.artifact_store import LocalArtifactStore
 
 
 class ImageGenerationAgentExecutor(AgentExecutor):
     """Reimbursement AgentExecutor Example."""
 
-    def __init__(self):
-        self.agent = ImageGenerationAgent()
+    def __init__(self, artifact_store: LocalArtifactStore | None = None):
+        self.agent = ImageGenerationAgent(artifact_store)
 
     async def execute(
         self,
@@ -46,15 +48,15 @@ class ImageGenerationAgentExecutor(AgentExecutor):
             session_id=context.context_id, image_key=result.raw
         )
         if data and not data.error:
-            parts = [
-                FilePart(
-                    file=FileWithBytes(
-                        bytes=data.bytes,
-                        mimeType=data.mime_type,
-                        name=data.id,
-                    )
+            if data.uri:
+                file = FileWithUri(
+                    uri=data.uri, mimeType=data.mime_type, name=data.id
                 )
-            ]
+            else:
+                file = FileWithBytes(
+                    bytes=data.bytes, mimeType=data.mime_type, name=data.id
+                )
+            parts = [FilePart(file=file)]
         else:
             parts = [
                 Part(
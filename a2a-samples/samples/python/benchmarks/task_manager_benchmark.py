@@ -0,0 +1,184 @@
+"""Microbenchmark for InMemoryTaskManager locking.
+
+Runs many tasks concurrently: every task receives a stream of status
+updates while readers poll `tasks/get` on random tasks. The same workload is
+run with the striped per-task locks and with a single global lock (the old
+behaviour, where reads also waited on it) to show how much a busy store
+slows reads.
+
+Usage (from samples/python):
+    python -m benchmarks.task_manager_benchmark --tasks 1000 --store sqlite
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+
+from collections.abc import AsyncIterable
+from pathlib import Path
+
+from common.server.task_manager import InMemoryTaskManager
+from common.server.task_store import (
+    InMemoryTaskStore,
+    SQLiteTaskStore,
+    TaskStore,
+)
+from common.types import (
+    GetTaskRequest,
+    GetTaskResponse,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+class _BenchManager(InMemoryTaskManager):
+    """Completes every task as soon as it is sent."""
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        await self.upsert_task(request.params)
+        task = await self.update_store(
+            request.params.id, TaskStatus(state=TaskState.COMPLETED), None
+        )
+        return SendTaskResponse(
+            id=request.id,
+            result=self.append_task_history(task, request.params.historyLength),
+        )
+
+    async def on_send_task_subscribe(
+        self, request: SendTaskStreamingRequest
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        await self.upsert_task(request.params)
+        sse_event_queue = await self.setup_sse_consumer(request.params.id)
+        status = TaskStatus(state=TaskState.COMPLETED)
+        await self.update_store(request.params.id, status, None)
+        await self.enqueue_events_for_sse(
+            request.params.id,
+            TaskStatusUpdateEvent(
+                id=request.params.id, status=status, final=True
+            ),
+        )
+        return self.dequeue_events_for_sse(
+            request.id, request.params.id, sse_event_queue
+        )
+
+
+class _GlobalLockManager(_BenchManager):
+    """Every read and write waits on one lock."""
+
+    def __init__(self, task_store):
+        super().__init__(task_store, lock_stripes=1)
+
+    async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
+        async with self.task_lock(request.params.id):
+            return await super().on_get_task(request)
+
+
+def _message(text: str, role: str = 'user') -> Message:
+    return Message(role=role, parts=[TextPart(text=text)])
+
+
+async def _run(manager, tasks: int, updates: int, reads: int) -> dict:
+    task_ids = [f'task-{i}' for i in range(tasks)]
+    await asyncio.gather(
+        *(
+            manager.upsert_task(
+                TaskSendParams(
+                    id=task_id, sessionId='bench', message=_message('hi')
+                )
+            )
+            for task_id in task_ids
+        )
+    )
+
+    async def writer(task_id: str) -> None:
+        for i in range(updates):
+            state = (
+                TaskState.COMPLETED if i == updates - 1 else TaskState.WORKING
+            )
+            await manager.update_store(
+                task_id,
+                TaskStatus(state=state, message=_message(f'step {i}', 'agent')),
+                None,
+            )
+
+    latencies = []
+
+    async def reader() -> None:
+        for _ in range(reads):
+            request = GetTaskRequest(
+                params=TaskQueryParams(
+                    id=random.choice(task_ids), historyLength=5
+                )
+            )
+            start = time.perf_counter()
+            response = await manager.on_get_task(request)
+            latencies.append(time.perf_counter() - start)
+            assert response.error is None
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(writer(task_id) for task_id in task_ids),
+        *(reader() for _ in range(max(1, tasks // 10))),
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'elapsed': elapsed,
+        'updates_per_sec': tasks * updates / elapsed,
+        'read_p50_ms': statistics.median(latencies) * 1000,
+        'read_p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def _make_store(kind: str, directory: Path, name: str) -> TaskStore:
+    if kind == 'sqlite':
+        return SQLiteTaskStore(directory / f'{name}.sqlite3')
+    return InMemoryTaskStore()
+
+
+async def main(tasks: int, updates: int, reads: int, store: str) -> None:
+    """Run the workload under each locking scheme and print the results."""
+    print(
+        f'{tasks} concurrent tasks x {updates} updates, '
+        f'{max(1, tasks // 10)} readers x {reads} reads, {store} store'
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, manager_cls in (
+            ('global lock', _GlobalLockManager),
+            ('striped locks', _BenchManager),
+        ):
+            task_store = _make_store(store, Path(tmp), label.replace(' ', '_'))
+            result = await _run(manager_cls(task_store), tasks, updates, reads)
+            if isinstance(task_store, SQLiteTaskStore):
+                task_store.close()
+            print(
+                f'  {label:14} {result["updates_per_sec"]:10.0f} updates/s  '
+                f'read p50 {result["read_p50_ms"]:7.2f} ms  '
+                f'p99 {result["read_p99_ms"]:7.2f} ms  '
+                f'({result["elapsed"]:.2f}s)'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--updates', type=int, default=10)
+    parser.add_argument('--reads', type=int, default=20)
+    parser.add_argument(
+        '--store', choices=['memory', 'sqlite'], default='sqlite'
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.updates, args.reads, args.store))
@@ -1,5 +1,14 @@
-from .card_resolver import A2ACardResolver
-from .client import A2AClient
+from common.client.card_resolver import (
+    A2ACardResolver,
+    AgentCardCache,
+    resolve_agent_cards,
+)
+from common.client.client import A2AClient
 
 
-__all__ = ['A2ACardResolver', 'A2AClient']
+__all__ = [
+    'A2ACardResolver',
+    'A2AClient',
+    'AgentCardCache',
+    'resolve_agent_cards',
+]
@@ -1,23 +1,206 @@
+import asyncio
 import json
+import re
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from http import HTTPStatus
 
 import httpx
 
+from pydantic import BaseModel
+
 from common.types import (
     A2AClientJSONError,
     AgentCard,
 )
 
 
+DEFAULT_CARD_TTL = 300
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class _CachedCard:
+    card: AgentCard
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+
+class AgentCardCache:
+    """Process-wide cache of agent cards, keyed by card URL.
+
+    Entries are fresh for the server's `Cache-Control: max-age` (or the
+    resolver's TTL); after that the card is revalidated with `If-None-Match`
+    / `If-Modified-Since`, so an unchanged card costs a 304 and no parsing.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _CachedCard] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> _CachedCard | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, entry: _CachedCard) -> None:
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url: str | None = None) -> None:
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+
+
+_default_cache = AgentCardCache()
+
+
 class A2ACardResolver:
-    def __init__(self, base_url, agent_card_path='/.well-known/agent.json'):
+    def __init__(  # noqa: PLR0913
+        self,
+        base_url,
+        agent_card_path='/.well-known/agent.json',
+        *,
+        httpx_client: httpx.AsyncClient | None = None,
+        ttl: float = DEFAULT_CARD_TTL,
+        cache: AgentCardCache | None = None,
+        card_model: type[BaseModel] = AgentCard,
+    ):
         self.base_url = base_url.rstrip('/')
         self.agent_card_path = agent_card_path.lstrip('/')
+        self.httpx_client = httpx_client
+        self.ttl = ttl
+        self.cache = cache if cache is not None else _default_cache
+        # Cards are parsed into this model; use a separate cache for a
+        # model other than AgentCard
+        self.card_model = card_model
+
+    @property
+    def card_url(self) -> str:
+        return self.base_url + '/' + self.agent_card_path
+
+    def _fresh_card(self, force_refresh: bool) -> tuple[AgentCard | None, dict]:
+        """Return the cached card if still fresh.
+
+        Otherwise return the headers for a conditional request.
+        """
+        entry = self.cache.get(self.card_url)
+        if entry is None:
+            return None, {}
+        if not force_refresh and entry.expires_at > time.monotonic():
+            return entry.card.model_copy(), {}
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return None, headers
+
+    def _handle_response(self, response: httpx.Response) -> AgentCard:
+        cache_control = response.headers.get('cache-control', '').lower()
+        max_age = _MAX_AGE.search(cache_control)
+        ttl = int(max_age.group(1)) if max_age else self.ttl
+
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            entry = self.cache.get(self.card_url)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + ttl
+                return entry.card.model_copy()
+
+        response.raise_for_status()
+        try:
+            card = self.card_model(**response.json())
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+        if 'no-store' in cache_control:
+            self.cache.invalidate(self.card_url)
+        else:
+            self.cache.put(
+                self.card_url,
+                _CachedCard(
+                    card=card,
+                    etag=response.headers.get('etag'),
+                    last_modified=response.headers.get('last-modified'),
+                    expires_at=time.monotonic() + ttl,
+                ),
+            )
+        return card.model_copy()
 
-    def get_agent_card(self) -> AgentCard:
+    def get_agent_card(self, force_refresh: bool = False) -> AgentCard:
+        card, headers = self._fresh_card(force_refresh)
+        if card is not None:
+            return card
         with httpx.Client() as client:
-            response = client.get(self.base_url + '/' + self.agent_card_path)
-            response.raise_for_status()
+            response = client.get(self.card_url, headers=headers)
+        return self._handle_response(response)
+
+    async def get_agent_card_async(
+        self, force_refresh: bool = False
+    ) -> AgentCard:
+        card, headers = self._fresh_card(force_refresh)
+        if card is not None:
+            return card
+        if self.httpx_client is not None:
+            response = await self.httpx_client.get(
+                self.card_url, headers=headers
+            )
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(self.card_url, headers=headers)
+        return self._handle_response(response)
+
+
+async def resolve_agent_cards(
+    addresses: Iterable[str],
+    httpx_client: httpx.AsyncClient | None = None,
+    max_concurrency: int = 16,
+    ttl: float = DEFAULT_CARD_TTL,
+    cache: AgentCardCache | None = None,
+) -> dict[str, AgentCard | Exception]:
+    """Resolve many agent cards concurrently over one connection pool.
+
+    Returns a card, or the exception raised while fetching it, per address.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def resolve(
+        client: httpx.AsyncClient, address: str
+    ) -> AgentCard | Exception:
+        resolver = A2ACardResolver(
+            address, httpx_client=client, ttl=ttl, cache=cache
+        )
+        async with semaphore:
             try:
-                return AgentCard(**response.json())
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+                return await resolver.get_agent_card_async()
+            except Exception as e:
+                return e
+
+    async def resolve_all(
+        client: httpx.AsyncClient,
+    ) -> dict[str, AgentCard | Exception]:
+        cards = await asyncio.gather(
+            *(resolve(client, address) for address in addresses)
+        )
+        return dict(zip(addresses, cards, strict=True))
+
+    if httpx_client is not None:
+        return await resolve_all(httpx_client)
+    async with httpx.AsyncClient() as client:
+        return await resolve_all(client)
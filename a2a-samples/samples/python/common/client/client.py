@@ -1,3 +1,4 @@
+import importlib.util
 import json
 
 from collections.abc import AsyncIterable
@@ -6,12 +7,13 @@ from typing import Any
 import httpx
 
 from httpx._types import TimeoutTypes
-from httpx_sse import connect_sse
+from httpx_sse import aconnect_sse
 
 from common.types import (
     A2AClientHTTPError,
     A2AClientJSONError,
     AgentCard,
+    Artifact,
     CancelTaskRequest,
     CancelTaskResponse,
     GetTaskPushNotificationRequest,
@@ -25,15 +27,42 @@ from common.types import (
     SendTaskStreamingResponse,
     SetTaskPushNotificationRequest,
     SetTaskPushNotificationResponse,
+    TaskArtifactUpdateEvent,
 )
+from common.utils.artifact_chunks import ArtifactAssembler, chunk_content
+
+
+DEFAULT_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`)."""
+    return importlib.util.find_spec('h2') is not None
 
 
 class A2AClient:
-    def __init__(
+    """JSON-RPC client for one A2A agent.
+
+    All calls share one pooled `httpx.AsyncClient`, so repeated calls to the
+    same agent reuse keep-alive (and, when `h2` is installed, HTTP/2)
+    connections. Pass `httpx_client` to share a pool between several
+    `A2AClient`s; otherwise the client creates its own on first use and
+    releases it in `aclose()` (or when used as an async context manager).
+    """
+
+    def __init__(  # noqa: PLR0913
         self,
         agent_card: AgentCard = None,
         url: str = None,
         timeout: TimeoutTypes = 60.0,
+        *,
+        httpx_client: httpx.AsyncClient | None = None,
+        limits: httpx.Limits = DEFAULT_POOL_LIMITS,
+        http2: bool = True,
     ):
         if agent_card:
             self.url = agent_card.url
@@ -42,61 +71,140 @@ class A2AClient:
         else:
             raise ValueError('Must provide either agent_card or url')
         self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2 and _http2_available()
+        self._client = httpx_client
+        self._owns_client = httpx_client is None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits, http2=self.http2, timeout=self.timeout
+            )
+            self._owns_client = True
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the connection pool if this client created it."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-    async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
+    async def __aenter__(self) -> 'A2AClient':
+        """Use the client as an async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the connection pool if this client created it."""
+        await self.aclose()
+
+    async def send_task(
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
+    ) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return SendTaskResponse(**await self._send_request(request, timeout))
 
     async def send_task_streaming(
-        self, payload: dict[str, Any]
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
     ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Stream task updates over SSE without blocking the event loop.
+
+        `timeout` applies to connecting and sending; by default there is no
+        read timeout since agents may stay quiet between updates.
+        """
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, 'POST', self.url, json=request.model_dump()
+        if timeout is None:
+            timeout = httpx.Timeout(self.timeout, read=None)
+        try:
+            async with aconnect_sse(
+                self.client,
+                'POST',
+                self.url,
+                json=request.model_dump(),
+                timeout=timeout,
             ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
-
-    async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
+                event_source.response.raise_for_status()
+                async for sse in event_source.aiter_sse():
+                    yield SendTaskStreamingResponse(**json.loads(sse.data))
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+
+    async def _send_request(
+        self, request: JSONRPCRequest, timeout: TimeoutTypes | None = None
+    ) -> dict[str, Any]:
+        try:
+            # Image generation could take time, adding timeout
+            response = await self.client.post(
+                self.url,
+                json=request.model_dump(),
+                timeout=self.timeout if timeout is None else timeout,
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+    async def get_task(
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
+    ) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
-        return GetTaskResponse(**await self._send_request(request))
+        return GetTaskResponse(**await self._send_request(request, timeout))
 
-    async def cancel_task(self, payload: dict[str, Any]) -> CancelTaskResponse:
+    async def cancel_task(
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
+    ) -> CancelTaskResponse:
         request = CancelTaskRequest(params=payload)
-        return CancelTaskResponse(**await self._send_request(request))
+        return CancelTaskResponse(**await self._send_request(request, timeout))
 
     async def set_task_callback(
-        self, payload: dict[str, Any]
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
     ) -> SetTaskPushNotificationResponse:
         request = SetTaskPushNotificationRequest(params=payload)
         return SetTaskPushNotificationResponse(
-            **await self._send_request(request)
+            **await self._send_request(request, timeout)
         )
 
     async def get_task_callback(
-        self, payload: dict[str, Any]
+        self, payload: dict[str, Any], timeout: TimeoutTypes | None = None
     ) -> GetTaskPushNotificationResponse:
         request = GetTaskPushNotificationRequest(params=payload)
         return GetTaskPushNotificationResponse(
-            **await self._send_request(request)
+            **await self._send_request(request, timeout)
         )
+
+    @staticmethod
+    async def assemble_artifacts(
+        responses: AsyncIterable[SendTaskStreamingResponse],
+    ) -> list[Artifact]:
+        """Consume a task stream and return its artifacts with chunks joined."""
+        assembler = ArtifactAssembler()
+        async for response in responses:
+            if isinstance(response.result, TaskArtifactUpdateEvent):
+                assembler.add(response.result.artifact)
+        return assembler.artifacts()
+
+    @staticmethod
+    async def iter_artifact_content(
+        responses: AsyncIterable[SendTaskStreamingResponse], index: int = 0
+    ) -> AsyncIterable[str | bytes]:
+        """Yield the text or bytes of one artifact's chunks as they arrive.
+
+        Stops after the artifact's last chunk.
+        """
+        async for response in responses:
+            if not isinstance(response.result, TaskArtifactUpdateEvent):
+                continue
+            artifact = response.result.artifact
+            if artifact.index != index:
+                continue
+            for content in chunk_content(artifact):
+                yield content
+            if artifact.lastChunk:
+                return
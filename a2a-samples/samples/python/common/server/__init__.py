@@ -1,5 +1,26 @@
-from .server import A2AServer
-from .task_manager import InMemoryTaskManager, TaskManager
+from common.server.event_log import EventLog, InMemoryEventLog, SQLiteEventLog
+from common.server.server import A2AServer
+from common.server.sse_queue import SlowConsumerPolicy, SubscriberQueue
+from common.server.task_manager import InMemoryTaskManager, TaskManager
+from common.server.task_store import (
+    InMemoryTaskStore,
+    RetentionPolicy,
+    SQLiteTaskStore,
+    TaskStore,
+)
 
 
-__all__ = ['A2AServer', 'InMemoryTaskManager', 'TaskManager']
+__all__ = [
+    'A2AServer',
+    'EventLog',
+    'InMemoryEventLog',
+    'InMemoryTaskManager',
+    'InMemoryTaskStore',
+    'RetentionPolicy',
+    'SQLiteEventLog',
+    'SQLiteTaskStore',
+    'SlowConsumerPolicy',
+    'SubscriberQueue',
+    'TaskManager',
+    'TaskStore',
+]
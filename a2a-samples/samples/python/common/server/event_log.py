@@ -0,0 +1,243 @@
+"""Per-task logs of streamed events, replayed on `tasks/resubscribe`.
+
+Every event sent to SSE subscribers is appended to the task's log with a
+sequence number that increases by one per event. The number is sent as the
+SSE `id`, so a reconnecting client can pass it back (as the `Last-Event-ID`
+header, or `lastEventId` in the request metadata) and receive only what it
+missed.
+"""
+
+import asyncio
+import sqlite3
+import threading
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from pydantic import PrivateAttr
+
+from common.types import (
+    JSONRPCError,
+    SendTaskStreamingResponse,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskStatusUpdateEvent,
+)
+
+
+T = TypeVar('T')
+
+StreamEvent = TaskStatusUpdateEvent | TaskArtifactUpdateEvent | JSONRPCError
+
+LAST_EVENT_ID_KEY = 'lastEventId'
+
+_EVENT_TYPES = {
+    'status': TaskStatusUpdateEvent,
+    'artifact': TaskArtifactUpdateEvent,
+    'error': JSONRPCError,
+}
+
+
+class SequencedStreamingResponse(SendTaskStreamingResponse):
+    """Streaming response that carries its event log sequence number.
+
+    `A2AServer` sends the number as the SSE `id`.
+    """
+
+    _event_seq: int | None = PrivateAttr(default=None)
+
+    @property
+    def event_seq(self) -> int | None:
+        return self._event_seq
+
+    @classmethod
+    def for_event(
+        cls, request_id: int | str | None, event: StreamEvent, seq: int | None
+    ) -> 'SequencedStreamingResponse':
+        if isinstance(event, JSONRPCError):
+            response = cls(id=request_id, error=event)
+        else:
+            response = cls(id=request_id, result=event)
+        response._event_seq = seq
+        return response
+
+
+def last_event_id(params: TaskIdParams) -> int | None:
+    """Read the client's last seen sequence number from request metadata."""
+    value = (params.metadata or {}).get(LAST_EVENT_ID_KEY)
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _event_kind(event: StreamEvent) -> str:
+    for kind, event_type in _EVENT_TYPES.items():
+        if isinstance(event, event_type):
+            return kind
+    raise TypeError(f'Unsupported event type: {type(event)}')
+
+
+class EventLog(ABC):
+    """Bounded, append-only log of the events streamed for each task."""
+
+    def __init__(self, max_events_per_task: int = 256):
+        self.max_events_per_task = max(1, max_events_per_task)
+
+    @abstractmethod
+    async def append(self, task_id: str, event: StreamEvent) -> int:
+        """Record an event and return its sequence number (starting at 1)."""
+
+    @abstractmethod
+    async def since(
+        self, task_id: str, after_seq: int
+    ) -> tuple[list[tuple[int, StreamEvent]], int]:
+        """Return the retained events after `after_seq`.
+
+        Returns:
+            The `(seq, event)` pairs still in the log, and how many events
+            after `after_seq` have already been evicted.
+        """
+
+    @abstractmethod
+    async def discard(self, task_id: str) -> None:
+        """Forget a task's events."""
+
+
+class InMemoryEventLog(EventLog):
+    """Ring buffer of the latest events for each of the latest `max_tasks`.
+
+    A task's buffer may be evicted, but its sequence counter is kept until
+    `discard`, so sequence numbers never go backwards while the task exists.
+    """
+
+    def __init__(self, max_events_per_task: int = 256, max_tasks: int = 1000):
+        super().__init__(max_events_per_task)
+        self.max_tasks = max_tasks
+        self._logs: OrderedDict[str, deque] = OrderedDict()
+        self._last_seq: dict[str, int] = {}
+
+    async def append(self, task_id: str, event: StreamEvent) -> int:
+        events = self._logs.get(task_id)
+        if events is None:
+            events = self._logs[task_id] = deque(
+                maxlen=self.max_events_per_task
+            )
+            while len(self._logs) > self.max_tasks:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(task_id)
+        seq = self._last_seq[task_id] = self._last_seq.get(task_id, 0) + 1
+        events.append((seq, event))
+        return seq
+
+    async def since(
+        self, task_id: str, after_seq: int
+    ) -> tuple[list[tuple[int, StreamEvent]], int]:
+        events = self._logs.get(task_id)
+        if not events:
+            # Either nothing was logged or the buffer has been evicted
+            return [], max(0, self._last_seq.get(task_id, 0) - after_seq)
+        retained = [(seq, event) for seq, event in events if seq > after_seq]
+        return retained, max(0, events[0][0] - after_seq - 1)
+
+    async def discard(self, task_id: str) -> None:
+        self._logs.pop(task_id, None)
+        self._last_seq.pop(task_id, None)
+
+
+class SQLiteEventLog(EventLog):
+    """Event log persisted to SQLite, so replay survives a server restart."""
+
+    def __init__(
+        self,
+        path: str | Path = 'task_events.sqlite3',
+        max_events_per_task: int = 256,
+    ):
+        super().__init__(max_events_per_task)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS task_events ('
+            ' task_id TEXT NOT NULL,'
+            ' seq INTEGER NOT NULL,'
+            ' kind TEXT NOT NULL,'
+            ' event TEXT NOT NULL,'
+            ' PRIMARY KEY (task_id, seq))'
+        )
+        self._lock = threading.Lock()
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        def locked() -> T:
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    def _append(self, task_id: str, kind: str, payload: str) -> int:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            (seq,) = self._conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) + 1 FROM task_events'
+                ' WHERE task_id = ?',
+                (task_id,),
+            ).fetchone()
+            self._conn.execute(
+                'INSERT INTO task_events (task_id, seq, kind, event)'
+                ' VALUES (?, ?, ?, ?)',
+                (task_id, seq, kind, payload),
+            )
+            self._conn.execute(
+                'DELETE FROM task_events WHERE task_id = ? AND seq <= ?',
+                (task_id, seq - self.max_events_per_task),
+            )
+        return seq
+
+    def _since(
+        self, task_id: str, after_seq: int
+    ) -> tuple[list[tuple[int, StreamEvent]], int]:
+        rows = self._conn.execute(
+            'SELECT seq, kind, event FROM task_events'
+            ' WHERE task_id = ? AND seq > ? ORDER BY seq',
+            (task_id, after_seq),
+        ).fetchall()
+        events = [
+            (seq, _EVENT_TYPES[kind].model_validate_json(payload))
+            for seq, kind, payload in rows
+        ]
+        first_seq = rows[0][0] if rows else after_seq + 1
+        return events, max(0, first_seq - after_seq - 1)
+
+    def _discard(self, task_id: str) -> None:
+        self._conn.execute(
+            'DELETE FROM task_events WHERE task_id = ?', (task_id,)
+        )
+
+    async def append(self, task_id: str, event: StreamEvent) -> int:
+        kind = _event_kind(event)
+        return await self._run(
+            self._append,
+            task_id,
+            kind,
+            event.model_dump_json(exclude_none=True),
+        )
+
+    async def since(
+        self, task_id: str, after_seq: int
+    ) -> tuple[list[tuple[int, StreamEvent]], int]:
+        return await self._run(self._since, task_id, after_seq)
+
+    async def discard(self, task_id: str) -> None:
+        await self._run(self._discard, task_id)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,3 +1,5 @@
+import asyncio
+import hashlib
 import json
 import logging
 
@@ -8,11 +10,11 @@ from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
+from common.server.event_log import LAST_EVENT_ID_KEY
 from common.server.task_manager import TaskManager
 from common.types import (
-    A2ARequest,
     AgentCard,
     CancelTaskRequest,
     GetTaskPushNotificationRequest,
@@ -20,31 +22,99 @@ from common.types import (
     InternalError,
     InvalidRequestError,
     JSONParseError,
+    JSONRPCError,
     JSONRPCResponse,
+    MethodNotFoundError,
     SendTaskRequest,
     SendTaskStreamingRequest,
     SetTaskPushNotificationRequest,
     TaskResubscriptionRequest,
 )
+from common.utils.artifact_store import LocalArtifactStore
+
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 
 logger = logging.getLogger(__name__)
 
+# JSON-RPC method -> (request model, TaskManager handler)
+_ROUTES = {
+    request_model.model_fields['method'].default: (request_model, handler)
+    for request_model, handler in (
+        (GetTaskRequest, 'on_get_task'),
+        (SendTaskRequest, 'on_send_task'),
+        (SendTaskStreamingRequest, 'on_send_task_subscribe'),
+        (CancelTaskRequest, 'on_cancel_task'),
+        (SetTaskPushNotificationRequest, 'on_set_task_push_notification'),
+        (GetTaskPushNotificationRequest, 'on_get_task_push_notification'),
+        (TaskResubscriptionRequest, 'on_resubscribe_to_task'),
+    )
+}
+_STREAMING_METHODS = frozenset(
+    request_model.model_fields['method'].default
+    for request_model in (SendTaskStreamingRequest, TaskResubscriptionRequest)
+)
+
+
+def _request_id(body: object) -> str | int | None:
+    if isinstance(body, dict):
+        request_id = body.get('id')
+        if isinstance(request_id, str | int):
+            return request_id
+    return None
+
+
+class _RequestError(Exception):
+    """Raised while dispatching to reply with a specific JSON-RPC error."""
+
+    def __init__(self, error: JSONRPCError):
+        super().__init__(error.message)
+        self.error = error
+
+
+def _error_for(e: Exception) -> JSONRPCError:
+    if isinstance(e, _RequestError):
+        return e.error
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    if isinstance(e, json.JSONDecodeError | UnicodeDecodeError):
+        return JSONParseError()
+    if isinstance(e, ValidationError):
+        return InvalidRequestError(data=json.loads(e.json()))
+    logger.error(f'Unhandled exception: {e}')
+    return InternalError()
+
 
 class A2AServer:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         host='0.0.0.0',
         port=5000,
         endpoint='/',
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        *,
+        sse_ping_interval: float = 15,
+        sse_send_timeout: float | None = 30,
+        agent_card_max_age: int = 300,
+        artifact_store: LocalArtifactStore | None = None,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
+        # Keepalive comments stop proxies from closing idle streams; a send
+        # that blocks longer than the timeout means the client is gone
+        self.sse_ping_interval = sse_ping_interval
+        self.sse_send_timeout = sse_send_timeout
+        self.agent_card_max_age = agent_card_max_age
+        self._agent_card_body: tuple[AgentCard, bytes, str] | None = None
         self.app = Starlette()
         self.app.add_route(
             self.endpoint, self._process_request, methods=['POST']
@@ -52,6 +122,9 @@ class A2AServer:
         self.app.add_route(
             '/.well-known/agent.json', self._get_agent_card, methods=['GET']
         )
+        self.artifact_store = artifact_store
+        if artifact_store is not None:
+            artifact_store.mount(self.app)
 
     def start(self):
         if self.agent_card is None:
@@ -64,74 +137,148 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _serialized_agent_card(self) -> tuple[bytes, str]:
+        """Serialize the agent card and derive its ETag from the content.
+
+        The card is serialized once, and again only if it is replaced.
+        """
+        cached = self._agent_card_body
+        if cached is None or cached[0] is not self.agent_card:
+            body = self.agent_card.model_dump_json(exclude_none=True).encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            cached = self._agent_card_body = (self.agent_card, body, etag)
+        return cached[1], cached[2]
+
+    def _get_agent_card(self, request: Request) -> Response:
+        body, etag = self._serialized_agent_card()
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={self.agent_card_max_age}',
+        }
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
 
-    async def _process_request(self, request: Request):
+    async def _process_request(
+        self, request: Request
+    ) -> Response | EventSourceResponse:
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
+            body = _json_loads(await request.body())
+        except Exception as e:
+            return self._handle_exception(e)
+
+        if isinstance(body, list):
+            return await self._process_batch(request, body)
+
+        try:
+            result = await self._dispatch(request, body)
+            return self._create_response(result)
+        except Exception as e:
+            return self._handle_exception(e, _request_id(body))
+
+    async def _dispatch(
+        self, request: Request, body: object
+    ) -> JSONRPCResponse | AsyncIterable[JSONRPCResponse]:
+        """Validate one JSON-RPC request and call its task manager handler.
+
+        The request is validated against its method's model.
+        """
+        if not isinstance(body, dict):
+            raise _RequestError(
+                InvalidRequestError(message='Request must be a JSON object')
+            )
+        route = _ROUTES.get(body.get('method'))
+        if route is None:
+            raise _RequestError(MethodNotFoundError())
+
+        request_model, handler_name = route
+        json_rpc_request = request_model.model_validate(body)
+        if isinstance(json_rpc_request, TaskResubscriptionRequest):
+            self._apply_last_event_id(request, json_rpc_request)
+        return await getattr(self.task_manager, handler_name)(json_rpc_request)
+
+    async def _process_batch(self, request: Request, batch: list) -> Response:
+        """Handle a JSON-RPC batch, running its entries concurrently.
+
+        Streaming methods are rejected since their results can't be batched.
+        """
+        if not batch:
+            return self._handle_exception(
+                _RequestError(InvalidRequestError(message='Empty batch'))
+            )
+
+        async def run(body: object) -> bytes:
+            if (
+                isinstance(body, dict)
+                and body.get('method') in _STREAMING_METHODS
+            ):
+                response = JSONRPCResponse(
+                    id=_request_id(body),
+                    error=InvalidRequestError(
+                        message='Streaming methods cannot be batched'
+                    ),
                 )
             else:
-                logger.warning(
-                    f'Unexpected request type: {type(json_rpc_request)}'
-                )
-                raise ValueError(f'Unexpected request type: {type(request)}')
+                try:
+                    response = await self._dispatch(request, body)
+                    if not isinstance(response, JSONRPCResponse):
+                        raise ValueError(
+                            f'Unexpected result type: {type(response)}'
+                        )
+                except Exception as e:
+                    response = JSONRPCResponse(
+                        id=_request_id(body), error=_error_for(e)
+                    )
+            return response.model_dump_json(exclude_none=True).encode()
 
-            return self._create_response(result)
+        responses = await asyncio.gather(*(run(body) for body in batch))
+        return Response(
+            b'[' + b','.join(responses) + b']', media_type='application/json'
+        )
 
-        except Exception as e:
-            return self._handle_exception(e)
+    def _apply_last_event_id(
+        self, request: Request, json_rpc_request: TaskResubscriptionRequest
+    ) -> None:
+        """Pass an SSE reconnect's Last-Event-ID on to the task manager."""
+        last_event_id = request.headers.get('last-event-id')
+        if not last_event_id:
+            return
+        metadata = dict(json_rpc_request.params.metadata or {})
+        metadata.setdefault(LAST_EVENT_ID_KEY, last_event_id)
+        json_rpc_request.params.metadata = metadata
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
-        if isinstance(e, json.decoder.JSONDecodeError):
-            json_rpc_error = JSONParseError()
-        elif isinstance(e, ValidationError):
-            json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
-        else:
-            logger.error(f'Unhandled exception: {e}')
-            json_rpc_error = InternalError()
-
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(
-            response.model_dump(exclude_none=True), status_code=400
+    def _handle_exception(
+        self, e: Exception, request_id: str | int | None = None
+    ) -> Response:
+        response = JSONRPCResponse(id=request_id, error=_error_for(e))
+        return Response(
+            response.model_dump_json(exclude_none=True),
+            status_code=400,
+            media_type='application/json',
         )
 
-    def _create_response(
-        self, result: Any
-    ) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
                 async for item in result:
-                    yield {'data': item.model_dump_json(exclude_none=True)}
+                    event = {'data': item.model_dump_json(exclude_none=True)}
+                    event_seq = getattr(item, 'event_seq', None)
+                    if event_seq is not None:
+                        event['id'] = str(event_seq)
+                    yield event
 
-            return EventSourceResponse(event_generator(result))
+            return EventSourceResponse(
+                event_generator(result),
+                ping=self.sse_ping_interval,
+                send_timeout=self.sse_send_timeout,
+            )
         if isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            # Serialize straight to JSON bytes instead of building a dict first
+            return Response(
+                result.model_dump_json(exclude_none=True),
+                media_type='application/json',
+            )
         logger.error(f'Unexpected result type: {type(result)}')
         raise ValueError(f'Unexpected result type: {type(result)}')
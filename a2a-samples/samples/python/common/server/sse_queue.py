@@ -0,0 +1,231 @@
+"""Bounded per-subscriber event queues for SSE streams.
+
+Each streaming client gets a `SubscriberQueue`. When a client reads slower
+than the agent produces events, the queue applies a `SlowConsumerPolicy`
+instead of growing without bound:
+
+- `DROP_OLDEST` discards the oldest queued events and tells the client how
+  many it missed with a gap marker (a status update whose metadata carries
+  `{'gap': True, 'droppedEvents': n}`).
+- `COALESCE` first discards a queued status update that a newer status
+  (queued or incoming) supersedes, and otherwise drops the oldest event
+  with a gap marker like `DROP_OLDEST`.
+- `DISCONNECT` ends the stream with an error so the client can resubscribe.
+
+Final status updates and errors are always delivered.
+"""
+
+import asyncio
+
+from collections import deque
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+from common.server.event_log import StreamEvent
+from common.types import (
+    InternalError,
+    JSONRPCError,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+
+class SlowConsumerPolicy(StrEnum):
+    """What a full subscriber queue does with an incoming event."""
+
+    DROP_OLDEST = 'drop_oldest'
+    COALESCE = 'coalesce'
+    DISCONNECT = 'disconnect'
+
+
+@dataclass
+class SSEMetrics:
+    """Counters shared by all subscriber queues of one task manager."""
+
+    enqueued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    disconnected: int = 0
+    max_depth: int = 0
+    depths: dict[int, int] = field(default_factory=dict, repr=False)
+
+    def snapshot(self) -> dict[str, Any]:
+        depths = list(self.depths.values())
+        return {
+            'subscribers': len(depths),
+            'queued': sum(depths),
+            'max_queue_depth': max(depths, default=0),
+            'max_depth_seen': self.max_depth,
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'disconnected': self.disconnected,
+        }
+
+
+def _must_deliver(event: StreamEvent) -> bool:
+    return isinstance(event, JSONRPCError) or (
+        isinstance(event, TaskStatusUpdateEvent) and event.final
+    )
+
+
+class SubscriberQueue:
+    """Queue of task events for one SSE subscriber, bounded to `maxsize`."""
+
+    def __init__(
+        self,
+        task_id: str,
+        maxsize: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        metrics: SSEMetrics | None = None,
+    ):
+        self.task_id = task_id
+        self.maxsize = max(1, maxsize)
+        self.policy = SlowConsumerPolicy(policy)
+        self.metrics = metrics or SSEMetrics()
+        self.closed = False
+        self._events: deque = deque()
+        self._not_empty = asyncio.Event()
+        self._gap = 0
+        self._gap_status: TaskStatus | None = None
+        self._last_delivered_status: TaskStatus | None = None
+
+    def qsize(self) -> int:
+        return len(self._events) + (1 if self._gap else 0)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put_nowait(self, event: StreamEvent, seq: int | None = None) -> bool:
+        """Queue an event, applying the slow consumer policy when full.
+
+        `seq` is the event's position in the task's event log, if any. Never
+        blocks. Returns False if the event was not queued because the
+        subscriber has been disconnected.
+        """
+        if self.closed:
+            return False
+        if (
+            len(self._events) >= self.maxsize
+            and not _must_deliver(event)
+            and not self._make_room(event)
+        ):
+            return False
+
+        self._events.append((seq, event))
+        self.metrics.enqueued += 1
+        self._record_depth()
+        self._not_empty.set()
+        return True
+
+    def _make_room(self, incoming: StreamEvent) -> bool:
+        if self.policy == SlowConsumerPolicy.DISCONNECT:
+            self.metrics.dropped += len(self._events)
+            self._events.clear()
+            self._gap = 0
+            self._events.append(
+                (
+                    None,
+                    InternalError(
+                        message='Subscriber fell too far behind;'
+                        ' resubscribe to continue'
+                    ),
+                )
+            )
+            self.closed = True
+            self.metrics.disconnected += 1
+            self._record_depth()
+            self._not_empty.set()
+            return False
+
+        if self.policy == SlowConsumerPolicy.COALESCE:
+            i = self._superseded_status(incoming)
+            if i is not None:
+                del self._events[i]
+                self.metrics.coalesced += 1
+                return True
+
+        for i, (_, queued) in enumerate(self._events):
+            if not _must_deliver(queued):
+                del self._events[i]
+                if isinstance(queued, TaskStatusUpdateEvent):
+                    self._gap_status = queued.status
+                self._gap += 1
+                self.metrics.dropped += 1
+                return True
+        # Only undroppable events are queued; let the queue exceed maxsize
+        return True
+
+    def _superseded_status(self, incoming: StreamEvent) -> int | None:
+        """Find a queued status update that a newer status replaces.
+
+        Returns the index of the oldest queued non-final status, or None if
+        dropping any would lose the latest state.
+        """
+        oldest = None
+        for i, (_, queued) in enumerate(self._events):
+            if not isinstance(queued, TaskStatusUpdateEvent):
+                continue
+            if oldest is not None:
+                return oldest
+            if not queued.final:
+                oldest = i
+        if isinstance(incoming, TaskStatusUpdateEvent):
+            return oldest
+        return None
+
+    def _record_depth(self) -> None:
+        depth = self.qsize()
+        self.metrics.depths[id(self)] = depth
+        self.metrics.max_depth = max(self.metrics.max_depth, depth)
+
+    def _gap_marker(self) -> TaskStatusUpdateEvent:
+        status = (
+            self._gap_status
+            or self._last_delivered_status
+            or TaskStatus(state=TaskState.UNKNOWN)
+        )
+        marker = TaskStatusUpdateEvent(
+            id=self.task_id,
+            status=status,
+            final=False,
+            metadata={'gap': True, 'droppedEvents': self._gap},
+        )
+        self._gap = 0
+        self._gap_status = None
+        return marker
+
+    async def get_entry(self) -> tuple[int | None, StreamEvent]:
+        """Wait for the next `(seq, event)`.
+
+        After drops, a gap marker (with seq None) comes first.
+        """
+        while not self._events and not self._gap:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        # Dropped events were the oldest ones, so the gap precedes the queue
+        if self._gap:
+            seq, event = None, self._gap_marker()
+        else:
+            seq, event = self._events.popleft()
+        if isinstance(event, TaskStatusUpdateEvent):
+            self._last_delivered_status = event.status
+        self.metrics.delivered += 1
+        self._record_depth()
+        return seq, event
+
+    async def get(self) -> StreamEvent:
+        """Wait for the next event."""
+        _, event = await self.get_entry()
+        return event
+
+    def detach(self) -> None:
+        """Stop accepting events and forget this queue's depth."""
+        self.closed = True
+        self._events.clear()
+        self.metrics.depths.pop(id(self), None)
@@ -2,9 +2,25 @@ import asyncio
 import logging
 
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Iterable
 
-from common.server.utils import new_not_implemented_error
+from common.server.event_log import (
+    EventLog,
+    InMemoryEventLog,
+    SequencedStreamingResponse,
+    last_event_id,
+)
+from common.server.sse_queue import (
+    SSEMetrics,
+    SlowConsumerPolicy,
+    SubscriberQueue,
+)
+from common.server.task_store import (
+    InMemoryTaskStore,
+    TaskStore,
+    history_window,
+    is_terminal,
+)
 from common.types import (
     Artifact,
     CancelTaskRequest,
@@ -24,6 +40,7 @@ from common.types import (
     SetTaskPushNotificationRequest,
     SetTaskPushNotificationResponse,
     Task,
+    TaskArtifactUpdateEvent,
     TaskIdParams,
     TaskNotCancelableError,
     TaskNotFoundError,
@@ -81,25 +98,58 @@ class TaskManager(ABC):
 
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
-        self.push_notification_infos: dict[str, PushNotificationConfig] = {}
-        self.lock = asyncio.Lock()
-        self.task_sse_subscribers: dict[str, list[asyncio.Queue]] = {}
+    """Task manager that keeps SSE subscribers in memory.
+
+    Tasks and push notification configs live in `task_store`, which defaults
+    to a bounded `InMemoryTaskStore`; pass a `SQLiteTaskStore` to keep them
+    across restarts.
+
+    Writes to a task are serialized by one of `lock_stripes` locks chosen by
+    task id, so a busy task only contends with the few tasks sharing its
+    stripe. Reads take no lock: they return a snapshot built from whatever
+    the store holds at that moment.
+
+    Each SSE subscriber buffers at most `sse_queue_size` events; see
+    `SubscriberQueue` for what `slow_consumer_policy` does beyond that.
+    Streamed events are also recorded in `event_log`, so `tasks/resubscribe`
+    can replay what a reconnecting client missed.
+    """
+
+    def __init__(
+        self,
+        task_store: TaskStore | None = None,
+        lock_stripes: int = 64,
+        sse_queue_size: int = 256,
+        slow_consumer_policy: SlowConsumerPolicy = (
+            SlowConsumerPolicy.DROP_OLDEST
+        ),
+        event_log: EventLog | None = None,
+    ):
+        self.task_store = task_store or InMemoryTaskStore()
+        self.event_log = event_log or InMemoryEventLog()
+        # Keep the event log from outliving the tasks it records
+        self.task_store.add_removal_listener(self.event_log.discard)
+        self._task_locks = [asyncio.Lock() for _ in range(max(1, lock_stripes))]
+        # Kept apart from the task locks so events can be enqueued while
+        # holding task_lock
+        self._event_locks = [
+            asyncio.Lock() for _ in range(max(1, lock_stripes))
+        ]
+        self.task_sse_subscribers: dict[str, list[SubscriberQueue]] = {}
         self.subscriber_lock = asyncio.Lock()
+        self.sse_queue_size = sse_queue_size
+        self.slow_consumer_policy = SlowConsumerPolicy(slow_consumer_policy)
+        self.sse_metrics = SSEMetrics()
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f'Getting task {request.params.id}')
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_query_params.id)
-            if task is None:
-                return GetTaskResponse(id=request.id, error=TaskNotFoundError())
-
-            task_result = self.append_task_history(
-                task, task_query_params.historyLength
-            )
+        task_result = await self.task_store.get_window(
+            task_query_params.id, task_query_params.historyLength
+        )
+        if task_result is None:
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
 
         return GetTaskResponse(id=request.id, result=task_result)
 
@@ -109,12 +159,9 @@ class InMemoryTaskManager(TaskManager):
         logger.info(f'Cancelling task {request.params.id}')
         task_id_params: TaskIdParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
-            if task is None:
-                return CancelTaskResponse(
-                    id=request.id, error=TaskNotFoundError()
-                )
+        task = await self.task_store.get(task_id_params.id)
+        if task is None:
+            return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
 
         return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
 
@@ -131,26 +178,31 @@ class InMemoryTaskManager(TaskManager):
     async def set_push_notification_info(
         self, task_id: str, notification_config: PushNotificationConfig
     ):
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.task_store.get(task_id)
             if task is None:
                 raise ValueError(f'Task not found for {task_id}')
 
-            self.push_notification_infos[task_id] = notification_config
+            await self.task_store.set_push_notification(
+                task_id, notification_config
+            )
 
     async def get_push_notification_info(
         self, task_id: str
     ) -> PushNotificationConfig:
-        async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
-                raise ValueError(f'Task not found for {task_id}')
+        task = await self.task_store.get(task_id)
+        if task is None:
+            raise ValueError(f'Task not found for {task_id}')
 
-            return self.push_notification_infos[task_id]
+        notification_config = await self.task_store.get_push_notification(
+            task_id
+        )
+        if notification_config is None:
+            raise KeyError(task_id)
+        return notification_config
 
     async def has_push_notification_info(self, task_id: str) -> bool:
-        async with self.lock:
-            return task_id in self.push_notification_infos
+        return await self.task_store.get_push_notification(task_id) is not None
 
     async def on_set_task_push_notification(
         self, request: SetTaskPushNotificationRequest
@@ -204,8 +256,8 @@ class InMemoryTaskManager(TaskManager):
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f'Upserting task {task_send_params.id}')
-        async with self.lock:
-            task = self.tasks.get(task_send_params.id)
+        async with self.task_lock(task_send_params.id):
+            task = await self.task_store.get(task_send_params.id)
             if task is None:
                 task = Task(
                     id=task_send_params.id,
@@ -214,47 +266,141 @@ class InMemoryTaskManager(TaskManager):
                     status=TaskStatus(state=TaskState.SUBMITTED),
                     history=[task_send_params.message],
                 )
-                self.tasks[task_send_params.id] = task
-            else:
-                task.history.append(task_send_params.message)
+                return await self.task_store.create(task)
 
-            return task
+            return await self.task_store.append_message(
+                task_send_params.id, task_send_params.message
+            )
 
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-        return new_not_implemented_error(request.id)
+        task_id_params: TaskIdParams = request.params
+        logger.info(f'Resubscribing to task {task_id_params.id}')
+        if await self.task_store.get(task_id_params.id) is None:
+            return JSONRPCResponse(id=request.id, error=TaskNotFoundError())
+
+        # Subscribe before reading the log so nothing falls in between;
+        # events seen in both are deduplicated by sequence number
+        sse_event_queue = await self.setup_sse_consumer(task_id_params.id)
+        return self._replay_and_stream(
+            request.id,
+            task_id_params.id,
+            sse_event_queue,
+            last_event_id(task_id_params),
+        )
+
+    async def _replay_and_stream(
+        self,
+        request_id,
+        task_id: str,
+        sse_event_queue: SubscriberQueue,
+        after_seq: int | None,
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        try:
+            task = await self.task_store.get(task_id)
+            if task is None:
+                yield SendTaskStreamingResponse(
+                    id=request_id, error=TaskNotFoundError()
+                )
+                return
+
+            last_seq = after_seq
+            if after_seq is not None:
+                backlog, missed = await self.event_log.since(task_id, after_seq)
+                if missed:
+                    yield SendTaskStreamingResponse(
+                        id=request_id,
+                        result=TaskStatusUpdateEvent(
+                            id=task_id,
+                            status=task.status,
+                            metadata={'gap': True, 'droppedEvents': missed},
+                        ),
+                    )
+                for seq, event in backlog:
+                    last_seq = seq
+                    yield SequencedStreamingResponse.for_event(
+                        request_id, event, seq
+                    )
+                    if isinstance(event, JSONRPCError) or (
+                        isinstance(event, TaskStatusUpdateEvent) and event.final
+                    ):
+                        return
+
+            if is_terminal(task.status):
+                # Nothing more will be streamed; close with the final state
+                yield SendTaskStreamingResponse(
+                    id=request_id,
+                    result=TaskStatusUpdateEvent(
+                        id=task_id, status=task.status, final=True
+                    ),
+                )
+                return
+            if after_seq is None:
+                # Fresh subscriber: start from the current state
+                yield SendTaskStreamingResponse(
+                    id=request_id,
+                    result=TaskStatusUpdateEvent(
+                        id=task_id, status=task.status
+                    ),
+                )
+
+            async for response in self.dequeue_events_for_sse(
+                request_id, task_id, sse_event_queue, after_seq=last_seq
+            ):
+                yield response
+        finally:
+            await self._remove_sse_consumer(task_id, sse_event_queue)
 
     async def update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
+        async with self.task_lock(task_id):
             try:
-                task = self.tasks[task_id]
-            except KeyError:
+                return await self.task_store.update(task_id, status, artifacts)
+            except ValueError:
                 logger.error(f'Task {task_id} not found for updating the task')
-                raise ValueError(f'Task {task_id} not found')
-
-            task.status = status
+                raise
+
+    async def stream_artifact(
+        self,
+        task_id: str,
+        chunks: AsyncIterable[Artifact] | Iterable[Artifact],
+        status: TaskStatus | None = None,
+    ) -> None:
+        """Store and send artifact chunks one by one as they are produced.
+
+        See `common.utils.artifact_chunks` for making the chunks.
+
+        `status` is recorded with every chunk; it defaults to `working`.
+        """
+        status = status or TaskStatus(state=TaskState.WORKING)
+
+        async def send(chunk: Artifact) -> None:
+            await self.update_store(task_id, status, [chunk])
+            await self.enqueue_events_for_sse(
+                task_id, TaskArtifactUpdateEvent(id=task_id, artifact=chunk)
+            )
 
-            if status.message is not None:
-                task.history.append(status.message)
+        if isinstance(chunks, AsyncIterable):
+            async for chunk in chunks:
+                await send(chunk)
+        else:
+            for chunk in chunks:
+                await send(chunk)
 
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
+    def task_lock(self, task_id: str) -> asyncio.Lock:
+        """Return the lock guarding writes to `task_id`.
 
-            return task
+        The lock is not reentrant and is shared with other tasks on the
+        same stripe, so never wait on another `task_lock` while holding
+        one. `enqueue_events_for_sse` does not take it and is safe to call
+        under it.
+        """
+        return self._task_locks[hash(task_id) % len(self._task_locks)]
 
     def append_task_history(self, task: Task, historyLength: int | None):
-        new_task = task.model_copy()
-        if historyLength is not None and historyLength > 0:
-            new_task.history = new_task.history[-historyLength:]
-        else:
-            new_task.history = []
-
-        return new_task
+        return history_window(task, historyLength)
 
     async def setup_sse_consumer(
         self, task_id: str, is_resubscribe: bool = False
@@ -265,33 +411,74 @@ class InMemoryTaskManager(TaskManager):
                     raise ValueError('Task not found for resubscription')
                 self.task_sse_subscribers[task_id] = []
 
-            sse_event_queue = asyncio.Queue(maxsize=0)  # <=0 is unlimited
+            sse_event_queue = SubscriberQueue(
+                task_id,
+                maxsize=self.sse_queue_size,
+                policy=self.slow_consumer_policy,
+                metrics=self.sse_metrics,
+            )
             self.task_sse_subscribers[task_id].append(sse_event_queue)
             return sse_event_queue
 
     async def enqueue_events_for_sse(self, task_id, task_update_event):
-        async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
-                return
+        # Keeps log order and delivery order the same
+        async with self._event_locks[hash(task_id) % len(self._event_locks)]:
+            seq = await self.event_log.append(task_id, task_update_event)
+
+            # Fan out to a snapshot of the subscribers so slow consumers never
+            # hold the lock; the queues are bounded and put_nowait never blocks.
+            async with self.subscriber_lock:
+                current_subscribers = list(
+                    self.task_sse_subscribers.get(task_id, ())
+                )
 
-            current_subscribers = self.task_sse_subscribers[task_id]
             for subscriber in current_subscribers:
-                await subscriber.put(task_update_event)
+                if subscriber.closed:
+                    continue
+                if not subscriber.put_nowait(task_update_event, seq):
+                    logger.warning(
+                        f'Dropping slow SSE subscriber for task {task_id}'
+                    )
+
+    def get_sse_metrics(self) -> dict:
+        """Queue depth and drop counters across all SSE subscribers."""
+        return self.sse_metrics.snapshot()
 
     async def dequeue_events_for_sse(
-        self, request_id, task_id, sse_event_queue: asyncio.Queue
+        self,
+        request_id,
+        task_id,
+        sse_event_queue: SubscriberQueue,
+        after_seq: int | None = None,
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
         try:
             while True:
-                event = await sse_event_queue.get()
+                seq, event = await sse_event_queue.get_entry()
+                if (
+                    seq is not None
+                    and after_seq is not None
+                    and seq <= after_seq
+                ):
+                    # Already replayed from the event log
+                    continue
+
+                yield SequencedStreamingResponse.for_event(
+                    request_id, event, seq
+                )
                 if isinstance(event, JSONRPCError):
-                    yield SendTaskStreamingResponse(id=request_id, error=event)
                     break
-
-                yield SendTaskStreamingResponse(id=request_id, result=event)
                 if isinstance(event, TaskStatusUpdateEvent) and event.final:
                     break
         finally:
-            async with self.subscriber_lock:
-                if task_id in self.task_sse_subscribers:
-                    self.task_sse_subscribers[task_id].remove(sse_event_queue)
+            await self._remove_sse_consumer(task_id, sse_event_queue)
+
+    async def _remove_sse_consumer(
+        self, task_id: str, sse_event_queue: SubscriberQueue
+    ) -> None:
+        sse_event_queue.detach()
+        async with self.subscriber_lock:
+            subscribers = self.task_sse_subscribers.get(task_id)
+            if subscribers and sse_event_queue in subscribers:
+                subscribers.remove(sse_event_queue)
+            if subscribers == []:
+                del self.task_sse_subscribers[task_id]
@@ -0,0 +1,781 @@
+"""Task storage backends for InMemoryTaskManager.
+
+`InMemoryTaskStore` keeps tasks in process memory with LRU and TTL eviction.
+`SQLiteTaskStore` persists them to a SQLite file so they survive restarts;
+messages and artifacts are kept in their own append-only tables so an update
+never rewrites the whole task.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar
+
+from common.types import (
+    Artifact,
+    Message,
+    PushNotificationConfig,
+    Task,
+    TaskState,
+    TaskStatus,
+)
+from common.utils.artifact_chunks import ArtifactAssembler
+
+
+T = TypeVar('T')
+
+TERMINAL_STATES = frozenset(
+    {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+)
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits on how many tasks a store keeps and for how long.
+
+    Attributes:
+        max_tasks: Evict least recently used tasks beyond this count, finished
+            tasks first. None keeps every task.
+        completed_ttl: Seconds to keep a task after it reaches a terminal
+            state (completed, canceled, failed). None keeps them forever.
+        max_history: Keep only the latest messages of each task's history
+            (the in-memory store may briefly hold up to twice as many).
+            None keeps the full history.
+    """
+
+    max_tasks: int | None = 10_000
+    completed_ttl: float | None = 24 * 60 * 60
+    max_history: int | None = None
+
+
+def is_terminal(status: TaskStatus) -> bool:
+    """Whether a task in this status is finished."""
+    return status.state in TERMINAL_STATES
+
+
+def history_window(task: Task, history_length: int | None) -> Task:
+    """Shallow copy of `task` with only its last `history_length` messages.
+
+    Only the kept message references are copied; messages, artifacts and
+    status are shared with `task`, so the result must be treated as read-only.
+    """
+    if history_length is not None and history_length > 0 and task.history:
+        history = task.history[-history_length:]
+    else:
+        history = []
+    return task.model_copy(update={'history': history})
+
+
+class TaskStore(ABC):
+    """Storage for tasks and their push notification configs.
+
+    Implementations must be safe to call concurrently from coroutines on the
+    same event loop.
+    """
+
+    def __init__(self, retention: RetentionPolicy | None = None):
+        self.retention = retention or RetentionPolicy()
+        self._removal_listeners: list[Callable[[str], Awaitable[None]]] = []
+
+    def add_removal_listener(
+        self, listener: Callable[[str], Awaitable[None]]
+    ) -> None:
+        """Await `listener(task_id)` after a task is deleted or pruned."""
+        self._removal_listeners.append(listener)
+
+    async def _notify_removed(self, task_ids: Iterable[str]) -> None:
+        for task_id in task_ids:
+            for listener in self._removal_listeners:
+                await listener(task_id)
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Task | None:
+        """Return the task, or None if it is unknown or has expired."""
+
+    async def get_window(
+        self, task_id: str, history_length: int | None
+    ) -> Task | None:
+        """Return a copy of the task with only its latest messages.
+
+        The copy carries the last `history_length` messages, none if
+        `history_length` is None or 0. Only the kept message references are
+        copied. Stores that would otherwise have to load the full history
+        override this.
+        """
+        task = await self.get(task_id)
+        return None if task is None else history_window(task, history_length)
+
+    @abstractmethod
+    async def create(self, task: Task) -> Task:
+        """Store a new task (replacing any task with the same id)."""
+
+    @abstractmethod
+    async def append_message(self, task_id: str, message: Message) -> Task:
+        """Append a message to the task history.
+
+        The returned task has the current status, but stores that keep
+        history out of memory may leave out messages and artifacts that
+        were recorded before this call; use `get` or `get_window` for those.
+
+        Raises:
+            ValueError: If the task does not exist.
+        """
+
+    @abstractmethod
+    async def update(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: list[Artifact] | None = None,
+    ) -> Task:
+        """Set the task status, recording its message and any new artifacts.
+
+        As with `append_message`, the returned task may carry only the
+        message and artifacts recorded by this call.
+
+        Raises:
+            ValueError: If the task does not exist.
+        """
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> bool:
+        """Remove a task and its push notification config."""
+
+    @abstractmethod
+    async def set_push_notification(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def get_push_notification(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        pass
+
+    @abstractmethod
+    async def prune(self) -> int:
+        """Apply the retention policy now.
+
+        Returns:
+            The number of tasks removed.
+        """
+
+
+class InMemoryTaskStore(TaskStore):
+    """Tasks kept in process memory, bounded by the retention policy.
+
+    Returned tasks are the stored objects themselves; callers that hand them
+    out should copy them first (see `history_window`).
+    """
+
+    def __init__(self, retention: RetentionPolicy | None = None):
+        super().__init__(retention)
+        self._tasks: OrderedDict[str, Task] = OrderedDict()
+        self._finished_at: dict[str, float] = {}
+        self._push_configs: dict[str, PushNotificationConfig] = {}
+        # task id -> artifact index -> (position in task.artifacts, assembler)
+        # for chunked artifacts that are still being streamed
+        self._artifact_streams: dict[
+            str, dict[int, tuple[int, ArtifactAssembler]]
+        ] = {}
+        self._next_sweep = 0.0
+
+    def _expired(self, task_id: str, now: float) -> bool:
+        ttl = self.retention.completed_ttl
+        finished_at = self._finished_at.get(task_id)
+        return (
+            ttl is not None
+            and finished_at is not None
+            and now - finished_at > ttl
+        )
+
+    def _remove(self, task_id: str) -> bool:
+        self._finished_at.pop(task_id, None)
+        self._push_configs.pop(task_id, None)
+        self._artifact_streams.pop(task_id, None)
+        return self._tasks.pop(task_id, None) is not None
+
+    def _touch(self, task_id: str) -> Task:
+        # Expired tasks are left for prune, so removals are always notified
+        task = self._tasks.get(task_id)
+        if task is None or self._expired(task_id, time.time()):
+            raise ValueError(f'Task {task_id} not found')
+        self._tasks.move_to_end(task_id)
+        return task
+
+    def _trim_history(self, task: Task) -> None:
+        # Trim in batches so appends stay O(1) amortized; windows read the tail
+        limit = self.retention.max_history
+        if limit is not None and task.history and len(task.history) > 2 * limit:
+            del task.history[:-limit]
+
+    def _add_artifacts(self, task: Task, artifacts: list[Artifact]) -> None:
+        """Append artifacts, folding chunks into the artifact they extend.
+
+        Chunks (`append=True`) are buffered and only joined when the artifact
+        completes or the task is read, so streaming stays linear.
+        """
+        if task.artifacts is None:
+            task.artifacts = []
+        streams = self._artifact_streams.setdefault(task.id, {})
+        for artifact in artifacts:
+            stream = streams.get(artifact.index)
+            if artifact.append and stream is None:
+                # Extends an artifact stored without an open stream
+                for position in range(len(task.artifacts) - 1, -1, -1):
+                    if task.artifacts[position].index == artifact.index:
+                        stream = streams[artifact.index] = (
+                            position,
+                            ArtifactAssembler([task.artifacts[position]]),
+                        )
+                        break
+            if artifact.append and stream is not None:
+                position, assembler = stream
+                assembler.add(artifact)
+            else:
+                task.artifacts.append(artifact)
+                if artifact.lastChunk is not False:
+                    streams.pop(artifact.index, None)
+                    continue
+                position, assembler = (
+                    len(task.artifacts) - 1,
+                    ArtifactAssembler([artifact]),
+                )
+                streams[artifact.index] = (position, assembler)
+
+            if assembler.is_complete(artifact.index):
+                task.artifacts[position] = assembler.artifact(artifact.index)
+                del streams[artifact.index]
+        if not streams:
+            del self._artifact_streams[task.id]
+
+    def _flush_artifacts(self, task: Task) -> None:
+        """Materialize artifacts that are still being streamed."""
+        for index, (position, assembler) in self._artifact_streams.get(
+            task.id, {}
+        ).items():
+            task.artifacts[position] = assembler.artifact(index)
+
+    async def get(self, task_id: str) -> Task | None:
+        try:
+            task = self._touch(task_id)
+        except ValueError:
+            return None
+        self._flush_artifacts(task)
+        return task
+
+    async def create(self, task: Task) -> Task:
+        self._remove(task.id)
+        self._tasks[task.id] = task
+        if is_terminal(task.status):
+            self._finished_at[task.id] = time.time()
+        self._trim_history(task)
+        if time.time() >= self._next_sweep or (
+            self.retention.max_tasks is not None
+            and len(self._tasks) > self.retention.max_tasks
+        ):
+            await self.prune()
+        return task
+
+    async def append_message(self, task_id: str, message: Message) -> Task:
+        task = self._touch(task_id)
+        if task.history is None:
+            task.history = []
+        task.history.append(message)
+        self._trim_history(task)
+        return task
+
+    async def update(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: list[Artifact] | None = None,
+    ) -> Task:
+        task = self._touch(task_id)
+        task.status = status
+
+        if status.message is not None:
+            if task.history is None:
+                task.history = []
+            task.history.append(status.message)
+            self._trim_history(task)
+
+        if artifacts is not None:
+            self._add_artifacts(task, artifacts)
+
+        if is_terminal(status):
+            self._finished_at.setdefault(task_id, time.time())
+        else:
+            self._finished_at.pop(task_id, None)
+        return task
+
+    async def delete(self, task_id: str) -> bool:
+        if not self._remove(task_id):
+            return False
+        await self._notify_removed([task_id])
+        return True
+
+    async def set_push_notification(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        self._touch(task_id)
+        self._push_configs[task_id] = config
+
+    async def get_push_notification(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        return self._push_configs.get(task_id)
+
+    async def prune(self) -> int:
+        now = time.time()
+        # Expired tasks are hidden on access; sweep them out periodically
+        ttl = self.retention.completed_ttl
+        self._next_sweep = now + (
+            min(60.0, ttl / 10) if ttl is not None else 60.0
+        )
+        removed = [t for t in self._finished_at if self._expired(t, now)]
+        for task_id in removed:
+            self._remove(task_id)
+
+        max_tasks = self.retention.max_tasks
+        if max_tasks is not None and len(self._tasks) > max_tasks:
+            excess = len(self._tasks) - max_tasks
+            # Least recently used first; finished tasks go before active ones
+            finished = [t for t in self._tasks if t in self._finished_at]
+            victims = finished[:excess]
+            if len(victims) < excess:
+                active = [t for t in self._tasks if t not in self._finished_at]
+                victims += active[: excess - len(victims)]
+            for task_id in victims:
+                self._remove(task_id)
+            removed += victims
+        await self._notify_removed(removed)
+        return len(removed)
+
+
+class SQLiteTaskStore(TaskStore):
+    """Tasks persisted to a SQLite file.
+
+    The task row holds the current status; history messages and artifacts
+    are appended to their own tables. Queries run in a worker thread so the
+    event loop is not blocked on disk I/O. Writes share one connection and
+    run one at a time; reads use per-thread connections and, thanks to WAL,
+    see a consistent snapshot without waiting for writers.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = 'tasks.sqlite3',
+        retention: RetentionPolicy | None = None,
+    ):
+        super().__init__(retention)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                session_id TEXT,
+                status TEXT NOT NULL,
+                metadata TEXT,
+                updated_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at);
+            CREATE INDEX IF NOT EXISTS tasks_finished_at ON tasks (finished_at);
+            CREATE TABLE IF NOT EXISTS task_history (
+                task_id TEXT NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                PRIMARY KEY (task_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS task_artifacts (
+                task_id TEXT NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                artifact TEXT NOT NULL,
+                PRIMARY KEY (task_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS push_notifications (
+                task_id TEXT PRIMARY KEY
+                    REFERENCES tasks (id) ON DELETE CASCADE,
+                config TEXT NOT NULL
+            );
+            """
+        )
+        self._lock = threading.Lock()
+        self._readers = threading.local()
+        self._reader_conns: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = self._readers.conn = self._connect()
+            with self._lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        def locked() -> T:
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def _read(self, fn: Callable[..., T], *args: object) -> T:
+        def snapshot() -> T:
+            conn = self._reader()
+            conn.execute('BEGIN')
+            try:
+                return fn(*args, conn=conn)
+            finally:
+                conn.execute('COMMIT')
+
+        return await asyncio.to_thread(snapshot)
+
+    def _expired(self, finished_at: float | None) -> bool:
+        ttl = self.retention.completed_ttl
+        return (
+            ttl is not None
+            and finished_at is not None
+            and time.time() - finished_at > ttl
+        )
+
+    def _load(
+        self,
+        task_id: str,
+        conn: sqlite3.Connection | None = None,
+        last_messages: int | None = None,
+    ) -> Task | None:
+        # Expired rows are left for _prune so reads never write
+        conn = conn or self._conn
+        row = conn.execute(
+            'SELECT session_id, status, metadata, finished_at FROM tasks'
+            ' WHERE id = ?',
+            (task_id,),
+        ).fetchone()
+        if row is None or self._expired(row[3]):
+            return None
+        session_id, status, metadata, _ = row
+
+        if last_messages is None:
+            rows = conn.execute(
+                'SELECT message FROM task_history'
+                ' WHERE task_id = ? ORDER BY seq',
+                (task_id,),
+            )
+        elif last_messages > 0:
+            # Walks the (task_id, seq) primary key backwards; older rows are
+            # never read
+            rows = conn.execute(
+                'SELECT message FROM ('
+                ' SELECT seq, message FROM task_history WHERE task_id = ?'
+                ' ORDER BY seq DESC LIMIT ?) ORDER BY seq',
+                (task_id, last_messages),
+            )
+        else:
+            rows = []
+        history = [Message.model_validate_json(m) for (m,) in rows]
+        artifacts = [
+            Artifact.model_validate_json(a)
+            for (a,) in conn.execute(
+                'SELECT artifact FROM task_artifacts'
+                ' WHERE task_id = ? ORDER BY seq',
+                (task_id,),
+            )
+        ]
+        if any(a.append for a in artifacts):
+            # Chunks are stored as appended rows; fold them on read
+            artifacts = ArtifactAssembler(artifacts).artifacts()
+        return Task.model_validate(
+            {
+                'id': task_id,
+                'sessionId': session_id,
+                'status': TaskStatus.model_validate_json(status),
+                'history': history,
+                'artifacts': artifacts or None,
+                'metadata': None if metadata is None else json.loads(metadata),
+            }
+        )
+
+    def _require(self, task_id: str) -> tuple[str | None, str, str | None]:
+        """Return the session id, status and metadata of a live task."""
+        row = self._conn.execute(
+            'SELECT session_id, status, metadata, finished_at FROM tasks'
+            ' WHERE id = ?',
+            (task_id,),
+        ).fetchone()
+        if row is None or self._expired(row[3]):
+            raise ValueError(f'Task {task_id} not found')
+        return row[:3]
+
+    @staticmethod
+    def _written(
+        task_id: str,
+        row: tuple[str | None, str, str | None],
+        status: TaskStatus | None,
+        history: list[Message],
+        artifacts: list[Artifact] | None,
+    ) -> Task:
+        # Only what a write added, so appends never read back the history
+        session_id, stored_status, metadata = row
+        if status is None:
+            status = TaskStatus.model_validate_json(stored_status)
+        return Task.model_validate(
+            {
+                'id': task_id,
+                'sessionId': session_id,
+                'status': status,
+                'history': history,
+                'artifacts': artifacts or None,
+                'metadata': None if metadata is None else json.loads(metadata),
+            }
+        )
+
+    def _append_rows(
+        self, table: str, column: str, task_id: str, values: list[str]
+    ) -> None:
+        (next_seq,) = self._conn.execute(
+            f'SELECT COALESCE(MAX(seq), -1) + 1 FROM {table} WHERE task_id = ?',
+            (task_id,),
+        ).fetchone()
+        self._conn.executemany(
+            f'INSERT INTO {table} (task_id, seq, {column}) VALUES (?, ?, ?)',
+            [(task_id, next_seq + i, v) for i, v in enumerate(values)],
+        )
+        if table == 'task_history' and self.retention.max_history is not None:
+            self._conn.execute(
+                'DELETE FROM task_history WHERE task_id = ? AND seq < ?',
+                (task_id, next_seq + len(values) - self.retention.max_history),
+            )
+
+    def _create(self, task: Task) -> Task:
+        now = time.time()
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._conn.execute('DELETE FROM tasks WHERE id = ?', (task.id,))
+            self._conn.execute(
+                'INSERT INTO tasks'
+                ' (id, session_id, status, metadata, updated_at, finished_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    task.id,
+                    task.sessionId,
+                    task.status.model_dump_json(),
+                    None
+                    if task.metadata is None
+                    else json.dumps(task.metadata, default=str),
+                    now,
+                    now if is_terminal(task.status) else None,
+                ),
+            )
+            if task.history:
+                self._append_rows(
+                    'task_history',
+                    'message',
+                    task.id,
+                    [m.model_dump_json() for m in task.history],
+                )
+            if task.artifacts:
+                self._append_rows(
+                    'task_artifacts',
+                    'artifact',
+                    task.id,
+                    [a.model_dump_json() for a in task.artifacts],
+                )
+        return self._load(task.id)
+
+    def _append_message(self, task_id: str, message: Message) -> Task:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            row = self._require(task_id)
+            self._append_rows(
+                'task_history', 'message', task_id, [message.model_dump_json()]
+            )
+            self._conn.execute(
+                'UPDATE tasks SET updated_at = ? WHERE id = ?',
+                (time.time(), task_id),
+            )
+        return self._written(task_id, row, None, [message], None)
+
+    def _update(
+        self, task_id: str, status: TaskStatus, artifacts: list[Artifact] | None
+    ) -> Task:
+        now = time.time()
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            row = self._require(task_id)
+            self._conn.execute(
+                'UPDATE tasks SET status = ?, updated_at = ?,'
+                ' finished_at ='
+                ' CASE WHEN ? THEN COALESCE(finished_at, ?) ELSE NULL END'
+                ' WHERE id = ?',
+                (
+                    status.model_dump_json(),
+                    now,
+                    is_terminal(status),
+                    now,
+                    task_id,
+                ),
+            )
+            if status.message is not None:
+                self._append_rows(
+                    'task_history',
+                    'message',
+                    task_id,
+                    [status.message.model_dump_json()],
+                )
+            if artifacts:
+                self._append_rows(
+                    'task_artifacts',
+                    'artifact',
+                    task_id,
+                    [a.model_dump_json() for a in artifacts],
+                )
+        history = [] if status.message is None else [status.message]
+        return self._written(task_id, row, status, history, artifacts)
+
+    def _delete(self, task_id: str) -> bool:
+        cursor = self._conn.execute(
+            'DELETE FROM tasks WHERE id = ?', (task_id,)
+        )
+        return cursor.rowcount > 0
+
+    def _set_push_notification(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        self._require(task_id)
+        self._conn.execute(
+            'INSERT OR REPLACE INTO push_notifications (task_id, config)'
+            ' VALUES (?, ?)',
+            (task_id, config.model_dump_json()),
+        )
+
+    def _get_push_notification(
+        self, task_id: str, conn: sqlite3.Connection | None = None
+    ) -> PushNotificationConfig | None:
+        row = (
+            (conn or self._conn)
+            .execute(
+                'SELECT config FROM push_notifications WHERE task_id = ?',
+                (task_id,),
+            )
+            .fetchone()
+        )
+        return (
+            None
+            if row is None
+            else PushNotificationConfig.model_validate_json(row[0])
+        )
+
+    def _prune(self) -> list[str]:
+        removed: list[str] = []
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            if self.retention.completed_ttl is not None:
+                removed += self._delete_where(
+                    'finished_at IS NOT NULL AND finished_at < ?',
+                    (time.time() - self.retention.completed_ttl,),
+                )
+            max_tasks = self.retention.max_tasks
+            if max_tasks is not None:
+                (count,) = self._conn.execute(
+                    'SELECT COUNT(*) FROM tasks'
+                ).fetchone()
+                if count > max_tasks:
+                    # Least recently updated first; finished tasks go before
+                    # active ones
+                    removed += self._delete_where(
+                        'id IN (SELECT id FROM tasks'
+                        ' ORDER BY finished_at IS NULL, updated_at LIMIT ?)',
+                        (count - max_tasks,),
+                    )
+        return removed
+
+    def _delete_where(self, condition: str, args: tuple) -> list[str]:
+        """Delete the matching tasks and return their ids."""
+        ids = [
+            task_id
+            for (task_id,) in self._conn.execute(
+                f'SELECT id FROM tasks WHERE {condition}', args
+            )
+        ]
+        self._conn.executemany(
+            'DELETE FROM tasks WHERE id = ?', [(task_id,) for task_id in ids]
+        )
+        return ids
+
+    async def get(self, task_id: str) -> Task | None:
+        return await self._read(self._load, task_id)
+
+    async def get_window(
+        self, task_id: str, history_length: int | None
+    ) -> Task | None:
+        def load(conn: sqlite3.Connection) -> Task | None:
+            return self._load(
+                task_id, conn=conn, last_messages=max(0, history_length or 0)
+            )
+
+        return await self._read(load)
+
+    async def create(self, task: Task) -> Task:
+        task = await self._run(self._create, task)
+        await self.prune()
+        return task
+
+    async def append_message(self, task_id: str, message: Message) -> Task:
+        return await self._run(self._append_message, task_id, message)
+
+    async def update(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        artifacts: list[Artifact] | None = None,
+    ) -> Task:
+        return await self._run(self._update, task_id, status, artifacts)
+
+    async def delete(self, task_id: str) -> bool:
+        if not await self._run(self._delete, task_id):
+            return False
+        await self._notify_removed([task_id])
+        return True
+
+    async def set_push_notification(
+        self, task_id: str, config: PushNotificationConfig
+    ) -> None:
+        await self._run(self._set_push_notification, task_id, config)
+
+    async def get_push_notification(
+        self, task_id: str
+    ) -> PushNotificationConfig | None:
+        return await self._read(self._get_push_notification, task_id)
+
+    async def prune(self) -> int:
+        removed = await self._run(self._prune)
+        await self._notify_removed(removed)
+        return len(removed)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns.clear()
+            self._conn.close()
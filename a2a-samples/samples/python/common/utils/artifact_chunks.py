@@ -0,0 +1,255 @@
+"""Chunked artifacts: splitting large outputs and putting them back together.
+
+A chunked artifact is sent as a series of `Artifact`s with the same `index`:
+the first has `append` unset, the following ones `append=True`, and the last
+`lastChunk=True`. Each chunk's metadata carries its position under
+`chunkIndex`. Text is split into `TextPart`s and binary data into
+`FilePart`s holding base64 of a slice of the raw bytes.
+
+`ArtifactAssembler` folds chunks back into whole artifacts, appending each
+chunk in O(1) and joining the pieces only when an artifact is read.
+"""
+
+import base64
+
+from collections.abc import AsyncIterable, Iterable, Iterator
+from typing import Any
+
+from common.types import (
+    Artifact,
+    FileContent,
+    FilePart,
+    Part,
+    TextPart,
+)
+
+
+CHUNK_INDEX_KEY = 'chunkIndex'
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _binary_chunk_size(chunk_size: int) -> int:
+    # Multiples of 3 bytes encode to base64 without padding, so the encoded
+    # chunks also concatenate into valid base64
+    return max(3, chunk_size - chunk_size % 3)
+
+
+def _chunk(
+    template: Artifact, part: Part, chunk_index: int, last: bool
+) -> Artifact:
+    return template.model_copy(
+        update={
+            'parts': [part],
+            'append': True if chunk_index > 0 else None,
+            'lastChunk': last,
+            'metadata': {
+                **(template.metadata or {}),
+                CHUNK_INDEX_KEY: chunk_index,
+            },
+        }
+    )
+
+
+def _part_for(
+    piece: str | bytes, mime_type: str | None, file_name: str | None
+) -> Part:
+    if isinstance(piece, str):
+        return TextPart(text=piece)
+    return FilePart(
+        file=FileContent(
+            name=file_name,
+            mimeType=mime_type,
+            bytes=base64.b64encode(piece).decode(),
+        )
+    )
+
+
+def chunk_artifact(  # noqa: PLR0913
+    content: str | bytes,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    index: int = 0,
+    name: str | None = None,
+    mime_type: str | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> Iterator[Artifact]:
+    """Split text or bytes into fixed-size artifact chunks."""
+    if isinstance(content, bytes):
+        chunk_size = _binary_chunk_size(chunk_size)
+    pieces = [
+        content[start : start + chunk_size]
+        for start in range(0, len(content), chunk_size)
+    ] or [content]
+    template = Artifact(name=name, parts=[], index=index, metadata=metadata)
+    for i, piece in enumerate(pieces):
+        yield _chunk(
+            template,
+            _part_for(piece, mime_type, name),
+            i,
+            i == len(pieces) - 1,
+        )
+
+
+async def achunk_artifact(  # noqa: PLR0913
+    source: AsyncIterable[str] | AsyncIterable[bytes],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    index: int = 0,
+    name: str | None = None,
+    mime_type: str | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> AsyncIterable[Artifact]:
+    """Re-chunk a stream of text or bytes into fixed-size artifact chunks.
+
+    Chunks are cut as the stream is produced, so the first one goes out
+    before the output is complete.
+    """
+    template = Artifact(name=name, parts=[], index=index, metadata=metadata)
+    buffer = None
+    chunk_index = 0
+    pending = None  # held back one chunk so the last can be marked
+
+    async for piece in source:
+        if buffer is None:
+            buffer = piece[:0]
+            if isinstance(piece, bytes):
+                chunk_size = _binary_chunk_size(chunk_size)
+        buffer += piece
+        while len(buffer) >= chunk_size:
+            if pending is not None:
+                yield _chunk(template, pending, chunk_index, False)
+                chunk_index += 1
+            pending = _part_for(buffer[:chunk_size], mime_type, name)
+            buffer = buffer[chunk_size:]
+
+    if buffer:
+        if pending is not None:
+            yield _chunk(template, pending, chunk_index, False)
+            chunk_index += 1
+        pending = _part_for(buffer, mime_type, name)
+    if pending is None:
+        pending = _part_for(
+            buffer if buffer is not None else '', mime_type, name
+        )
+    yield _chunk(template, pending, chunk_index, True)
+
+
+class _PartBuffer:
+    """Pieces of one text or inline file part, joined lazily."""
+
+    def __init__(self, part: Part):
+        self.part = part
+        self.pieces: list[str | bytes] = []
+        if isinstance(part, TextPart):
+            self.pieces.append(part.text)
+        elif isinstance(part, FilePart) and part.file.bytes is not None:
+            self.pieces.append(base64.b64decode(part.file.bytes))
+
+    def accepts(self, part: Part) -> bool:
+        if isinstance(self.part, TextPart):
+            return isinstance(part, TextPart)
+        return (
+            isinstance(self.part, FilePart)
+            and isinstance(part, FilePart)
+            and self.part.file.bytes is not None
+            and part.file.bytes is not None
+            and part.file.mimeType in (None, self.part.file.mimeType)
+        )
+
+    def add(self, part: Part) -> None:
+        if isinstance(part, TextPart):
+            self.pieces.append(part.text)
+        else:
+            self.pieces.append(base64.b64decode(part.file.bytes))
+
+    def build(self) -> Part:
+        if isinstance(self.part, TextPart):
+            if len(self.pieces) > 1:
+                self.pieces = [''.join(self.pieces)]
+            return self.part.model_copy(update={'text': self.pieces[0]})
+        if isinstance(self.part, FilePart) and self.part.file.bytes is not None:
+            if len(self.pieces) > 1:
+                self.pieces = [b''.join(self.pieces)]
+            file = self.part.file.model_copy(
+                update={'bytes': base64.b64encode(self.pieces[0]).decode()}
+            )
+            return self.part.model_copy(update={'file': file})
+        return self.part
+
+
+class _ArtifactBuffer:
+    def __init__(self, artifact: Artifact):
+        self.artifact = artifact
+        self.parts: list[_PartBuffer] = [_PartBuffer(p) for p in artifact.parts]
+        self.chunked = artifact.lastChunk is False
+        self.complete = not self.chunked
+
+    def add(self, chunk: Artifact) -> None:
+        for part in chunk.parts:
+            if self.parts and self.parts[-1].accepts(part):
+                self.parts[-1].add(part)
+            else:
+                self.parts.append(_PartBuffer(part))
+        self.chunked = True
+        self.complete = bool(chunk.lastChunk)
+
+    def build(self) -> Artifact:
+        update: dict[str, Any] = {'parts': [p.build() for p in self.parts]}
+        if self.chunked:
+            metadata = dict(self.artifact.metadata or {})
+            metadata.pop(CHUNK_INDEX_KEY, None)
+            update.update(
+                append=None, lastChunk=self.complete, metadata=metadata or None
+            )
+        return self.artifact.model_copy(update=update)
+
+
+class ArtifactAssembler:
+    """Folds artifact chunks into whole artifacts, in arrival order.
+
+    A chunk with `append=True` extends the latest artifact with the same
+    `index`: consecutive text parts are concatenated, as are inline file
+    parts. Any other artifact starts a new entry.
+    """
+
+    def __init__(self, artifacts: Iterable[Artifact] = ()):
+        self._buffers: list[_ArtifactBuffer] = []
+        self._by_index: dict[int, _ArtifactBuffer] = {}
+        for artifact in artifacts:
+            self.add(artifact)
+
+    def add(self, artifact: Artifact) -> bool:
+        """Add an artifact or chunk.
+
+        Returns:
+            True if it was appended to an earlier artifact rather than
+            starting a new one.
+        """
+        buffer = self._by_index.get(artifact.index)
+        if artifact.append and buffer is not None:
+            buffer.add(artifact)
+            return True
+        buffer = _ArtifactBuffer(artifact)
+        self._buffers.append(buffer)
+        self._by_index[artifact.index] = buffer
+        return False
+
+    def is_complete(self, index: int) -> bool:
+        buffer = self._by_index.get(index)
+        return buffer is not None and buffer.complete
+
+    def artifact(self, index: int) -> Artifact | None:
+        buffer = self._by_index.get(index)
+        return None if buffer is None else buffer.build()
+
+    def artifacts(self) -> list[Artifact]:
+        return [buffer.build() for buffer in self._buffers]
+
+
+def chunk_content(artifact: Artifact) -> Iterator[str | bytes]:
+    """The text or decoded bytes carried by an artifact chunk."""
+    for part in artifact.parts:
+        if isinstance(part, TextPart):
+            yield part.text
+        elif isinstance(part, FilePart) and part.file.bytes is not None:
+            yield base64.b64decode(part.file.bytes)
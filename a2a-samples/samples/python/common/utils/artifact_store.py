@@ -0,0 +1,223 @@
+"""Local store for large binary artifacts, served over HTTP by reference.
+
+Instead of base64-encoding images and other binary outputs into artifact
+parts, an agent writes them here once and sends a file part with the
+returned `uri`. Clients fetch the bytes from the agent's
+`/artifacts/{artifact_id}` route, which supports `Range` requests and
+conditional `If-None-Match` requests. Artifacts are deleted once they are
+older than the store's TTL.
+"""
+
+import contextlib
+import json
+import logging
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from pathlib import Path
+
+from common.utils.http_range import byte_range
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+
+logger = logging.getLogger(__name__)
+
+_ARTIFACT_ID = re.compile(r'[0-9a-f]{32}$')
+_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredArtifact:
+    """Metadata of a stored artifact."""
+
+    id: str
+    uri: str
+    size: int
+    mime_type: str
+    name: str | None
+    created_at: float
+
+
+class LocalArtifactStore:
+    """Artifacts kept as files in `directory`.
+
+    Each artifact is one data file plus a small JSON metadata file.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        directory: str | Path | None = None,
+        ttl: float = 60 * 60,
+        route_prefix: str = '/artifacts',
+        sweep_interval: float = 5 * 60,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.directory = Path(
+            directory or Path(tempfile.gettempdir()) / 'a2a-artifacts'
+        )
+        self.ttl = ttl
+        self.route_prefix = '/' + route_prefix.strip('/')
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _data_path(self, artifact_id: str) -> Path:
+        return self.directory / artifact_id
+
+    def _meta_path(self, artifact_id: str) -> Path:
+        return self.directory / f'{artifact_id}.json'
+
+    def uri_for(self, artifact_id: str) -> str:
+        return f'{self.base_url}{self.route_prefix}/{artifact_id}'
+
+    def put(
+        self,
+        data: bytes,
+        mime_type: str = 'application/octet-stream',
+        name: str | None = None,
+    ) -> StoredArtifact:
+        """Store bytes and return the artifact's metadata, including its URI."""
+        self.sweep()
+        artifact_id = uuid.uuid4().hex
+        artifact = StoredArtifact(
+            id=artifact_id,
+            uri=self.uri_for(artifact_id),
+            size=len(data),
+            mime_type=mime_type,
+            name=name,
+            created_at=time.time(),
+        )
+        # Write under a temporary name so readers never see a partial file
+        tmp_path = self.directory / f'{artifact_id}.tmp'
+        tmp_path.write_bytes(data)
+        tmp_path.replace(self._data_path(artifact_id))
+        self._meta_path(artifact_id).write_text(json.dumps(asdict(artifact)))
+        return artifact
+
+    def get(self, artifact_id: str) -> StoredArtifact | None:
+        """Return an artifact's metadata, or None if unknown or expired."""
+        if not _ARTIFACT_ID.match(artifact_id):
+            return None
+        try:
+            artifact = StoredArtifact(
+                **json.loads(self._meta_path(artifact_id).read_text())
+            )
+        except (OSError, ValueError, TypeError):
+            return None
+        if time.time() - artifact.created_at > self.ttl:
+            self.delete(artifact_id)
+            return None
+        return artifact
+
+    def read(self, artifact_id: str) -> bytes | None:
+        if self.get(artifact_id) is None:
+            return None
+        try:
+            return self._data_path(artifact_id).read_bytes()
+        except OSError:
+            return None
+
+    def delete(self, artifact_id: str) -> None:
+        for path in (
+            self._meta_path(artifact_id),
+            self._data_path(artifact_id),
+        ):
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+    def sweep(self, force: bool = False) -> int:
+        """Delete expired artifacts.
+
+        Runs at most once per `sweep_interval` unless forced.
+
+        Returns:
+            The number of artifacts deleted.
+        """
+        now = time.time()
+        with self._sweep_lock:
+            if not force and now < self._next_sweep:
+                return 0
+            self._next_sweep = now + self.sweep_interval
+
+        removed = 0
+        cutoff = now - self.ttl
+        for meta_path in self.directory.glob('*.json'):
+            try:
+                expired = meta_path.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if expired:
+                self.delete(meta_path.stem)
+                removed += 1
+        if removed:
+            logger.info(f'Removed {removed} expired artifacts')
+        return removed
+
+    def mount(self, app) -> None:
+        """Serve artifacts from a Starlette app at `route_prefix`."""
+        app.add_route(
+            f'{self.route_prefix}/{{artifact_id}}',
+            self.handle_request,
+            methods=['GET', 'HEAD'],
+        )
+
+    async def handle_request(self, request: Request) -> Response:
+        artifact = self.get(request.path_params['artifact_id'])
+        if artifact is None:
+            return Response(status_code=404)
+
+        etag = f'"{artifact.id}"'
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': etag,
+            # Artifacts are immutable for their lifetime
+            'Cache-Control': f'private, max-age={int(self.ttl)}, immutable',
+        }
+        if artifact.name:
+            headers['Content-Disposition'] = (
+                f'inline; filename="{artifact.name}"'
+            )
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+
+        status_code, start, end = byte_range(
+            request.headers, artifact.size, etag, headers
+        )
+        if status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            return Response(status_code=status_code, headers=headers)
+
+        headers['Content-Length'] = str(end - start + 1)
+        if request.method == 'HEAD':
+            return Response(
+                status_code=status_code,
+                headers=headers,
+                media_type=artifact.mime_type,
+            )
+        return StreamingResponse(
+            self._iter_file(artifact.id, start, end),
+            status_code=status_code,
+            headers=headers,
+            media_type=artifact.mime_type,
+        )
+
+    async def _iter_file(
+        self, artifact_id: str, start: int, end: int
+    ) -> AsyncIterator[bytes]:
+        with self._data_path(artifact_id).open('rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
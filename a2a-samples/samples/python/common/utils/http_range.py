@@ -0,0 +1,44 @@
+"""Single byte ranges for routes that serve stored files."""
+
+import re
+
+from collections.abc import Mapping
+from http import HTTPStatus
+
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def byte_range(
+    request_headers: Mapping[str, str],
+    size: int,
+    etag: str,
+    headers: dict[str, str],
+) -> tuple[HTTPStatus, int, int]:
+    """Apply a request's `Range` and `If-Range` headers to a stored body.
+
+    Returns `(status_code, start, end)` for a body of `size` bytes, with `end`
+    inclusive: 200 for the whole body, 206 for a satisfiable range or 416 for
+    any other range. For 206 and 416 the matching `Content-Range` is added to
+    the response `headers`.
+    """
+    start, end = 0, size - 1
+    range_header = request_headers.get('range')
+    if not range_header or request_headers.get('if-range', etag) != etag:
+        return HTTPStatus.OK, start, end
+
+    match = _RANGE.match(range_header.strip())
+    if match is not None and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), end) if last else end
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+        if start <= end:
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            return HTTPStatus.PARTIAL_CONTENT, start, end
+
+    headers['Content-Range'] = f'bytes */{size}'
+    return HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, 0, -1
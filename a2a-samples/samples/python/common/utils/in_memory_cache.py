@@ -1,108 +1,471 @@
 """In Memory Cache utility."""
 
+import contextlib
+import hashlib
+import sys
 import threading
 import time
+import uuid
+import weakref
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Optional
 
+from pydantic import BaseModel
 
-class InMemoryCache:
-    """A thread-safe Singleton class to manage cache data.
 
-    Ensures only one instance of the cache exists across the application.
+DEFAULT_NAMESPACE = 'default'
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float | None
+    spill_path: Path | None = None
+
+
+@dataclass
+class _NamespaceStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+    spilled_bytes: int = 0
+
+
+def estimate_size(value: object, _seen: set[int] | None = None) -> int:
+    """Estimate the memory held by a value.
+
+    str and bytes payloads are counted by their length.
+
+    Args:
+        value: The value to measure.
+
+    Returns:
+        The approximate size in bytes.
     """
+    if isinstance(value, str | bytes | bytearray | memoryview):
+        return len(value)
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen)
+            for k, v in value.items()
+        )
+    if isinstance(value, list | tuple | set | frozenset):
+        return sys.getsizeof(value) + sum(
+            estimate_size(v, _seen) for v in value
+        )
+    if isinstance(value, BaseModel):
+        return sys.getsizeof(value) + estimate_size(value.__dict__, _seen)
+    return sys.getsizeof(value)
 
-    _instance: Optional['InMemoryCache'] = None
-    _lock: threading.Lock = threading.Lock()
-    _initialized: bool = False
 
-    def __new__(cls):
-        """Override __new__ to control instance creation (Singleton pattern).
+class ShardedCache:
+    """A thread-safe LRU cache with TTLs, size limits and per-namespace stats.
 
-        Uses a lock to ensure thread safety during the first instantiation.
+    Keys are spread over `stripes` shards, each with its own lock, so
+    concurrent callers rarely contend. `max_entries` and `max_bytes` bound
+    the whole cache; when either is exceeded the least recently used entries
+    are evicted, starting with the shard that was written to. Expired
+    entries are removed on access and by a background sweeper thread.
 
-        Returns:
-            The singleton instance of InMemoryCache.
-        """
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+    If `spill_dir` is set, str/bytes values of at least `spill_threshold`
+    bytes are written to files there and only read back on `get`, so they
+    don't count towards `max_bytes`.
+    """
 
-    def __init__(self):
-        """Initialize the cache storage.
+    def __init__(  # noqa: PLR0913
+        self,
+        max_entries: int | None = 10_000,
+        max_bytes: int | None = 256 * 1024 * 1024,
+        *,
+        stripes: int = 16,
+        sweep_interval: float = 60,
+        spill_dir: str | Path | None = None,
+        spill_threshold: int = 1024 * 1024,
+    ):
+        """Create the cache.
 
-        Uses a flag (_initialized) to ensure this logic runs only on the very first
-        creation of the singleton instance.
+        Args:
+            max_entries: Maximum number of entries, or None for no limit.
+            max_bytes: Maximum estimated size of in-memory values, or None.
+            stripes: Number of independently locked shards.
+            sweep_interval: Seconds between background sweeps of expired
+                entries.
+            spill_dir: Directory for large values, or None to keep
+                everything in memory.
+            spill_threshold: Minimum size in bytes of a spilled value.
         """
-        if not self._initialized:
-            with self._lock:
-                if not self._initialized:
-                    # print("Initializing SessionCache storage")
-                    self._cache_data: dict[str, dict[str, Any]] = {}
-                    self._ttl: dict[str, float] = {}
-                    self._data_lock: threading.Lock = threading.Lock()
-                    self._initialized = True
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_threshold = spill_threshold
+        self._shards: list[tuple[threading.Lock, OrderedDict]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(max(1, stripes))
+        ]
+        self._stats: dict[str, _NamespaceStats] = {}
+        self._stats_lock = threading.Lock()
+        self._entries = 0
+        self._bytes = 0
+        self._sweeper: threading.Thread | None = None
+        self._closed = threading.Event()
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def _shard_index(self, namespace: str, key: str) -> int:
+        return hash((namespace, key)) % len(self._shards)
+
+    def _namespace_stats(self, namespace: str) -> _NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = _NamespaceStats()
+        return stats
+
+    def _account(
+        self,
+        namespace: str,
+        entry: _Entry,
+        sign: int,
+        reason: str | None = None,
+    ) -> None:
+        """Add (sign=1) or remove (sign=-1) an entry from the size counters."""
+        with self._stats_lock:
+            stats = self._namespace_stats(namespace)
+            stats.entries += sign
+            if entry.spill_path:
+                stats.spilled_bytes += sign * entry.size
+            else:
+                stats.bytes += sign * entry.size
+                self._bytes += sign * entry.size
+            self._entries += sign
+            if reason == 'evicted':
+                stats.evictions += 1
+            elif reason == 'expired':
+                stats.expirations += 1
+
+    def _spill(self, namespace: str, key: str, value: str | bytes) -> Path:
+        digest = hashlib.sha256(f'{namespace}\0{key}'.encode()).hexdigest()
+        path = self.spill_dir / f'{digest[:16]}-{uuid.uuid4().hex}'
+        path.write_bytes(value.encode() if isinstance(value, str) else value)
+        return path
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+    def _load_spilled(self, entry: _Entry) -> str | bytes:
+        data = entry.spill_path.read_bytes()
+        return data.decode() if entry.value is str else data
+
+    @staticmethod
+    def _discard(entry: _Entry) -> None:
+        if entry.spill_path:
+            with contextlib.suppress(OSError):
+                entry.spill_path.unlink()
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        size: int | None = None,
+    ) -> None:
         """Set a key-value pair.
 
         Args:
             key: The key for the data.
             value: The data to store.
             ttl: Time to live in seconds. If None, data will not expire.
+            namespace: The namespace the key belongs to.
+            size: The value's size in bytes, if known; estimated otherwise.
         """
-        with self._data_lock:
-            self._cache_data[key] = value
+        size = estimate_size(value) if size is None else size
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        entry = _Entry(value=value, size=size, expires_at=expires_at)
+        if (
+            self.spill_dir
+            and isinstance(value, str | bytes)
+            and size >= self.spill_threshold
+        ):
+            entry.spill_path = self._spill(namespace, key, value)
+            # Keep only the type, to restore str values on read
+            entry.value = type(value)
+        elif self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            self.delete(key, namespace)
+            with self._stats_lock:
+                self._namespace_stats(namespace).evictions += 1
+            return
+
+        index = self._shard_index(namespace, key)
+        lock, entries = self._shards[index]
+        with lock:
+            previous = entries.pop((namespace, key), None)
+            entries[(namespace, key)] = entry
+        if previous is not None:
+            self._account(namespace, previous, -1)
+            self._discard(previous)
+        self._account(namespace, entry, 1)
 
-            if ttl is not None:
-                self._ttl[key] = time.time() + ttl
-            elif key in self._ttl:
-                del self._ttl[key]
+        self._enforce_limits(index, (namespace, key))
+        if expires_at is not None:
+            self._start_sweeper()
 
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(
+        self, key: str, default: Any = None, namespace: str = DEFAULT_NAMESPACE
+    ) -> Any:
         """Get the value associated with a key.
 
         Args:
             key: The key for the data within the session.
             default: The value to return if the session or key is not found.
+            namespace: The namespace the key belongs to.
 
         Returns:
             The cached value, or the default value if not found.
         """
-        with self._data_lock:
-            if key in self._ttl and time.time() > self._ttl[key]:
-                del self._cache_data[key]
-                del self._ttl[key]
+        lock, entries = self._shards[self._shard_index(namespace, key)]
+        expired = None
+        with lock:
+            entry = entries.get((namespace, key))
+            if entry is not None:
+                if (
+                    entry.expires_at is not None
+                    and time.monotonic() > entry.expires_at
+                ):
+                    expired = entries.pop((namespace, key))
+                    entry = None
+                else:
+                    entries.move_to_end((namespace, key))
+        if expired is not None:
+            self._account(namespace, expired, -1, 'expired')
+            self._discard(expired)
+
+        with self._stats_lock:
+            stats = self._namespace_stats(namespace)
+            if entry is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+        if entry is None:
+            return default
+        if entry.spill_path:
+            try:
+                return self._load_spilled(entry)
+            except OSError:
+                # Removed concurrently
                 return default
-            return self._cache_data.get(key, default)
+        return entry.value
 
-    def delete(self, key: str) -> None:
+    def delete(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> bool:
         """Delete a specific key-value pair from a cache.
 
         Args:
             key: The key to delete.
+            namespace: The namespace the key belongs to.
 
         Returns:
             True if the key was found and deleted, False otherwise.
         """
-        with self._data_lock:
-            if key in self._cache_data:
-                del self._cache_data[key]
-                if key in self._ttl:
-                    del self._ttl[key]
-                return True
+        lock, entries = self._shards[self._shard_index(namespace, key)]
+        with lock:
+            entry = entries.pop((namespace, key), None)
+        if entry is None:
             return False
+        self._account(namespace, entry, -1)
+        self._discard(entry)
+        return True
 
-    def clear(self) -> bool:
-        """Remove all data.
+    def clear(self, namespace: str | None = None) -> bool:
+        """Remove all data, or all data of one namespace.
 
         Returns:
             True if the data was cleared, False otherwise.
         """
-        with self._data_lock:
-            self._cache_data.clear()
-            self._ttl.clear()
-            return True
-        return False
+        for lock, entries in self._shards:
+            with lock:
+                removed = [
+                    (cache_key, entries.pop(cache_key))
+                    for cache_key in list(entries)
+                    if namespace is None or cache_key[0] == namespace
+                ]
+            for (entry_namespace, _), entry in removed:
+                self._account(entry_namespace, entry, -1)
+                self._discard(entry)
+        return True
+
+    def _over_limits(self) -> bool:
+        with self._stats_lock:
+            return (
+                self.max_entries is not None
+                and self._entries > self.max_entries
+            ) or (self.max_bytes is not None and self._bytes > self.max_bytes)
+
+    def _enforce_limits(self, start: int, keep: tuple[str, str]) -> None:
+        """Evict least recently used entries until the cache fits its limits.
+
+        Shards are visited round-robin from `start`, sparing `keep` unless
+        nothing else is left.
+        """
+        shard_count = len(self._shards)
+        idle_shards = 0
+        index = start
+        while self._over_limits() and idle_shards < shard_count:
+            lock, entries = self._shards[index]
+            victim = None
+            with lock:
+                for cache_key in entries:
+                    if cache_key != keep:
+                        victim = (cache_key, entries.pop(cache_key))
+                        break
+            if victim is None:
+                idle_shards += 1
+                index = (index + 1) % shard_count
+                continue
+            idle_shards = 0
+            (namespace, _), entry = victim
+            self._account(namespace, entry, -1, 'evicted')
+            self._discard(entry)
+            if index != start:
+                index = (index + 1) % shard_count
+
+        if self._over_limits():
+            # A single value larger than the whole cache
+            lock, entries = self._shards[start]
+            with lock:
+                entry = entries.pop(keep, None)
+            if entry is not None:
+                self._account(keep[0], entry, -1, 'evicted')
+                self._discard(entry)
+
+    def sweep(self) -> int:
+        """Remove expired entries now.
+
+        Returns:
+            The number of entries removed.
+        """
+        now = time.monotonic()
+        removed = 0
+        for lock, entries in self._shards:
+            with lock:
+                expired = [
+                    (cache_key, entries.pop(cache_key))
+                    for cache_key, entry in list(entries.items())
+                    if entry.expires_at is not None and now > entry.expires_at
+                ]
+            for (namespace, _), entry in expired:
+                self._account(namespace, entry, -1, 'expired')
+                self._discard(entry)
+            removed += len(expired)
+        return removed
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper is not None or self._closed.is_set():
+            return
+        with self._stats_lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(
+                target=_sweep_loop,
+                args=(weakref.ref(self), self._closed, self.sweep_interval),
+                name='cache-sweeper',
+                daemon=True,
+            )
+        self._sweeper.start()
+
+    def stats(self, namespace: str | None = None) -> dict[str, Any]:
+        """Return hit/miss/eviction counters and sizes.
+
+        Args:
+            namespace: Limit the result to one namespace.
+
+        Returns:
+            Per-namespace counters, plus totals when no namespace is given.
+        """
+        with self._stats_lock:
+            if namespace is not None:
+                return vars(self._namespace_stats(namespace)).copy()
+            return {
+                'entries': self._entries,
+                'bytes': self._bytes,
+                'namespaces': {
+                    name: vars(stats).copy()
+                    for name, stats in self._stats.items()
+                },
+            }
+
+    def close(self) -> None:
+        """Stop the background sweeper and drop all entries."""
+        self._closed.set()
+        self.clear()
+
+
+def _sweep_loop(
+    cache_ref: weakref.ref, closed: threading.Event, interval: float
+) -> None:
+    while not closed.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.sweep()
+        del cache
+
+
+class InMemoryCache(ShardedCache):
+    """A thread-safe Singleton class to manage cache data.
+
+    Ensures only one instance of the cache exists across the application.
+    Its limits can be set with `configure` before first use.
+    """
+
+    _instance: Optional['InMemoryCache'] = None
+    _lock: threading.Lock = threading.Lock()
+    _initialized: bool = False
+    _config: dict[str, Any] = {}
+
+    def __new__(cls):
+        """Override __new__ to control instance creation (Singleton pattern).
+
+        Uses a lock to ensure thread safety during the first instantiation.
+
+        Returns:
+            The singleton instance of InMemoryCache.
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """Initialize the cache storage.
+
+        Uses a flag (_initialized) to ensure this logic runs only on the very first
+        creation of the singleton instance.
+        """
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    super().__init__(**self._config)
+                    InMemoryCache._initialized = True
+
+    @classmethod
+    def configure(cls, **kwargs: object) -> None:
+        """Set the `ShardedCache` options of the singleton.
+
+        Must be called before the cache is first used.
+
+        Args:
+            **kwargs: Arguments for `ShardedCache.__init__`.
+        """
+        if cls._initialized:
+            raise RuntimeError('InMemoryCache is already initialized')
+        cls._config = dict(kwargs)
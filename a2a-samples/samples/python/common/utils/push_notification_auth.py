@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 import json
 import logging
@@ -10,62 +11,113 @@ import httpx
 import jwt
 
 from jwcrypto import jwk
-from jwt import PyJWK, PyJWKClient
+from jwt import PyJWK
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 
 logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = 'Bearer '
+DEFAULT_PUSH_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+# Key types generated by PushNotificationSenderAuth.generate_jwk, by JWS
+# algorithm. ES256 and EdDSA sign and verify much faster than RS256.
+_KEY_PARAMS = {
+    'RS256': {'kty': 'RSA', 'size': 2048},
+    'ES256': {'kty': 'EC', 'crv': 'P-256'},
+    'EdDSA': {'kty': 'OKP', 'crv': 'Ed25519'},
+}
+SUPPORTED_ALGORITHMS = tuple(_KEY_PARAMS)
 
 
 class PushNotificationAuth:
-    def _calculate_request_body_sha256(self, data: dict[str, Any]):
-        """Calculates the SHA256 hash of a request body.
+    def _canonical_request_body(self, data: dict[str, Any]) -> bytes:
+        """Serializes a notification payload to the bytes sent and signed.
 
-        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        The sender posts exactly these bytes and the receiver hashes the raw
+        request body, so neither side has to re-serialize JSON to check the
+        digest.
         """
-        body_str = json.dumps(
+        return json.dumps(
             data,
             ensure_ascii=False,
             allow_nan=False,
             indent=None,
             separators=(',', ':'),
+        ).encode()
+
+    def _calculate_body_bytes_sha256(self, body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def _calculate_request_body_sha256(self, data: dict[str, Any]):
+        """Calculates the SHA256 hash of a request body.
+
+        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        """
+        return self._calculate_body_bytes_sha256(
+            self._canonical_request_body(data)
         )
-        return hashlib.sha256(body_str.encode()).hexdigest()
 
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(self, httpx_client: httpx.AsyncClient | None = None):
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
+        # One pooled client for every notification instead of a new
+        # connection per event
+        self._client = httpx_client
+        self._owns_client = httpx_client is None
 
-    @staticmethod
-    async def verify_push_notification_url(url: str) -> bool:
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                validation_token = str(uuid.uuid4())
-                response = await client.get(
-                    url, params={'validationToken': validation_token}
-                )
-                response.raise_for_status()
-                is_verified = response.text == validation_token
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10, limits=DEFAULT_PUSH_POOL_LIMITS
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
 
-                logger.info(
-                    f'Verified push-notification URL: {url} => {is_verified}'
-                )
-                return is_verified
-            except Exception as e:
-                logger.warning(
-                    f'Error during sending push-notification for URL {url}: {e}'
-                )
+    async def verify_push_notification_url(self, url: str) -> bool:
+        try:
+            validation_token = str(uuid.uuid4())
+            response = await self.client.get(
+                url, params={'validationToken': validation_token}
+            )
+            response.raise_for_status()
+            is_verified = response.text == validation_token
+
+            logger.info(
+                f'Verified push-notification URL: {url} => {is_verified}'
+            )
+            return is_verified
+        except Exception as e:
+            logger.warning(
+                f'Error during sending push-notification for URL {url}: {e}'
+            )
 
         return False
 
-    def generate_jwk(self):
+    def generate_jwk(self, algorithm: str = 'RS256'):
+        """Generate a new signing key.
+
+        Earlier public keys stay published so notifications signed before a
+        rotation still verify.
+        """
+        if algorithm not in _KEY_PARAMS:
+            raise ValueError(f'Unsupported signing algorithm: {algorithm}')
         key = jwk.JWK.generate(
-            kty='RSA', size=2048, kid=str(uuid.uuid4()), use='sig'
+            **_KEY_PARAMS[algorithm], kid=str(uuid.uuid4()), use='sig'
         )
+        key.update(alg=algorithm)
         self.public_keys.append(key.export_public(as_dict=True))
         self.private_key_jwk = PyJWK.from_json(key.export_private())
 
@@ -73,47 +125,152 @@ class PushNotificationSenderAuth(PushNotificationAuth):
         """Allow clients to fetch public keys."""
         return JSONResponse({'keys': self.public_keys})
 
-    def _generate_jwt(self, data: dict[str, Any]):
+    def _generate_jwt(self, data: dict[str, Any], body: bytes | None = None):
         """JWT is generated by signing both the request payload SHA digest and time of token generation.
 
         Payload is signed with private key and it ensures the integrity of payload for client.
         Including iat prevents from replay attack.
         """
         iat = int(time.time())
+        if body is None:
+            body = self._canonical_request_body(data)
 
         return jwt.encode(
             {
                 'iat': iat,
-                'request_body_sha256': self._calculate_request_body_sha256(
-                    data
-                ),
+                'request_body_sha256': self._calculate_body_bytes_sha256(body),
             },
             key=self.private_key_jwk,
             headers={'kid': self.private_key_jwk.key_id},
-            algorithm='RS256',
+            algorithm=self.private_key_jwk.algorithm_name,
+        )
+
+    async def post_push_notification(
+        self, url: str, data: dict[str, Any], timeout: float | None = None
+    ) -> httpx.Response:
+        """Sign and send one notification, raising on network or HTTP errors."""
+        body = self._canonical_request_body(data)
+        jwt_token = self._generate_jwt(data, body)
+        headers = {
+            'Authorization': f'Bearer {jwt_token}',
+            'Content-Type': 'application/json',
+        }
+        kwargs = {} if timeout is None else {'timeout': timeout}
+        response = await self.client.post(
+            url, content=body, headers=headers, **kwargs
         )
+        response.raise_for_status()
+        return response
 
     async def send_push_notification(self, url: str, data: dict[str, Any]):
-        jwt_token = self._generate_jwt(data)
-        headers = {'Authorization': f'Bearer {jwt_token}'}
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.post(url, json=data, headers=headers)
-                response.raise_for_status()
-                logger.info(f'Push-notification sent for URL: {url}')
-            except Exception as e:
-                logger.warning(
-                    f'Error during sending push-notification for URL {url}: {e}'
-                )
+        try:
+            await self.post_push_notification(url, data)
+            logger.info(f'Push-notification sent for URL: {url}')
+        except Exception as e:
+            logger.warning(
+                f'Error during sending push-notification for URL {url}: {e}'
+            )
 
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
-    def __init__(self):
+    """Verifies signed push notifications against the sender's JWKS.
+
+    Keys are cached by `kid`. Once the cache is older than
+    `refresh_interval` it is refreshed in the background while the cached
+    keys keep being used; a token signed with an unknown `kid` (the sender
+    rotated its key) triggers an immediate refresh, at most once per
+    `min_refresh_interval`.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 300,
+        min_refresh_interval: float = 10,
+        algorithms: tuple[str, ...] = SUPPORTED_ALGORITHMS,
+    ):
         self.public_keys_jwks = []
-        self.jwks_client = None
+        self.jwks_url: str | None = None
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.algorithms = algorithms
+        self._keys: dict[str, PyJWK] = {}
+        self._fetched_at = 0.0
+        self._last_refresh_attempt = 0.0
+        self._refresh_task: asyncio.Task | None = None
 
     async def load_jwks(self, jwks_url: str):
-        self.jwks_client = PyJWKClient(jwks_url)
+        self.jwks_url = jwks_url
+        await self.refresh_jwks()
+
+    async def refresh_jwks(self) -> bool:
+        """Fetch the JWKS and replace the cached keys.
+
+        Returns:
+            False if the keys could not be fetched.
+        """
+        self._last_refresh_attempt = time.monotonic()
+        try:
+            # The listener verifies on its own event loop, so don't hold on
+            # to a client bound to the loop that loaded the keys
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self.jwks_url)
+                response.raise_for_status()
+                jwks = response.json()
+        except Exception as e:
+            logger.warning(f'Error fetching JWKS from {self.jwks_url}: {e}')
+            return False
+
+        keys = {}
+        for key_data in jwks.get('keys', []):
+            try:
+                key = PyJWK(key_data)
+            except jwt.PyJWKError as e:
+                logger.warning(f'Skipping unusable JWK: {e}')
+                continue
+            if key.algorithm_name in self.algorithms:
+                keys[key.key_id] = key
+        self.public_keys_jwks = jwks.get('keys', [])
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        return True
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Return the in-flight refresh, starting one if needed.
+
+        Concurrent callers share a single fetch.
+        """
+        task = self._refresh_task
+        if (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            task = self._refresh_task = asyncio.create_task(self.refresh_jwks())
+        return task
+
+    async def _get_signing_key(self, kid: str | None) -> PyJWK:
+        now = time.monotonic()
+        refreshing = (
+            self._refresh_task is not None and not self._refresh_task.done()
+        )
+        key = self._keys.get(kid)
+        if key is not None:
+            if (
+                now - self._fetched_at > self.refresh_interval
+                and now - self._last_refresh_attempt > self.min_refresh_interval
+            ):
+                self._start_refresh()
+            return key
+
+        if (
+            refreshing
+            or now - self._last_refresh_attempt >= self.min_refresh_interval
+        ):
+            await asyncio.shield(self._start_refresh())
+            key = self._keys.get(kid)
+        if key is None:
+            raise ValueError(f'Unknown signing key: {kid}')
+        return key
 
     async def verify_push_notification(self, request: Request) -> bool:
         auth_header = request.headers.get('Authorization')
@@ -122,19 +279,27 @@ class PushNotificationReceiverAuth(PushNotificationAuth):
             return False
 
         token = auth_header[len(AUTH_HEADER_PREFIX) :]
-        signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+        header = jwt.get_unverified_header(token)
+        signing_key = await self._get_signing_key(header.get('kid'))
+        algorithm = signing_key.algorithm_name
+        if header.get('alg') != algorithm:
+            raise ValueError('Token algorithm does not match signing key')
 
         decode_token = jwt.decode(
             token,
             signing_key,
             options={'require': ['iat', 'request_body_sha256']},
-            algorithms=['RS256'],
+            algorithms=[algorithm],
         )
 
-        actual_body_sha256 = self._calculate_request_body_sha256(
-            await request.json()
-        )
-        if actual_body_sha256 != decode_token['request_body_sha256']:
+        body = await request.body()
+        expected_sha256 = decode_token['request_body_sha256']
+        if (
+            self._calculate_body_bytes_sha256(body) != expected_sha256
+            # Senders that don't post the canonical bytes as-is
+            and self._calculate_request_body_sha256(json.loads(body))
+            != expected_sha256
+        ):
             # Payload signature does not match the digest in signed token.
             raise ValueError('Invalid request body')
 
@@ -0,0 +1,342 @@
+"""Background delivery of push notifications.
+
+`PushNotificationDelivery` queues notifications per destination (the URL's
+scheme and host) and sends them from a small pool of workers per
+destination, reusing the pooled client of `PushNotificationSenderAuth`:
+
+- At most `max_concurrency` requests are in flight per destination, and
+  notifications for the same task are always sent in order.
+- Failed deliveries are retried with exponential backoff and jitter. Client
+  errors other than 408/425/429 are not retried. Notifications that run out
+  of attempts, or don't fit in a full queue, are dead-lettered.
+- With `coalesce=True`, a task snapshot still waiting to be sent is replaced
+  by a newer one for the same task, so a burst of status updates costs one
+  request.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import statistics
+import time
+
+from collections import deque
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS_CODES = frozenset({408, 425, 429})
+
+
+@dataclass
+class DeadLetter:
+    """A notification that was given up on, and why."""
+
+    url: str
+    data: dict[str, Any]
+    attempts: int
+    error: str
+
+
+@dataclass
+class DeliveryMetrics:
+    """Counters for one `PushNotificationDelivery`."""
+
+    enqueued: int = 0
+    delivered: int = 0
+    coalesced: int = 0
+    retried: int = 0
+    failed_attempts: int = 0
+    dead_lettered: int = 0
+    latencies: deque = field(
+        default_factory=lambda: deque(maxlen=1000), repr=False
+    )
+
+    def snapshot(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'retried': self.retried,
+            'failed_attempts': self.failed_attempts,
+            'dead_lettered': self.dead_lettered,
+            'latency_p50_ms': (
+                statistics.median(latencies) * 1000 if latencies else 0.0
+            ),
+            'latency_p95_ms': percentile(0.95) * 1000,
+            'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+@dataclass
+class _Notification:
+    url: str
+    data: dict[str, Any]
+    key: Hashable
+    enqueued_at: float
+    attempts: int = 0
+    not_before: float = 0.0
+
+
+class _Destination:
+    def __init__(self):
+        self.pending: deque[_Notification] = deque()
+        self.busy_keys: set = set()
+        self.workers: set[asyncio.Task] = set()
+        self.wakeup = asyncio.Event()
+
+    def take(self, now: float) -> tuple[_Notification | None, float | None]:
+        """Pop the first sendable notification.
+
+        Returns:
+            The notification, or None and how long to wait for one whose
+            backoff is running.
+        """
+        blocked = set(self.busy_keys)
+        wait = None
+        for i, notification in enumerate(self.pending):
+            if notification.key in blocked:
+                continue
+            if notification.not_before > now:
+                # Later notifications for this task must wait behind it
+                blocked.add(notification.key)
+                delay = notification.not_before - now
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            del self.pending[i]
+            return notification, None
+        return None, wait
+
+
+def _destination_of(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f'{parsed.scheme}://{parsed.netloc.decode()}'
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return (
+            status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or status_code in _RETRYABLE_STATUS_CODES
+        )
+    return True
+
+
+def _retry_after(error: Exception) -> float | None:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return float(error.response.headers.get('retry-after', ''))
+    except ValueError:
+        return None
+
+
+class PushNotificationDelivery:
+    """Queues push notifications and sends them from background workers."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        sender_auth: PushNotificationSenderAuth,
+        *,
+        max_concurrency: int = 4,
+        max_pending: int = 1000,
+        max_attempts: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        coalesce: bool = True,
+        timeout: float | None = 10,
+        max_dead_letters: int = 1000,
+    ):
+        self.sender_auth = sender_auth
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max_pending
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.coalesce = coalesce
+        self.timeout = timeout
+        self.metrics = DeliveryMetrics()
+        self.dead_letters: deque[DeadLetter] = deque(maxlen=max_dead_letters)
+        self._destinations: dict[str, _Destination] = {}
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def enqueue(
+        self, url: str, data: dict[str, Any], key: Hashable | None = None
+    ) -> bool:
+        """Queue a notification for delivery without waiting for it.
+
+        `key` identifies the task the notification is about: notifications
+        with the same key are delivered in order and may be coalesced.
+        Returns False if the notification was dead-lettered because the
+        destination's queue is full.
+        """
+        destination_id = _destination_of(url)
+        destination = self._destinations.get(destination_id)
+        if destination is None:
+            destination = self._destinations[destination_id] = _Destination()
+
+        if self.coalesce and key is not None:
+            for notification in reversed(destination.pending):
+                if notification.key == key and notification.url == url:
+                    notification.data = data
+                    self.metrics.coalesced += 1
+                    return True
+
+        notification = _Notification(
+            url=url,
+            data=data,
+            key=key if key is not None else object(),
+            enqueued_at=time.monotonic(),
+        )
+        if len(destination.pending) >= self.max_pending:
+            self._dead_letter(notification, 'queue full')
+            return False
+
+        destination.pending.append(notification)
+        self.metrics.enqueued += 1
+        self._outstanding += 1
+        self._idle.clear()
+        destination.wakeup.set()
+        if len(destination.workers) < min(
+            self.max_concurrency, len(destination.pending)
+        ):
+            worker = asyncio.create_task(
+                self._worker(destination_id, destination)
+            )
+            destination.workers.add(worker)
+        return True
+
+    async def _worker(
+        self, destination_id: str, destination: _Destination
+    ) -> None:
+        try:
+            while destination.pending:
+                notification, wait = destination.take(time.monotonic())
+                if notification is None:
+                    destination.wakeup.clear()
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(destination.wakeup.wait(), wait)
+                    continue
+
+                destination.busy_keys.add(notification.key)
+                try:
+                    await self._attempt(destination, notification)
+                finally:
+                    destination.busy_keys.discard(notification.key)
+                    destination.wakeup.set()
+        finally:
+            destination.workers.discard(asyncio.current_task())
+            if (
+                not destination.workers
+                and not destination.pending
+                and self._destinations.get(destination_id) is destination
+            ):
+                del self._destinations[destination_id]
+
+    async def _attempt(
+        self, destination: _Destination, notification: _Notification
+    ) -> None:
+        notification.attempts += 1
+        try:
+            await self.sender_auth.post_push_notification(
+                notification.url, notification.data, timeout=self.timeout
+            )
+        except Exception as e:
+            self.metrics.failed_attempts += 1
+            if notification.attempts >= self.max_attempts or not _is_retryable(
+                e
+            ):
+                self._dead_letter(notification, str(e))
+                self._done()
+                return
+            backoff = min(
+                self.max_backoff,
+                self.base_backoff * 2 ** (notification.attempts - 1),
+            ) * random.uniform(0.5, 1.0)
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                backoff = max(backoff, min(retry_after, self.max_backoff))
+            notification.not_before = time.monotonic() + backoff
+            # Back at the front so it stays ahead of newer updates for its task
+            destination.pending.appendleft(notification)
+            self.metrics.retried += 1
+            logger.info(
+                f'Retrying push-notification for URL {notification.url} '
+                f'in {backoff:.1f}s (attempt {notification.attempts}): {e}'
+            )
+            return
+
+        self.metrics.delivered += 1
+        self.metrics.latencies.append(
+            time.monotonic() - notification.enqueued_at
+        )
+        logger.info(f'Push-notification sent for URL: {notification.url}')
+        self._done()
+
+    def _dead_letter(self, notification: _Notification, error: str) -> None:
+        self.metrics.dead_lettered += 1
+        self.dead_letters.append(
+            DeadLetter(
+                url=notification.url,
+                data=notification.data,
+                attempts=notification.attempts,
+                error=error,
+            )
+        )
+        logger.warning(
+            f'Dropping push-notification for URL {notification.url} after '
+            f'{notification.attempts} attempt(s): {error}'
+        )
+
+    def _done(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._idle.set()
+
+    def pending_count(self) -> int:
+        return self._outstanding
+
+    def get_metrics(self) -> dict[str, Any]:
+        snapshot = self.metrics.snapshot()
+        snapshot['pending'] = self._outstanding
+        snapshot['destinations'] = len(self._destinations)
+        return snapshot
+
+    async def flush(self, timeout: float | None = None):
+        """Wait until all queued notifications are delivered or dropped."""
+        await asyncio.wait_for(self._idle.wait(), timeout)
+
+    async def aclose(self):
+        """Stop the workers; notifications still queued are discarded."""
+        workers = [
+            worker
+            for destination in self._destinations.values()
+            for worker in destination.workers
+        ]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._destinations.clear()
+        self._outstanding = 0
+        self._idle.set()
+        await self.sender_auth.aclose()
@@ -3,12 +3,15 @@ import base64
 import json
 import uuid
 
+from urllib.parse import urlsplit
+
 import httpx
 
 from a2a.client import A2ACardResolver
 from a2a.types import (
     AgentCard,
     DataPart,
+    FileWithUri,
     Message,
     MessageSendConfiguration,
     MessageSendParams,
@@ -26,6 +29,10 @@ from google.genai import types
 from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
 
 
+# Largest file a remote agent may hand over by reference
+MAX_FILE_URI_BYTES = 64 * 1024 * 1024
+
+
 class HostAgent:
     """The host agent.
 
@@ -185,7 +192,9 @@ Current agent: {current_agent['active_agent']}
         )
         response = await client.send_message(request, self.task_callback)
         if isinstance(response, Message):
-            return await convert_parts(task.parts, tool_context)
+            return await convert_parts(
+                task.parts, tool_context, self.httpx_client
+            )
         task: Task = response
         # Assume completion unless a state returns that isn't complete
         state['session_active'] = task.status.state not in [
@@ -211,24 +220,60 @@ Current agent: {current_agent['active_agent']}
         if task.status.message:
             # Assume the information is in the task message.
             response.extend(
-                await convert_parts(task.status.message.parts, tool_context)
+                await convert_parts(
+                    task.status.message.parts, tool_context, self.httpx_client
+                )
             )
         if task.artifacts:
             for artifact in task.artifacts:
                 response.extend(
-                    await convert_parts(artifact.parts, tool_context)
+                    await convert_parts(
+                        artifact.parts, tool_context, self.httpx_client
+                    )
                 )
         return response
 
 
-async def convert_parts(parts: list[Part], tool_context: ToolContext):
+async def convert_parts(
+    parts: list[Part],
+    tool_context: ToolContext,
+    httpx_client: httpx.AsyncClient | None = None,
+):
     rval = []
     for p in parts:
-        rval.append(await convert_part(p, tool_context))
+        rval.append(await convert_part(p, tool_context, httpx_client))
     return rval
 
 
-async def convert_part(part: Part, tool_context: ToolContext):
+async def fetch_file_uri(
+    client: httpx.AsyncClient,
+    uri: str,
+    max_bytes: int = MAX_FILE_URI_BYTES,
+) -> bytes:
+    """Download a file sent by reference, refusing anything over `max_bytes`.
+
+    Only http(s) URIs are fetched, since the URI comes from a remote agent.
+    """
+    if urlsplit(uri).scheme not in ('http', 'https'):
+        raise ValueError(f'Unsupported file URI: {uri}')
+    async with client.stream('GET', uri) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length')
+        if length is not None and int(length) > max_bytes:
+            raise ValueError(f'File at {uri} exceeds {max_bytes} bytes')
+        data = bytearray()
+        async for chunk in response.aiter_bytes():
+            data += chunk
+            if len(data) > max_bytes:
+                raise ValueError(f'File at {uri} exceeds {max_bytes} bytes')
+    return bytes(data)
+
+
+async def convert_part(
+    part: Part,
+    tool_context: ToolContext,
+    httpx_client: httpx.AsyncClient | None = None,
+):
     if part.root.kind == 'text':
         return part.root.text
     if part.root.kind == 'data':
@@ -237,7 +282,19 @@ async def convert_part(part: Part, tool_context: ToolContext):
         # Repackage A2A FilePart to google.genai Blob
         # Currently not considering plain text as files
         file_id = part.root.file.name
-        file_bytes = base64.b64decode(part.root.file.bytes)
+        if isinstance(part.root.file, FileWithUri):
+            # Large artifacts are sent by reference; fetch the raw bytes
+            if httpx_client is None:
+                async with httpx.AsyncClient() as client:
+                    file_bytes = await fetch_file_uri(
+                        client, part.root.file.uri
+                    )
+            else:
+                file_bytes = await fetch_file_uri(
+                    httpx_client, part.root.file.uri
+                )
+        else:
+            file_bytes = base64.b64decode(part.root.file.bytes)
         file_part = types.Part(
             inline_data=types.Blob(
                 mime_type=part.root.file.mimeType, data=file_bytes
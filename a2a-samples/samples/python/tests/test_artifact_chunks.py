@@ -0,0 +1,122 @@
+import asyncio
+import base64
+
+from common.types import Artifact, FileContent, FilePart, TextPart
+from common.utils.artifact_chunks import (
+    CHUNK_INDEX_KEY,
+    ArtifactAssembler,
+    achunk_artifact,
+    chunk_artifact,
+    chunk_content,
+)
+
+
+def test_chunk_text_marks_append_and_last_chunk():
+    chunks = list(chunk_artifact('abcdefghij', chunk_size=4, name='out'))
+    assert [c.parts[0].text for c in chunks] == ['abcd', 'efgh', 'ij']
+    assert [c.append for c in chunks] == [None, True, True]
+    assert [c.lastChunk for c in chunks] == [False, False, True]
+    assert [c.metadata[CHUNK_INDEX_KEY] for c in chunks] == [0, 1, 2]
+
+
+def test_empty_content_is_one_last_chunk():
+    chunks = list(chunk_artifact(''))
+    assert len(chunks) == 1
+    assert chunks[0].lastChunk is True
+
+
+def test_binary_chunks_round_trip():
+    data = bytes(range(256)) * 3
+    chunks = list(chunk_artifact(data, chunk_size=100, mime_type='image/png'))
+    # Binary chunks are aligned to 3 bytes so base64 never needs padding
+    assert all(len(b''.join(chunk_content(c))) % 3 == 0 for c in chunks[:-1])
+    assembled = ArtifactAssembler(chunks).artifacts()
+    assert len(assembled) == 1
+    part = assembled[0].parts[0]
+    assert isinstance(part, FilePart)
+    assert part.file.mimeType == 'image/png'
+    assert base64.b64decode(part.file.bytes) == data
+
+
+def test_achunk_artifact_rechunks_a_stream():
+    async def source():
+        for piece in ['ab', 'cdefg', 'h', 'ijk']:
+            yield piece
+
+    async def collect():
+        return [c async for c in achunk_artifact(source(), chunk_size=4)]
+
+    chunks = asyncio.run(collect())
+    assert [c.parts[0].text for c in chunks] == ['abcd', 'efgh', 'ijk']
+    assert [c.lastChunk for c in chunks] == [False, False, True]
+
+
+def test_assembler_folds_chunks_and_strips_chunk_metadata():
+    assembler = ArtifactAssembler()
+    chunks = list(
+        chunk_artifact('hello world', chunk_size=3, metadata={'k': 'v'})
+    )
+    assert [assembler.add(c) for c in chunks] == [False] + [True] * (
+        len(chunks) - 1
+    )
+    assert assembler.is_complete(0)
+    artifact = assembler.artifact(0)
+    assert artifact.parts[0].text == 'hello world'
+    assert artifact.append is None
+    assert artifact.lastChunk is True
+    assert artifact.metadata == {'k': 'v'}
+
+
+def test_incomplete_artifact_is_not_complete():
+    assembler = ArtifactAssembler()
+    chunks = list(chunk_artifact('abcdef', chunk_size=2))
+    for chunk in chunks[:-1]:
+        assembler.add(chunk)
+    assert not assembler.is_complete(0)
+    assert assembler.artifact(0).parts[0].text == 'abcd'
+    assert assembler.artifact(0).lastChunk is False
+    assert assembler.artifact(1) is None
+
+
+def test_interleaved_indexes_keep_arrival_order():
+    first = list(chunk_artifact('aaaa', chunk_size=2, index=0))
+    second = list(chunk_artifact('bbbb', chunk_size=2, index=1))
+    assembler = ArtifactAssembler([first[0], second[0], first[1], second[1]])
+    assert [a.parts[0].text for a in assembler.artifacts()] == [
+        'aaaa',
+        'bbbb',
+    ]
+
+
+def test_non_append_artifact_starts_a_new_entry():
+    assembler = ArtifactAssembler(
+        [
+            Artifact(parts=[TextPart(text='one')], index=0),
+            Artifact(parts=[TextPart(text='two')], index=0),
+            Artifact(parts=[TextPart(text='!')], index=0, append=True),
+        ]
+    )
+    assert [a.parts[0].text for a in assembler.artifacts()] == [
+        'one',
+        'two!',
+    ]
+
+
+def test_mismatched_parts_are_kept_separate():
+    file_part = FilePart(
+        file=FileContent(
+            mimeType='image/png', bytes=base64.b64encode(b'x').decode()
+        )
+    )
+    assembler = ArtifactAssembler(
+        [
+            Artifact(parts=[TextPart(text='caption')], index=0),
+            Artifact(parts=[file_part], index=0, append=True),
+            Artifact(parts=[TextPart(text='more')], index=0, append=True),
+        ]
+    )
+    parts = assembler.artifact(0).parts
+    assert [type(p) for p in parts] == [TextPart, FilePart, TextPart]
+    assert parts[0].text == 'caption'
+    assert base64.b64decode(parts[1].file.bytes) == b'x'
+    assert parts[2].text == 'more'
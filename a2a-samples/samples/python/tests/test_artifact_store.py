@@ -0,0 +1,127 @@
+import time
+
+from http import HTTPStatus
+
+import pytest
+
+from common.utils.artifact_store import LocalArtifactStore
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalArtifactStore('http://testserver/', directory=str(tmp_path))
+
+
+@pytest.fixture
+def client(store):
+    app = Starlette()
+    store.mount(app)
+    return TestClient(app)
+
+
+def test_put_read_and_uri(store):
+    artifact = store.put(DATA, mime_type='image/png', name='a.png')
+    assert artifact.uri == f'http://testserver/artifacts/{artifact.id}'
+    assert artifact.size == len(DATA)
+    assert store.read(artifact.id) == DATA
+    store.delete(artifact.id)
+    assert store.read(artifact.id) is None
+
+
+def test_get_rejects_unknown_and_malformed_ids(store):
+    assert store.get('0' * 32) is None
+    assert store.get('../etc/passwd') is None
+
+
+def test_full_download(store, client):
+    artifact = store.put(DATA, mime_type='image/png', name='a.png')
+    response = client.get(f'/artifacts/{artifact.id}')
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == DATA
+    assert response.headers['content-type'] == 'image/png'
+    assert response.headers['content-length'] == str(len(DATA))
+    assert response.headers['etag'] == f'"{artifact.id}"'
+    assert 'filename="a.png"' in response.headers['content-disposition']
+
+
+def test_range_requests(store, client):
+    artifact = store.put(DATA)
+    url = f'/artifacts/{artifact.id}'
+
+    response = client.get(url, headers={'Range': 'bytes=10-19'})
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response.content == DATA[10:20]
+    assert response.headers['content-range'] == f'bytes 10-19/{len(DATA)}'
+
+    response = client.get(url, headers={'Range': 'bytes=1000-'})
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response.content == DATA[1000:]
+
+    # Suffix range: the last N bytes
+    response = client.get(url, headers={'Range': 'bytes=-5'})
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response.content == DATA[-5:]
+
+    # An end past the file is clamped
+    response = client.get(url, headers={'Range': 'bytes=1020-5000'})
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response.content == DATA[1020:]
+
+
+@pytest.mark.parametrize('value', ['bytes=5000-', 'bytes=-', 'items=0-1'])
+def test_unsatisfiable_range(store, client, value):
+    artifact = store.put(DATA)
+    response = client.get(f'/artifacts/{artifact.id}', headers={'Range': value})
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response.headers['content-range'] == f'bytes */{len(DATA)}'
+
+
+def test_if_range_mismatch_returns_full_body(store, client):
+    artifact = store.put(DATA)
+    response = client.get(
+        f'/artifacts/{artifact.id}',
+        headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == DATA
+
+
+def test_not_modified_and_head(store, client):
+    artifact = store.put(DATA)
+    url = f'/artifacts/{artifact.id}'
+    response = client.get(url, headers={'If-None-Match': f'"{artifact.id}"'})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+
+    response = client.head(url, headers={'Range': 'bytes=0-9'})
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response.headers['content-length'] == '10'
+    assert response.content == b''
+
+
+def test_missing_and_expired_artifacts_are_404(store, client):
+    assert (
+        client.get(f'/artifacts/{"0" * 32}').status_code == HTTPStatus.NOT_FOUND
+    )
+
+    artifact = store.put(DATA)
+    store.ttl = 0
+    time.sleep(0.01)
+    assert (
+        client.get(f'/artifacts/{artifact.id}').status_code
+        == HTTPStatus.NOT_FOUND
+    )
+    assert store.read(artifact.id) is None
+
+
+def test_sweep_removes_expired_files(store):
+    artifact = store.put(DATA)
+    assert store.sweep(force=True) == 0
+    store.ttl = -1
+    assert store.sweep(force=True) == 1
+    assert store.get(artifact.id) is None
@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+
+from common.client.card_resolver import A2ACardResolver, AgentCardCache
+from pydantic import BaseModel
+
+
+CARD = {
+    'name': 'agent',
+    'url': 'http://agent',
+    'version': '1',
+    'capabilities': {},
+    'skills': [],
+}
+
+
+def mock_client(requests, cache_control='max-age=0'):
+    def handler(request):
+        requests.append(request.headers.get('if-none-match'))
+        if request.headers.get('if-none-match') == '"v1"':
+            return httpx.Response(304, headers={'ETag': '"v1"'})
+        return httpx.Response(
+            200,
+            json=CARD,
+            headers={'ETag': '"v1"', 'Cache-Control': cache_control},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_fresh_card_is_served_from_cache():
+    async def run():
+        requests = []
+        async with mock_client(requests, 'max-age=60') as client:
+            resolver = A2ACardResolver(
+                'http://agent', httpx_client=client, cache=AgentCardCache()
+            )
+            first = await resolver.get_agent_card_async()
+            second = await resolver.get_agent_card_async()
+        assert first.name == second.name == 'agent'
+        assert requests == [None]
+
+    asyncio.run(run())
+
+
+def test_stale_card_is_revalidated():
+    async def run():
+        requests = []
+        async with mock_client(requests) as client:
+            resolver = A2ACardResolver(
+                'http://agent', httpx_client=client, cache=AgentCardCache()
+            )
+            await resolver.get_agent_card_async()
+            card = await resolver.get_agent_card_async()
+        assert card.name == 'agent'
+        assert requests == [None, '"v1"']
+
+    asyncio.run(run())
+
+
+def test_force_refresh_revalidates_fresh_card():
+    async def run():
+        requests = []
+        async with mock_client(requests, 'max-age=60') as client:
+            resolver = A2ACardResolver(
+                'http://agent', httpx_client=client, cache=AgentCardCache()
+            )
+            await resolver.get_agent_card_async()
+            await resolver.get_agent_card_async(force_refresh=True)
+        assert requests == [None, '"v1"']
+
+    asyncio.run(run())
+
+
+def test_card_model_is_configurable():
+    class Card(BaseModel):
+        name: str
+
+    async def run():
+        async with mock_client([]) as client:
+            resolver = A2ACardResolver(
+                'http://agent',
+                httpx_client=client,
+                cache=AgentCardCache(),
+                card_model=Card,
+            )
+            return await resolver.get_agent_card_async()
+
+    assert isinstance(asyncio.run(run()), Card)
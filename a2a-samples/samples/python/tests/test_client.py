@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from common.client.client import A2AClient
+from common.types import (
+    A2AClientHTTPError,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+URL = 'http://agent'
+TIMEOUT = 30.0
+TASK = Task(id='t', status=TaskStatus(state=TaskState.COMPLETED))
+PARAMS = {
+    'id': 't',
+    'message': {'role': 'user', 'parts': [TextPart(text='hi')]},
+}
+
+
+def rpc_handler(requests):
+    def handler(request):
+        requests.append(request)
+        body = json.loads(request.content)
+        return httpx.Response(
+            200,
+            json={
+                'jsonrpc': '2.0',
+                'id': body['id'],
+                'result': TASK.model_dump(mode='json'),
+            },
+        )
+
+    return handler
+
+
+def sse_handler(requests, *events):
+    def handler(request):
+        requests.append(request)
+        body = json.loads(request.content)
+        stream = ''.join(
+            'data: '
+            + json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'id': body['id'],
+                    'result': event.model_dump(mode='json'),
+                }
+            )
+            + '\n\n'
+            for event in events
+        )
+        return httpx.Response(
+            200,
+            content=stream.encode(),
+            headers={'Content-Type': 'text/event-stream'},
+        )
+
+    return handler
+
+
+@pytest.fixture
+def created_clients(monkeypatch):
+    """Route the clients A2AClient creates itself through a mock transport."""
+    requests, clients = [], []
+    real_client = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        client = real_client(
+            transport=httpx.MockTransport(rpc_handler(requests)), **kwargs
+        )
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(httpx, 'AsyncClient', make_client)
+    return requests, clients
+
+
+def test_calls_reuse_one_pooled_client(created_clients):
+    async def run():
+        requests, clients = created_clients
+        client = A2AClient(url=URL)
+        first = await client.send_task(PARAMS)
+        second = await client.get_task({'id': 't'})
+        assert first.result == second.result == TASK
+        methods = [json.loads(r.content)['method'] for r in requests]
+        assert methods == ['tasks/send', 'tasks/get']
+        assert len(clients) == 1
+        await client.aclose()
+        assert clients[0].is_closed
+        # A closed client is replaced on next use
+        await client.get_task({'id': 't'})
+        assert client.client is clients[-1] is not clients[0]
+        await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_context_manager_closes_created_client(created_clients):
+    async def run():
+        _, clients = created_clients
+        async with A2AClient(url=URL) as client:
+            await client.get_task({'id': 't'})
+        assert clients[0].is_closed
+
+    asyncio.run(run())
+
+
+def test_injected_client_is_used_and_left_open():
+    async def run():
+        requests = []
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(rpc_handler(requests))
+        ) as shared:
+            async with A2AClient(url=URL, httpx_client=shared) as first:
+                await first.get_task({'id': 't'})
+            second = A2AClient(url=URL, httpx_client=shared)
+            await second.get_task({'id': 't'})
+            await second.aclose()
+            assert not shared.is_closed
+            assert second.client is shared
+        assert [r.url for r in requests] == [URL, URL]
+
+    asyncio.run(run())
+
+
+def test_per_call_timeout_overrides_default():
+    async def run():
+        requests = []
+        call_timeout = 2.5
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(rpc_handler(requests))
+        ) as shared:
+            client = A2AClient(url=URL, timeout=TIMEOUT, httpx_client=shared)
+            await client.get_task({'id': 't'})
+            await client.get_task({'id': 't'}, timeout=call_timeout)
+        timeouts = [r.extensions['timeout']['read'] for r in requests]
+        assert timeouts == [TIMEOUT, call_timeout]
+
+    asyncio.run(run())
+
+
+def test_streaming_parses_sse_events_without_read_timeout():
+    async def run():
+        requests = []
+        status = TaskStatusUpdateEvent(
+            id='t', status=TaskStatus(state=TaskState.WORKING)
+        )
+        artifact = TaskArtifactUpdateEvent.model_validate(
+            {'id': 't', 'artifact': {'parts': [{'type': 'text', 'text': 'a'}]}}
+        )
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                sse_handler(requests, status, artifact)
+            )
+        ) as shared:
+            client = A2AClient(url=URL, timeout=TIMEOUT, httpx_client=shared)
+            responses = [
+                response
+                async for response in client.send_task_streaming(PARAMS)
+            ]
+        assert [r.result for r in responses] == [status, artifact]
+        timeout = requests[0].extensions['timeout']
+        assert timeout['connect'] == TIMEOUT
+        assert timeout['read'] is None
+
+    asyncio.run(run())
+
+
+def test_streaming_http_error_is_raised_as_client_error():
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda _: httpx.Response(HTTPStatus.SERVICE_UNAVAILABLE)
+            )
+        ) as shared:
+            client = A2AClient(url=URL, httpx_client=shared)
+            with pytest.raises(A2AClientHTTPError) as excinfo:
+                async for _ in client.send_task_streaming(PARAMS):
+                    pass
+        assert excinfo.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    asyncio.run(run())
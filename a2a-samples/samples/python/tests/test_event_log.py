@@ -0,0 +1,170 @@
+import asyncio
+
+from common.server.event_log import InMemoryEventLog, SQLiteEventLog
+from common.server.task_manager import InMemoryTaskManager
+from common.server.task_store import InMemoryTaskStore, RetentionPolicy
+from common.types import (
+    Task,
+    TaskIdParams,
+    TaskResubscriptionRequest,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+
+def status_event(task_id, state=TaskState.WORKING, final=False):
+    return TaskStatusUpdateEvent(
+        id=task_id, status=TaskStatus(state=state), final=final
+    )
+
+
+class Manager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def test_in_memory_replays_after_sequence_number():
+    async def run():
+        log = InMemoryEventLog()
+        seqs = [await log.append('t', status_event('t')) for _ in range(3)]
+        assert seqs == [1, 2, 3]
+        events, missed = await log.since('t', 1)
+        assert [seq for seq, _ in events] == [2, 3]
+        assert missed == 0
+
+    asyncio.run(run())
+
+
+def test_in_memory_reports_events_evicted_from_ring():
+    async def run():
+        log = InMemoryEventLog(max_events_per_task=2)
+        for _ in range(5):
+            await log.append('t', status_event('t'))
+        events, missed = await log.since('t', 1)
+        assert ([seq for seq, _ in events], missed) == ([4, 5], 2)
+
+    asyncio.run(run())
+
+
+def test_in_memory_sequence_survives_task_eviction():
+    async def run():
+        log = InMemoryEventLog(max_tasks=1)
+        appended = 2
+        for _ in range(appended):
+            await log.append('a', status_event('a'))
+        # Evicts the buffer of 'a'
+        await log.append('b', status_event('b'))
+        assert await log.since('a', 1) == ([], appended - 1)
+        assert await log.append('a', status_event('a')) == appended + 1
+
+    asyncio.run(run())
+
+
+def test_in_memory_discard_resets_task():
+    async def run():
+        log = InMemoryEventLog()
+        await log.append('t', status_event('t'))
+        await log.discard('t')
+        assert await log.since('t', 0) == ([], 0)
+        assert await log.append('t', status_event('t')) == 1
+
+    asyncio.run(run())
+
+
+def test_sqlite_replays_and_trims(tmp_path):
+    async def run():
+        log = SQLiteEventLog(tmp_path / 'events.sqlite3', max_events_per_task=2)
+        try:
+            for _ in range(4):
+                await log.append('t', status_event('t'))
+            events, missed = await log.since('t', 0)
+            assert ([seq for seq, _ in events], missed) == ([3, 4], 2)
+            assert isinstance(events[0][1], TaskStatusUpdateEvent)
+            await log.discard('t')
+            assert await log.since('t', 0) == ([], 0)
+        finally:
+            log.close()
+
+    asyncio.run(run())
+
+
+def test_removing_task_discards_its_events():
+    async def run():
+        store = InMemoryTaskStore(RetentionPolicy(max_tasks=1))
+        manager = Manager(task_store=store)
+        await store.create(Task(id='a', status=TaskStatus(state='working')))
+        await manager.enqueue_events_for_sse('a', status_event('a'))
+        await store.create(Task(id='b', status=TaskStatus(state='working')))
+        assert await store.get('a') is None
+        assert await manager.event_log.append('a', status_event('a')) == 1
+
+    asyncio.run(run())
+
+
+def test_resubscribe_replays_missed_events_then_streams():
+    async def run():
+        manager = Manager()
+        await manager.task_store.create(
+            Task(id='t', status=TaskStatus(state='working'))
+        )
+        for _ in range(3):
+            await manager.enqueue_events_for_sse('t', status_event('t'))
+
+        stream = await manager.on_resubscribe_to_task(
+            TaskResubscriptionRequest(
+                id=1, params=TaskIdParams(id='t', metadata={'lastEventId': 1})
+            )
+        )
+        replayed = [await anext(stream), await anext(stream)]
+        assert [r.event_seq for r in replayed] == [2, 3]
+
+        await manager.enqueue_events_for_sse(
+            't', status_event('t', TaskState.COMPLETED, final=True)
+        )
+        live = await anext(stream)
+        assert live.event_seq == replayed[-1].event_seq + 1
+        assert live.result.final
+
+    asyncio.run(run())
+
+
+def test_resubscribe_sends_gap_marker_for_evicted_events():
+    async def run():
+        manager = Manager(event_log=InMemoryEventLog(max_events_per_task=1))
+        await manager.task_store.create(
+            Task(id='t', status=TaskStatus(state='working'))
+        )
+        sent = 3
+        for _ in range(sent):
+            await manager.enqueue_events_for_sse('t', status_event('t'))
+
+        stream = await manager.on_resubscribe_to_task(
+            TaskResubscriptionRequest(
+                id=1, params=TaskIdParams(id='t', metadata={'lastEventId': 0})
+            )
+        )
+        gap = await anext(stream)
+        assert gap.result.metadata == {'gap': True, 'droppedEvents': sent - 1}
+        # Only the latest event was kept
+        assert (await anext(stream)).event_seq == sent
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_events_can_be_enqueued_while_holding_task_lock():
+    async def run():
+        manager = Manager(lock_stripes=1)
+        async with manager.task_lock('a'):
+            # 'b' shares the only stripe with 'a'
+            await asyncio.wait_for(
+                manager.enqueue_events_for_sse('b', status_event('b')), 1
+            )
+        events, _ = await manager.event_log.since('b', 0)
+        assert [seq for seq, _ in events] == [1]
+
+    asyncio.run(run())
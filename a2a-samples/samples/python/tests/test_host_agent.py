@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+# The host agent needs the a2a SDK and ADK, which the samples don't require
+pytest.importorskip('a2a.types')
+pytest.importorskip('google.adk')
+
+from hosts.multiagent.host_agent import fetch_file_uri
+
+
+def client(content, headers=None):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=content, headers=headers)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requests
+
+
+def test_fetches_file_within_limit():
+    async def run():
+        http, _ = client(b'png')
+        async with http:
+            assert await fetch_file_uri(http, 'https://agent/a', 3) == b'png'
+
+    asyncio.run(run())
+
+
+def test_rejects_non_http_uris():
+    async def run():
+        http, requests = client(b'secret')
+        async with http:
+            for uri in ('file:///etc/passwd', 'ftp://agent/a'):
+                with pytest.raises(ValueError, match='Unsupported'):
+                    await fetch_file_uri(http, uri)
+        assert requests == []
+
+    asyncio.run(run())
+
+
+def test_rejects_oversized_files():
+    async def run():
+        async def body():
+            yield b'x' * 4
+            yield b'x' * 4
+
+        http, _ = client(body())
+        async with http:
+            with pytest.raises(ValueError, match='exceeds'):
+                await fetch_file_uri(http, 'http://agent/a', 5)
+        declared, _ = client(b'x' * 8, {'Content-Length': '8'})
+        async with declared:
+            with pytest.raises(ValueError, match='exceeds'):
+                await fetch_file_uri(declared, 'http://agent/a', 5)
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from common.utils.http_range import byte_range
+
+
+ETAG = '"abc"'
+
+
+def resolve(request_headers, size=100):
+    headers = {}
+    return byte_range(request_headers, size, ETAG, headers), headers
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    [
+        ('bytes=0-9', (206, 0, 9)),
+        ('bytes=90-', (206, 90, 99)),
+        ('bytes=90-500', (206, 90, 99)),
+        ('bytes=-10', (206, 90, 99)),
+        ('bytes=-500', (206, 0, 99)),
+        (' bytes=5-5 ', (206, 5, 5)),
+    ],
+)
+def test_satisfiable_ranges(value, expected):
+    result, headers = resolve({'range': value})
+    assert result == expected
+    _, start, end = expected
+    assert headers == {'Content-Range': f'bytes {start}-{end}/100'}
+
+
+@pytest.mark.parametrize(
+    'value',
+    ['bytes=100-', 'bytes=9-5', 'bytes=-', 'bytes=0-1,5-6', 'lines=1-2'],
+)
+def test_unsatisfiable_ranges(value):
+    (status_code, _, _), headers = resolve({'range': value})
+    assert status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert headers == {'Content-Range': 'bytes */100'}
+
+
+def test_no_range_is_whole_body():
+    assert resolve({}) == ((200, 0, 99), {})
+    assert resolve({}, size=0) == ((200, 0, -1), {})
+
+
+def test_if_range_must_match_etag():
+    assert resolve({'range': 'bytes=0-9', 'if-range': '"old"'}) == (
+        (200, 0, 99),
+        {},
+    )
+    (status_code, _, _), _ = resolve({'range': 'bytes=0-9', 'if-range': ETAG})
+    assert status_code == HTTPStatus.PARTIAL_CONTENT
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from common.utils.in_memory_cache import InMemoryCache, ShardedCache
+
+
+def test_set_get_delete_and_namespaces():
+    cache = ShardedCache()
+    cache.set('k', 'a')
+    cache.set('k', 'b', namespace='other')
+    assert cache.get('k') == 'a'
+    assert cache.get('k', namespace='other') == 'b'
+    assert cache.delete('k')
+    assert not cache.delete('k')
+    assert cache.get('k', 'missing') == 'missing'
+    cache.clear('other')
+    assert cache.get('k', namespace='other') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = ShardedCache(max_entries=2, stripes=1)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert [cache.get(key) for key in 'bac'] == [None, 1, 3]
+    assert cache.stats('default')['evictions'] == 1
+
+
+def test_max_bytes_bounds_total_size():
+    max_bytes, value = 100, 'x' * 30
+    cache = ShardedCache(max_entries=None, max_bytes=max_bytes, stripes=4)
+    for i in range(10):
+        cache.set(str(i), value)
+    stats = cache.stats()
+    assert stats['bytes'] <= max_bytes
+    assert stats['entries'] == max_bytes // len(value)
+    # The newest value is always kept
+    assert cache.get('9') == 'x' * 30
+
+
+def test_value_larger_than_cache_is_not_stored():
+    cache = ShardedCache(max_bytes=10)
+    cache.set('small', 'abc')
+    cache.set('big', 'x' * 11)
+    assert cache.get('big') is None
+    assert cache.get('small') == 'abc'
+
+
+def test_ttl_expires_on_access_and_sweep():
+    cache = ShardedCache(sweep_interval=3600)
+    expiring = ['short', 'other']
+    for key in expiring:
+        cache.set(key, key, ttl=0.01)
+    cache.set('forever', 'kept')
+    time.sleep(0.02)
+    assert cache.get('short') is None
+    assert cache.sweep() == 1
+    assert cache.get('forever') == 'kept'
+    assert cache.stats('default')['expirations'] == len(expiring)
+    cache.close()
+
+
+def test_large_values_spill_to_disk(tmp_path):
+    cache = ShardedCache(
+        max_bytes=10, spill_dir=str(tmp_path), spill_threshold=5
+    )
+    values = {'text': 'hello world', 'data': b'\x00' * 20}
+    for key, value in values.items():
+        cache.set(key, value)
+    assert {key: cache.get(key) for key in values} == values
+    assert len(list(tmp_path.iterdir())) == len(values)
+    # Spilled values don't count towards max_bytes
+    assert cache.stats()['bytes'] == 0
+    cache.delete('text')
+    cache.set('data', b'\x01' * 20)
+    assert len(list(tmp_path.iterdir())) == 1
+    cache.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_singleton_configure_after_first_use_raises(monkeypatch):
+    monkeypatch.setattr(InMemoryCache, '_instance', None)
+    monkeypatch.setattr(InMemoryCache, '_initialized', False)
+    monkeypatch.setattr(InMemoryCache, '_config', {})
+    InMemoryCache.configure(max_entries=1)
+    cache = InMemoryCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') is None
+    assert InMemoryCache() is cache
+    with pytest.raises(RuntimeError):
+        InMemoryCache.configure(max_entries=2)
+    cache.close()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+
+import httpx
+import jwt
+import pytest
+
+from starlette.requests import Request
+
+from common.utils.push_notification_auth import (
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+)
+
+
+JWKS_URL = 'http://agent/.well-known/jwks.json'
+DATA = {'id': 't', 'status': {'state': 'completed'}}
+
+
+class Agent:
+    """A sender whose JWKS is served by a mock transport.
+
+    `httpx.AsyncClient` is patched so the receiver's key fetches reach
+    `jwks`, which records in `fetches` how many keys each one returned;
+    posted notifications are captured in `posted`.
+    """
+
+    def __init__(self, monkeypatch):
+        self.fetches: list[int] = []
+        self.posted: list[httpx.Request] = []
+        real_client = httpx.AsyncClient
+        self.auth = PushNotificationSenderAuth(
+            real_client(transport=httpx.MockTransport(self.capture))
+        )
+
+        def jwks_client(**kwargs):
+            return real_client(
+                transport=httpx.MockTransport(self.jwks), **kwargs
+            )
+
+        monkeypatch.setattr(httpx, 'AsyncClient', jwks_client)
+
+    def capture(self, request):
+        self.posted.append(request)
+        return httpx.Response(200)
+
+    def jwks(self, request):
+        assert str(request.url) == JWKS_URL
+        self.fetches.append(len(self.auth.public_keys))
+        return httpx.Response(200, json={'keys': self.auth.public_keys})
+
+    async def notify(self, data=DATA, body=None):
+        """Sign and post `data`; return it as the receiver would see it.
+
+        `body` replaces the posted bytes, keeping the signed token.
+        """
+        await self.auth.post_push_notification('http://client/hook', data)
+        sent = self.posted[-1]
+        content = sent.content if body is None else body
+        scope = {
+            'type': 'http',
+            'method': 'POST',
+            'path': '/hook',
+            'headers': [
+                (name.lower().encode(), value.encode())
+                for name, value in sent.headers.items()
+            ],
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': content}
+
+        return Request(scope, receive)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    return Agent(monkeypatch)
+
+
+async def receiver(**kwargs):
+    auth = PushNotificationReceiverAuth(**kwargs)
+    await auth.load_jwks(JWKS_URL)
+    return auth
+
+
+@pytest.mark.parametrize('algorithm', ['RS256', 'ES256', 'EdDSA'])
+def test_verifies_signed_notification(agent, algorithm):
+    async def run():
+        agent.auth.generate_jwk(algorithm)
+        auth = await receiver()
+        assert await auth.verify_push_notification(await agent.notify())
+
+    asyncio.run(run())
+
+
+def test_keys_are_cached_by_kid(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver()
+        for _ in range(3):
+            assert await auth.verify_push_notification(await agent.notify())
+        assert agent.fetches == [1]
+
+    asyncio.run(run())
+
+
+def test_stale_keys_are_refreshed_in_background(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver(refresh_interval=0, min_refresh_interval=0)
+        await asyncio.sleep(0.01)
+        # Verified with the cached key while the refresh runs
+        assert await auth.verify_push_notification(await agent.notify())
+        for _ in range(100):
+            if len(agent.fetches) > 1:
+                break
+            await asyncio.sleep(0.01)
+        assert agent.fetches == [1, 1]
+
+    asyncio.run(run())
+
+
+def test_rotated_key_is_fetched_on_first_use(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver(min_refresh_interval=0)
+        old = await agent.notify()
+        agent.auth.generate_jwk('EdDSA')
+        assert await auth.verify_push_notification(await agent.notify())
+        # Keys from before the rotation stay published
+        assert await auth.verify_push_notification(old)
+        assert agent.fetches == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_unknown_kid_refresh_is_rate_limited(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver(min_refresh_interval=60)
+        agent.auth.generate_jwk('ES256')
+        with pytest.raises(ValueError, match='Unknown signing key'):
+            await auth.verify_push_notification(await agent.notify())
+        assert agent.fetches == [1]
+
+    asyncio.run(run())
+
+
+def test_keys_for_other_algorithms_are_ignored(agent):
+    async def run():
+        agent.auth.generate_jwk('RS256')
+        auth = await receiver(min_refresh_interval=60, algorithms=('ES256',))
+        with pytest.raises(ValueError, match='Unknown signing key'):
+            await auth.verify_push_notification(await agent.notify())
+
+    asyncio.run(run())
+
+
+def test_token_algorithm_must_match_key(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver()
+        request = await agent.notify()
+        kid = agent.auth.public_keys[0]['kid']
+        forged = jwt.encode(
+            {'iat': 0, 'request_body_sha256': ''},
+            'secret-key-of-at-least-32-bytes!',
+            algorithm='HS256',
+            headers={'kid': kid},
+        )
+        request.scope['headers'] = [
+            (b'authorization', f'Bearer {forged}'.encode())
+        ]
+        with pytest.raises(ValueError, match='algorithm'):
+            await auth.verify_push_notification(Request(request.scope))
+
+    asyncio.run(run())
+
+
+def test_reserialized_body_matches_canonical_digest(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver()
+        body = json.dumps(DATA, indent=2).encode()
+        assert await auth.verify_push_notification(
+            await agent.notify(body=body)
+        )
+
+    asyncio.run(run())
+
+
+def test_tampered_body_is_rejected(agent):
+    async def run():
+        agent.auth.generate_jwk('ES256')
+        auth = await receiver()
+        body = json.dumps({**DATA, 'id': 'other'}).encode()
+        with pytest.raises(ValueError, match='Invalid request body'):
+            await auth.verify_push_notification(await agent.notify(body=body))
+
+    asyncio.run(run())
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+
+from common.utils.push_notification_delivery import PushNotificationDelivery
+
+
+class FakeSender:
+    """Records posts; fails with the queued status codes first."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.posts = []
+        self.closed = False
+
+    async def post_push_notification(self, url, data, timeout=None):
+        await asyncio.sleep(0)
+        if self.failures:
+            status_code = self.failures.pop(0)
+            request = httpx.Request('POST', url)
+            raise httpx.HTTPStatusError(
+                'failed',
+                request=request,
+                response=httpx.Response(status_code, request=request),
+            )
+        self.posts.append((url, data))
+
+    async def aclose(self):
+        self.closed = True
+
+
+def delivery(sender, **kwargs):
+    kwargs.setdefault('base_backoff', 0.001)
+    return PushNotificationDelivery(sender, **kwargs)
+
+
+def test_retries_server_errors_then_delivers():
+    async def run():
+        failures = [503, 500]
+        sender = FakeSender(failures=list(failures))
+        engine = delivery(sender)
+        engine.enqueue('http://hook/a', {'n': 1}, key='t')
+        await engine.flush(timeout=5)
+        assert sender.posts == [('http://hook/a', {'n': 1})]
+        assert engine.metrics.retried == len(failures)
+        assert engine.metrics.delivered == 1
+        await engine.aclose()
+        assert sender.closed
+
+    asyncio.run(run())
+
+
+def test_client_errors_are_dead_lettered_without_retry():
+    async def run():
+        sender = FakeSender(failures=[400])
+        engine = delivery(sender)
+        engine.enqueue('http://hook/a', {'n': 1}, key='t')
+        await engine.flush(timeout=5)
+        assert sender.posts == []
+        assert engine.metrics.retried == 0
+        [dead] = engine.dead_letters
+        assert dead.attempts == 1
+        assert dead.data == {'n': 1}
+
+    asyncio.run(run())
+
+
+def test_dead_letters_after_max_attempts():
+    async def run():
+        sender = FakeSender(failures=[500] * 10)
+        max_attempts = 3
+        engine = delivery(sender, max_attempts=max_attempts)
+        engine.enqueue('http://hook/a', {'n': 1}, key='t')
+        await engine.flush(timeout=5)
+        [dead] = engine.dead_letters
+        assert dead.attempts == max_attempts
+        assert engine.metrics.failed_attempts == max_attempts
+
+    asyncio.run(run())
+
+
+def test_same_task_is_delivered_in_order_across_retries():
+    async def run():
+        sender = FakeSender(failures=[503])
+        engine = delivery(sender, coalesce=False, max_concurrency=4)
+        for n in range(3):
+            engine.enqueue('http://hook/a', {'n': n}, key='t')
+        await engine.flush(timeout=5)
+        assert [data['n'] for _, data in sender.posts] == [0, 1, 2]
+
+    asyncio.run(run())
+
+
+def test_coalesce_replaces_pending_snapshot():
+    async def run():
+        sender = FakeSender()
+        engine = delivery(sender, max_concurrency=1)
+        for n in range(3):
+            engine.enqueue('http://hook/a', {'n': n}, key='t')
+        # Let the worker take the pending snapshot
+        await asyncio.sleep(0)
+        for n in range(3, 6):
+            engine.enqueue('http://hook/a', {'n': n}, key='t')
+        await engine.flush(timeout=5)
+        sent = [data['n'] for _, data in sender.posts]
+        assert (sent, engine.metrics.coalesced) == ([2, 5], 4)
+
+    asyncio.run(run())
+
+
+def test_full_queue_dead_letters():
+    async def run():
+        sender = FakeSender()
+        engine = delivery(sender, max_pending=1, coalesce=False)
+        assert engine.enqueue('http://hook/a', {'n': 0}, key='a')
+        assert not engine.enqueue('http://hook/a', {'n': 1}, key='b')
+        assert engine.dead_letters[0].error == 'queue full'
+        await engine.flush(timeout=5)
+        assert len(sender.posts) == 1
+
+    asyncio.run(run())
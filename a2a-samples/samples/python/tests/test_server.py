@@ -0,0 +1,126 @@
+import asyncio
+
+from http import HTTPStatus
+
+import pytest
+
+from common.server.server import A2AServer
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    InvalidRequestError,
+    JSONParseError,
+    MethodNotFoundError,
+    Task,
+    TaskNotFoundError,
+    TaskStatus,
+)
+from starlette.testclient import TestClient
+
+
+class Manager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def agent_card(name='test'):
+    return AgentCard(
+        name=name,
+        url='http://localhost',
+        version='1',
+        capabilities=AgentCapabilities(),
+        skills=[],
+    )
+
+
+@pytest.fixture
+def server():
+    manager = Manager()
+    asyncio.run(
+        manager.task_store.create(
+            Task(id='t', status=TaskStatus(state='working'))
+        )
+    )
+    return A2AServer(agent_card=agent_card(), task_manager=manager)
+
+
+def rpc(method, request_id, **params):
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': method,
+        'params': params,
+    }
+
+
+def test_single_request_dispatches_by_method(server):
+    client = TestClient(server.app)
+    response = client.post('/', json=rpc('tasks/get', 1, id='t'))
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['result']['id'] == 't'
+
+
+def test_unknown_method_and_parse_errors(server):
+    client = TestClient(server.app)
+    response = client.post('/', json=rpc('tasks/nope', 1, id='t'))
+    assert response.json()['error']['code'] == MethodNotFoundError().code
+    assert response.json()['id'] == 1
+
+    response = client.post('/', content=b'{not json')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['error']['code'] == JSONParseError().code
+
+
+def test_batch_answers_each_entry_in_order(server):
+    client = TestClient(server.app)
+    response = client.post(
+        '/',
+        json=[
+            rpc('tasks/get', 1, id='t'),
+            rpc('tasks/get', 2, id='missing'),
+            rpc('tasks/nope', 3),
+            rpc('tasks/resubscribe', 4, id='t'),
+            'not an object',
+        ],
+    )
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()
+    assert [r.get('id') for r in results] == [1, 2, 3, 4, None]
+    assert results[0]['result']['id'] == 't'
+    assert results[1]['error']['code'] == TaskNotFoundError().code
+    assert results[2]['error']['code'] == MethodNotFoundError().code
+    assert results[3]['error']['code'] == InvalidRequestError().code
+    assert results[4]['error']['code'] == InvalidRequestError().code
+
+
+def test_empty_batch_is_invalid(server):
+    response = TestClient(server.app).post('/', json=[])
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['error']['code'] == InvalidRequestError().code
+
+
+def test_agent_card_etag(server):
+    client = TestClient(server.app)
+    response = client.get('/.well-known/agent.json')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['name'] == 'test'
+    etag = response.headers['etag']
+    assert response.headers['cache-control'] == 'public, max-age=300'
+
+    response = client.get(
+        '/.well-known/agent.json', headers={'If-None-Match': etag}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+
+    # Replacing the card changes the ETag
+    server.agent_card = agent_card('renamed')
+    response = client.get(
+        '/.well-known/agent.json', headers={'If-None-Match': etag}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
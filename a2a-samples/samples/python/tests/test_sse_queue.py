@@ -0,0 +1,120 @@
+import asyncio
+
+from common.server.sse_queue import SlowConsumerPolicy, SubscriberQueue
+from common.types import (
+    Artifact,
+    JSONRPCError,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+def status(state=TaskState.WORKING, final=False):
+    return TaskStatusUpdateEvent(
+        id='t', status=TaskStatus(state=state), final=final
+    )
+
+
+def artifact(name):
+    return TaskArtifactUpdateEvent(
+        id='t', artifact=Artifact(name=name, parts=[TextPart(text=name)])
+    )
+
+
+def drain(queue):
+    async def run():
+        events = []
+        while not queue.empty():
+            events.append(await queue.get())
+        return events
+
+    return asyncio.run(run())
+
+
+def is_gap(event):
+    return (event.metadata or {}).get('gap', False)
+
+
+def test_drop_oldest_replaces_dropped_events_with_gap_marker():
+    queue = SubscriberQueue('t', maxsize=2)
+    queue.put_nowait(status(TaskState.SUBMITTED))
+    queue.put_nowait(artifact('a'))
+    queue.put_nowait(artifact('b'))
+    queue.put_nowait(artifact('c'))
+    events = drain(queue)
+    assert is_gap(events[0])
+    assert events[0].metadata == {'gap': True, 'droppedEvents': 2}
+    # The marker carries the last dropped status
+    assert events[0].status.state == TaskState.SUBMITTED
+    assert [e.artifact.name for e in events[1:]] == ['b', 'c']
+
+
+def test_final_status_and_errors_are_always_queued():
+    queue = SubscriberQueue('t', maxsize=1)
+    queue.put_nowait(artifact('a'))
+    queue.put_nowait(JSONRPCError(code=1, message='boom'))
+    queue.put_nowait(status(TaskState.COMPLETED, final=True))
+    events = drain(queue)
+    # The queue grows past maxsize rather than drop them
+    assert events[0].artifact.name == 'a'
+    assert isinstance(events[1], JSONRPCError)
+    assert events[2].final
+    assert queue.metrics.dropped == 0
+
+
+def test_coalesce_replaces_status_with_newer_status():
+    queue = SubscriberQueue('t', maxsize=2, policy=SlowConsumerPolicy.COALESCE)
+    queue.put_nowait(status(TaskState.SUBMITTED))
+    queue.put_nowait(artifact('a'))
+    queue.put_nowait(status(TaskState.INPUT_REQUIRED))
+    events = drain(queue)
+    assert not any(is_gap(e) for e in events)
+    assert events[0].artifact.name == 'a'
+    assert events[1].status.state == TaskState.INPUT_REQUIRED
+    assert queue.metrics.coalesced == 1
+
+
+def test_coalesce_keeps_latest_status_when_artifact_arrives():
+    queue = SubscriberQueue('t', maxsize=2, policy=SlowConsumerPolicy.COALESCE)
+    queue.put_nowait(status(TaskState.INPUT_REQUIRED))
+    queue.put_nowait(artifact('a'))
+    queue.put_nowait(artifact('b'))
+    events = drain(queue)
+    # Nothing supersedes the queued status, so it is dropped with a gap
+    # marker that still carries its state
+    assert is_gap(events[0])
+    assert events[0].status.state == TaskState.INPUT_REQUIRED
+    assert [e.artifact.name for e in events[1:]] == ['a', 'b']
+    assert queue.metrics.coalesced == 0
+
+
+def test_coalesce_drops_status_superseded_by_queued_status():
+    queue = SubscriberQueue('t', maxsize=3, policy=SlowConsumerPolicy.COALESCE)
+    queue.put_nowait(status(TaskState.SUBMITTED))
+    queue.put_nowait(artifact('a'))
+    queue.put_nowait(status(TaskState.WORKING))
+    queue.put_nowait(artifact('b'))
+    events = drain(queue)
+    assert not any(is_gap(e) for e in events)
+    assert [type(e).__name__ for e in events] == [
+        'TaskArtifactUpdateEvent',
+        'TaskStatusUpdateEvent',
+        'TaskArtifactUpdateEvent',
+    ]
+
+
+def test_disconnect_closes_queue_with_error():
+    queue = SubscriberQueue(
+        't', maxsize=1, policy=SlowConsumerPolicy.DISCONNECT
+    )
+    assert queue.put_nowait(artifact('a'))
+    assert not queue.put_nowait(artifact('b'))
+    assert queue.closed
+    assert not queue.put_nowait(artifact('c'))
+    events = drain(queue)
+    assert len(events) == 1
+    assert isinstance(events[0], JSONRPCError)
+    assert queue.metrics.disconnected == 1
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+
+from common.server.task_store import (
+    InMemoryTaskStore,
+    RetentionPolicy,
+    SQLiteTaskStore,
+)
+from common.types import Message, Task, TaskState, TaskStatus, TextPart
+
+
+def message(text):
+    return Message(role='user', parts=[TextPart(text=text)])
+
+
+def task(task_id, state=TaskState.WORKING):
+    return Task(id=task_id, status=TaskStatus(state=state), history=[])
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(retention=None):
+        if request.param == 'memory':
+            store = InMemoryTaskStore(retention)
+        else:
+            store = SQLiteTaskStore(tmp_path / 'tasks.sqlite3', retention)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if isinstance(store, SQLiteTaskStore):
+            store.close()
+
+
+def test_create_get_update_and_delete(make_store):
+    async def run():
+        store = make_store()
+        await store.create(task('t'))
+        await store.append_message('t', message('hi'))
+        await store.update('t', TaskStatus(state=TaskState.COMPLETED))
+        stored = await store.get('t')
+        assert stored.status.state == TaskState.COMPLETED
+        assert [m.parts[0].text for m in stored.history] == ['hi']
+        assert await store.delete('t')
+        assert await store.get('t') is None
+        assert not await store.delete('t')
+        with pytest.raises(ValueError):
+            await store.append_message('t', message('late'))
+
+    asyncio.run(run())
+
+
+def test_get_window_returns_latest_messages(make_store):
+    async def run():
+        store = make_store()
+        await store.create(task('t'))
+        texts = [str(i) for i in range(5)]
+        for text in texts:
+            await store.append_message('t', message(text))
+        window = await store.get_window('t', 2)
+        assert [m.parts[0].text for m in window.history] == ['3', '4']
+        assert (await store.get_window('t', None)).history == []
+        assert (await store.get_window('t', 0)).history == []
+        assert await store.get_window('missing', 2) is None
+        # The window is a copy; the stored history is untouched
+        stored = (await store.get('t')).history
+        assert [m.parts[0].text for m in stored] == texts
+
+    asyncio.run(run())
+
+
+def test_max_history_keeps_latest_messages(make_store):
+    async def run():
+        max_history = 3
+        store = make_store(RetentionPolicy(max_history=max_history))
+        await store.create(task('t'))
+        for i in range(10):
+            await store.append_message('t', message(str(i)))
+        history = (await store.get('t')).history
+        assert [m.parts[0].text for m in history][-3:] == ['7', '8', '9']
+        # The in-memory store trims in batches
+        assert len(history) <= 2 * max_history
+
+    asyncio.run(run())
+
+
+def test_max_tasks_evicts_finished_tasks_first(make_store):
+    async def run():
+        store = make_store(RetentionPolicy(max_tasks=2))
+        removed = []
+
+        async def on_removed(task_id):
+            removed.append(task_id)
+
+        store.add_removal_listener(on_removed)
+        await store.create(task('active'))
+        await store.create(task('done', TaskState.COMPLETED))
+        await store.create(task('new'))
+        assert await store.get('done') is None
+        assert await store.get('active') is not None
+        assert await store.get('new') is not None
+        assert removed == ['done']
+
+    asyncio.run(run())
+
+
+def test_completed_ttl_expires_finished_tasks(make_store):
+    async def run():
+        store = make_store(RetentionPolicy(completed_ttl=0.05))
+        removed = []
+
+        async def on_removed(task_id):
+            removed.append(task_id)
+
+        store.add_removal_listener(on_removed)
+        await store.create(task('done', TaskState.COMPLETED))
+        await store.create(task('active'))
+        time.sleep(0.1)
+        assert await store.get('done') is None
+        assert await store.get('active') is not None
+        assert await store.prune() == 1
+        assert removed == ['done']
+
+    asyncio.run(run())
+
+
+def test_sqlite_writes_return_only_what_they_added(tmp_path, monkeypatch):
+    async def run():
+        store = SQLiteTaskStore(tmp_path / 'tasks.sqlite3')
+        await store.create(task('t'))
+        await store.append_message('t', message('first'))
+
+        def load(*args, **kwargs):
+            raise AssertionError('writes must not reload the task')
+
+        monkeypatch.setattr(store, '_load', load)
+        appended = await store.append_message('t', message('second'))
+        assert appended.status.state == TaskState.WORKING
+        assert [m.parts[0].text for m in appended.history] == ['second']
+        status = TaskStatus(state=TaskState.COMPLETED, message=message('done'))
+        updated = await store.update('t', status)
+        assert updated.status == status
+        assert [m.parts[0].text for m in updated.history] == ['done']
+        monkeypatch.undo()
+        stored = await store.get('t')
+        assert [m.parts[0].text for m in stored.history] == [
+            'first',
+            'second',
+            'done',
+        ]
+        store.close()
+
+    asyncio.run(run())
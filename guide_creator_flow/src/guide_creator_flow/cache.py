@@ -0,0 +1,176 @@
+"""
+Cache backends for the Universal Command Center.
+
+``LocalCache`` keeps values in the current process and is the default.
+``SQLiteCache`` stores them in a SQLite file so every uvicorn worker on the
+same host shares one cache. Pick the backend with ``COMMAND_CENTER_CACHE``
+(``local`` or ``sqlite``) and the file with ``COMMAND_CENTER_CACHE_PATH``.
+
+Values must be JSON-serializable so both backends behave the same.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+CACHE_BACKEND_ENV = "COMMAND_CENTER_CACHE"
+CACHE_PATH_ENV = "COMMAND_CENTER_CACHE_PATH"
+DEFAULT_CACHE_PATH = Path("data") / "cache.sqlite3"
+
+
+class CacheBackend(ABC):
+    """Abstract key/value cache with optional per-entry TTL."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value. ``ttl`` is in seconds; None means no expiry."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a key. Returns whether it was present."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every key in this namespace."""
+        pass
+
+
+class LocalCache(CacheBackend):
+    """In-process cache. Fast, but each worker has its own copy."""
+
+    def __init__(self, namespace: str):
+        super().__init__(namespace)
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and time.time() > expires_at:
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """Cache stored in a SQLite file, shared by all processes on one host.
+
+    Uses WAL mode so readers in one worker don't block writers in another.
+    Expired rows are removed lazily on read and swept on write.
+    """
+
+    def __init__(self, namespace: str, path: Path = DEFAULT_CACHE_PATH):
+        super().__init__(namespace)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and time.time() > expires_at:
+            self.delete(key)
+            return default
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, default=str), expires_at),
+            )
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?",
+                (self.namespace, now),
+            )
+
+    def delete(self, key: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+
+_caches: Dict[str, CacheBackend] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> CacheBackend:
+    """Return the process-wide cache for ``namespace`` using the configured backend."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            backend = os.getenv(CACHE_BACKEND_ENV, "local").lower()
+            if backend == "sqlite":
+                path = Path(os.getenv(CACHE_PATH_ENV, str(DEFAULT_CACHE_PATH)))
+                cache = SQLiteCache(namespace, path)
+            elif backend == "local":
+                cache = LocalCache(namespace)
+            else:
+                raise ValueError(f"Unknown cache backend '{backend}'. Use 'local' or 'sqlite'.")
+            _caches[namespace] = cache
+        return cache
@@ -3,12 +3,16 @@ Chat handler for conversational LLM interactions.
 """
 import os
 import re
-from typing import Optional
-from crewai import Agent, Task, Crew
+from typing import Any, Dict, Optional, Tuple
 from .base import BaseHandler, CommandResult
+from ..prompt_budget import PromptBudget
 from ..tools.youtube_transcript import YouTubeTranscriptExtractor
 
 
+# Token budget for the user message plus any context pulled in for it
+CHAT_PROMPT_BUDGET = 4000
+
+
 class ChatHandler(BaseHandler):
     """Handler for conversational LLM interactions."""
     
@@ -39,8 +43,10 @@ class ChatHandler(BaseHandler):
             )
         
         try:
+            from crewai import Agent, Task, Crew
+            
             # Check for @tab reference and extract YouTube transcript if needed
-            enhanced_message = await self._process_tab_references(args)
+            enhanced_message, prompt_budget = await self._process_tab_references(args)
             
             # Create a conversational agent
             chat_agent = Agent(
@@ -70,10 +76,14 @@ class ChatHandler(BaseHandler):
             
             result = crew.kickoff()
             
+            metadata = {"type": "chat", "query": args}
+            if prompt_budget:
+                metadata["prompt_budget"] = prompt_budget
+            
             return CommandResult(
                 success=True,
                 data=str(result),
-                metadata={"type": "chat", "query": args}
+                metadata=metadata
             )
             
         except Exception as e:
@@ -112,32 +122,44 @@ The AI assistant can help with:
 - Supports follow-up questions and context
 """
     
-    async def _process_tab_references(self, message: str) -> str:
-        """Process @tab references in the message and extract YouTube transcripts if needed."""
+    async def _process_tab_references(self, message: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Process @tab references in the message and extract YouTube transcripts if needed.
+        
+        Returns the enhanced message and the prompt budget allocation, if a
+        transcript was fitted into the prompt.
+        """
         # Check if message contains @tab reference
         if '@tab' not in message.lower():
-            return message
+            return message, None
         
         # Check if we have browser context available
         if not self._browser_context:
-            return message
+            return message, None
         
         # Get the URL from browser context
         current_url = self._browser_context.get('url', '')
         if not current_url:
-            return message
+            return message, None
         
         # Check if it's a YouTube URL
         if not self.youtube_extractor.is_youtube_url(current_url):
-            return message
+            return message, None
         
         try:
             # Extract transcript
             transcript_result = self.youtube_extractor.get_transcript(current_url)
             
             if transcript_result['success']:
+                # Fit the timestamped passages most relevant to the message into the budget
+                passages, scores = self.youtube_extractor.relevant_passages(transcript_result, message)
+                budget = PromptBudget(CHAT_PROMPT_BUDGET, query=message)
+                budget.reserve("message", message)
+                budget.add("transcript", passages, select="relevance", separator="\n", scores=scores)
+                excerpt = budget.assemble()["transcript"]
+                
                 # Format transcript for chat
-                transcript_text = self.youtube_extractor.format_transcript_for_chat(transcript_result)
+                transcript_text = self.youtube_extractor.format_transcript_for_chat(transcript_result, excerpt=excerpt)
                 
                 # Replace @tab with the transcript
                 enhanced_message = message.replace('@tab', f'this YouTube video:\n\n{transcript_text}')
@@ -145,7 +167,7 @@ The AI assistant can help with:
                 print(f"🎥 YouTube transcript extracted from {current_url}")
                 print(f"📝 Transcript length: {transcript_result['transcript_length']} characters")
                 
-                return enhanced_message
+                return enhanced_message, budget.allocation
             else:
                 # If transcript extraction failed, just replace @tab with URL info
                 page_title = self._browser_context.get('title', 'YouTube video')
@@ -153,7 +175,7 @@ The AI assistant can help with:
                 
                 print(f"⚠️ YouTube transcript extraction failed: {transcript_result['error']}")
                 
-                return enhanced_message
+                return enhanced_message, None
                 
         except Exception as e:
             print(f"❌ Error processing YouTube transcript: {str(e)}")
@@ -162,4 +184,4 @@ The AI assistant can help with:
             page_title = self._browser_context.get('title', 'current tab')
             enhanced_message = message.replace('@tab', f'this page: {page_title} ({current_url})')
             
-            return enhanced_message
\ No newline at end of file
+            return enhanced_message, None
\ No newline at end of file
@@ -1,15 +1,19 @@
 """
 Memory command handler for storing and retrieving information.
 """
-import json
 import os
 import base64
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from crewai import Agent, Task, Crew, Process
-import weave
 from .base import BaseHandler, CommandResult
+from ..memory_store import MemoryStore, generate_memory_id
+from ..prompt_budget import PromptBudget
+
+
+# Token budgets for the context these prompts include
+MEMORY_SEARCH_PROMPT_BUDGET = 6000
+PAGE_SUMMARY_PROMPT_BUDGET = 1000
 
 
 class MemoryHandler(BaseHandler):
@@ -19,31 +23,25 @@ class MemoryHandler(BaseHandler):
         super().__init__()
         self.data_dir = Path("data")
         self.memory_file = self.data_dir / "memories.json"
+        self.store = MemoryStore(self.memory_file)
         self._ensure_data_dir()
     
     def _ensure_data_dir(self):
         """Ensure data directory and memory file exist."""
-        self.data_dir.mkdir(exist_ok=True)
-        if not self.memory_file.exists():
-            self._save_memories([])
+        self.store.ensure()
     
     def _load_memories(self) -> List[Dict[str, Any]]:
         """Load memories from JSON file."""
-        try:
-            with open(self.memory_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
+        return self.store.load()
     
     def _save_memories(self, memories: List[Dict[str, Any]]):
         """Save memories to JSON file."""
-        with open(self.memory_file, 'w') as f:
-            json.dump(memories, f, indent=2, default=str)
+        self.store.save(memories)
     
     def _generate_id(self) -> str:
         """Generate a unique ID for a memory."""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"mem_{timestamp}"
+        # Random suffix keeps ids unique across workers saving in the same second
+        return generate_memory_id()
     
     @property
     def command(self) -> str:
@@ -179,8 +177,6 @@ Store and retrieve information from your local knowledge base.
                 error="Please provide content after `/memory save`"
             )
         
-        memories = self._load_memories()
-        
         new_memory = {
             "id": self._generate_id(),
             "content": content,
@@ -188,8 +184,7 @@ Store and retrieve information from your local knowledge base.
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        memories.append(new_memory)
-        self._save_memories(memories)
+        self.store.append([new_memory])
         
         return CommandResult(
             success=True,
@@ -222,8 +217,14 @@ Store and retrieve information from your local knowledge base.
         url = parts[0]
         page_content = parts[1]
         
+        budget = PromptBudget(PAGE_SUMMARY_PROMPT_BUDGET)
+        budget.add("page_content", page_content)
+        page_excerpt = budget.assemble()["page_content"]
+        
         # Use CrewAI to analyze and summarize the page content
         try:
+            from crewai import Agent, Task, Crew, Process
+            
             # Create an analysis agent
             analyzer_agent = Agent(
                 role="Web Content Analyzer",
@@ -240,7 +241,7 @@ Store and retrieve information from your local knowledge base.
                 description=f"""Analyze the following web page content from {url} and create a summary:
                 
                 Content:
-                {page_content[:3000]}{'...' if len(page_content) > 3000 else ''}
+                {page_excerpt}
                 
                 Create a comprehensive summary that includes:
                 1. Main topic or purpose of the page
@@ -263,9 +264,6 @@ Store and retrieve information from your local knowledge base.
             
             summary = crew.kickoff()
             
-            # Load existing memories
-            memories = self._load_memories()
-            
             # Create new memory with URL and summary
             new_memory = {
                 "id": self._generate_id(),
@@ -277,8 +275,7 @@ Store and retrieve information from your local knowledge base.
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            memories.append(new_memory)
-            self._save_memories(memories)
+            self.store.append([new_memory])
             
             return CommandResult(
                 success=True,
@@ -287,14 +284,13 @@ Store and retrieve information from your local knowledge base.
                     "command": "memory",
                     "subcommand": "save_page",
                     "memory_id": new_memory['id'],
-                    "url": url
+                    "url": url,
+                    "prompt_budget": budget.allocation
                 }
             )
             
         except Exception as e:
             # Fallback: save without AI summary
-            memories = self._load_memories()
-            
             new_memory = {
                 "id": self._generate_id(),
                 "type": "webpage",
@@ -304,8 +300,7 @@ Store and retrieve information from your local knowledge base.
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            memories.append(new_memory)
-            self._save_memories(memories)
+            self.store.append([new_memory])
             
             return CommandResult(
                 success=True,
@@ -322,6 +317,8 @@ Store and retrieve information from your local knowledge base.
     async def _handle_save_page_image(self, url: str, screenshot_base64: str, title: Optional[str] = None) -> CommandResult:
         """Save a web page from screenshot with AI-generated summary."""
         try:
+            from crewai import Agent, Task, Crew, Process
+            
             # Create a vision-capable analysis agent
             analyzer_agent = Agent(
                 role="Visual Web Content Analyzer",
@@ -448,9 +445,6 @@ Store and retrieve information from your local knowledge base.
                     print(f"DEBUG: Response body: {getattr(api_error.response, 'text', 'N/A')}")
                 raise api_error
             
-            # Load existing memories
-            memories = self._load_memories()
-            
             # Create new memory with URL and visual summary
             new_memory = {
                 "id": self._generate_id(),
@@ -463,8 +457,7 @@ Store and retrieve information from your local knowledge base.
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            memories.append(new_memory)
-            self._save_memories(memories)
+            self.store.append([new_memory])
             
             return CommandResult(
                 success=True,
@@ -480,8 +473,6 @@ Store and retrieve information from your local knowledge base.
             
         except Exception as e:
             # Fallback: save with basic info
-            memories = self._load_memories()
-            
             new_memory = {
                 "id": self._generate_id(),
                 "type": "webpage_screenshot",
@@ -493,8 +484,7 @@ Store and retrieve information from your local knowledge base.
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            memories.append(new_memory)
-            self._save_memories(memories)
+            self.store.append([new_memory])
             
             return CommandResult(
                 success=True,
@@ -528,6 +518,8 @@ Store and retrieve information from your local knowledge base.
         
         # Use CrewAI to search through memories
         try:
+            from crewai import Agent, Task, Crew, Process
+            
             # Create a search agent
             search_agent = Agent(
                 role="Knowledge Assistant",
@@ -540,11 +532,16 @@ Store and retrieve information from your local knowledge base.
                 allow_delegation=False
             )
             
-            # Format memories for the agent (without IDs, focus on content)
-            memories_text = "\n\n".join([
-                f"Memory from {mem['created_at']}:\n{mem['content']}"
-                for mem in memories
-            ])
+            # Format memories for the agent (without IDs, focus on content),
+            # keeping the ones most relevant to the query that fit the budget
+            budget = PromptBudget(MEMORY_SEARCH_PROMPT_BUDGET, query=query)
+            budget.reserve("query", query)
+            budget.add(
+                "memories",
+                [f"Memory from {mem['created_at']}:\n{mem['content']}" for mem in memories],
+                select="relevance"
+            )
+            memories_text = budget.assemble()["memories"]
             
             # Create a search task
             search_task = Task(
@@ -587,7 +584,8 @@ Store and retrieve information from your local knowledge base.
                     "command": "memory",
                     "subcommand": "search",
                     "query": query,
-                    "method": "ai_search"
+                    "method": "ai_search",
+                    "prompt_budget": budget.allocation
                 }
             )
             
@@ -686,21 +684,14 @@ Store and retrieve information from your local knowledge base.
                 error="Please provide a memory ID to delete"
             )
         
-        memories = self._load_memories()
-        original_count = len(memories)
-        
-        # Filter out the memory with the given ID
-        memories = [m for m in memories if m['id'] != memory_id]
-        
-        if len(memories) == original_count:
+        # Remove the memory with the given ID
+        if not self.store.delete(memory_id):
             return CommandResult(
                 success=False,
                 data=f"❌ Memory with ID `{memory_id}` not found.",
                 error="Memory not found"
             )
         
-        self._save_memories(memories)
-        
         return CommandResult(
             success=True,
             data=f"✅ Memory `{memory_id}` deleted successfully.",
@@ -2,9 +2,16 @@
 Script handler for generating JavaScript code based on user prompts using CrewAI.
 """
 import asyncio
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
 from .base import BaseHandler, CommandResult
-from ..crews.script_crew import ScriptCrew
+from ..prompt_budget import PromptBudget
+
+if TYPE_CHECKING:
+    from ..crews.script_crew import ScriptCrew
+
+
+# Token budget for the browser context added to the script description
+SCRIPT_CONTEXT_PROMPT_BUDGET = 800
 
 
 class ScriptHandler(BaseHandler):
@@ -21,9 +28,10 @@ class ScriptHandler(BaseHandler):
         self._browser_context = context
     
     @property
-    def crew(self) -> ScriptCrew:
+    def crew(self) -> "ScriptCrew":
         """Lazy initialization of the ScriptCrew."""
         if self._crew is None:
+            from ..crews.script_crew import ScriptCrew
             self._crew = ScriptCrew()
         return self._crew
     
@@ -46,7 +54,7 @@ class ScriptHandler(BaseHandler):
         
         try:
             # Check if we have browser automation context
-            browser_context = self._extract_browser_context()
+            browser_context, prompt_budget = self._extract_browser_context(args.strip())
             if browser_context:
                 print("🌐 Using browser context for script generation")
                 # Enhance the prompt with context
@@ -93,7 +101,8 @@ class ScriptHandler(BaseHandler):
                     "description": args.strip(),
                     "js_code": js_code,
                     "ai_generated": True,
-                    "used_browser_context": bool(browser_context)
+                    "used_browser_context": bool(browser_context),
+                    "prompt_budget": prompt_budget
                 }
             )
             
@@ -108,10 +117,16 @@ class ScriptHandler(BaseHandler):
                 }
             )
     
-    def _extract_browser_context(self) -> str:
-        """Extract browser context from the current request if available."""
+    def _extract_browser_context(self, description: str = "") -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Extract browser context from the current request if available.
+        
+        Page details and DOM elements are fitted into SCRIPT_CONTEXT_PROMPT_BUDGET,
+        preferring the elements most relevant to the script description. Returns
+        the formatted context and the budget allocation.
+        """
         if not self._browser_context:
-            return None
+            return None, None
             
         # Format the browser context for the AI prompt
         context_parts = []
@@ -125,15 +140,26 @@ class ScriptHandler(BaseHandler):
         if 'selected_text' in self._browser_context and self._browser_context['selected_text'] != 'none':
             context_parts.append(f"Selected Text: {self._browser_context['selected_text']}")
         
+        element_lines = []
         if 'dom_elements' in self._browser_context and self._browser_context['dom_elements']:
-            context_parts.append("Available elements on page:")
-            for elem in self._browser_context['dom_elements'][:5]:  # Limit to 5 most relevant
+            for elem in self._browser_context['dom_elements']:
                 if 'selector' in elem and 'text' in elem:
-                    context_parts.append(f"  - {elem['selector']}: '{elem['text'][:50]}...' ")
+                    element_lines.append(f"  - {elem['selector']}: '{elem['text'][:50]}...' ")
                 elif 'selector' in elem:
-                    context_parts.append(f"  - {elem['selector']}")
+                    element_lines.append(f"  - {elem['selector']}")
+        
+        if not context_parts and not element_lines:
+            return None, None
+        
+        budget = PromptBudget(SCRIPT_CONTEXT_PROMPT_BUDGET, query=description)
+        budget.add("page", context_parts, priority=1, separator="\n")
+        budget.add("dom_context", element_lines, select="relevance", separator="\n")
+        fitted = budget.assemble()
         
-        return "\n".join(context_parts) if context_parts else None
+        sections = [fitted["page"]] if fitted["page"] else []
+        if fitted["dom_context"]:
+            sections.append("Available elements on page:\n" + fitted["dom_context"])
+        return "\n".join(sections), budget.allocation
     
     def get_help(self, subcommand: Optional[str] = None) -> str:
         """Get help text for the script command."""
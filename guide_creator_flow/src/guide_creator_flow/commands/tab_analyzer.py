@@ -8,9 +8,14 @@ from datetime import datetime
 import openai
 
 from .base import BaseHandler, CommandResult
+from ..prompt_budget import PromptBudget
 from ..tools.youtube_transcript import YouTubeTranscriptExtractor
 
 
+# Token budget for the query plus transcript context, shared across all tabs
+TAB_ANALYSIS_PROMPT_BUDGET = 3000
+
+
 class TabAnalyzerHandler(BaseHandler):
     """Handler for analyzing multiple browser tab screenshots."""
     
@@ -84,6 +89,7 @@ POST /analyze_tabs
                                 'tab_index': i + 1,
                                 'url': url,
                                 'transcript': transcript_result['transcript'],
+                                'result': transcript_result,
                                 'video_id': transcript_result['video_id']
                             })
                             print(f"✅ Successfully extracted transcript for tab {i+1}")
@@ -96,18 +102,27 @@ Be concise and focus only on answering the user's specific question. Don't add u
 If analyzing multiple tabs, only mention relationships between them if it's relevant to the question.
 Skip meta-commentary about the analysis process itself."""
             
+            # Split the transcript budget across videos, keeping the passages most relevant to the query
+            budget = PromptBudget(TAB_ANALYSIS_PROMPT_BUDGET, query=query)
+            budget.reserve("query", query)
+            for yt in youtube_transcripts:
+                passages, scores = self.youtube_extractor.relevant_passages(yt['result'], query)
+                budget.add(f"transcript_tab_{yt['tab_index']}", passages, select="relevance",
+                           separator="\n", scores=scores)
+            fitted = budget.assemble()
+            
             # Enhanced user prompt with transcript information
             if youtube_transcripts:
                 transcript_info = "\n\nAdditional context from YouTube video transcripts:\n"
                 for yt in youtube_transcripts:
-                    transcript_preview = yt['transcript'][:1000] + "..." if len(yt['transcript']) > 1000 else yt['transcript']
-                    transcript_info += f"Tab {yt['tab_index']} Transcript: {transcript_preview}\n"
+                    transcript_preview = fitted[f"transcript_tab_{yt['tab_index']}"]
+                    transcript_info += f"Tab {yt['tab_index']} Transcript (timestamped excerpts):\n{transcript_preview}\n"
                 
                 user_prompt = f"""Looking at {'this screenshot' if len(images) == 1 else f'these {len(images)} screenshots'}, {query}
 
 {transcript_info}
 
-Provide a direct, conversational answer without sections or bullet points unless specifically helpful for the answer. If the question is about video content, prioritize information from the transcript over what's visible in the screenshot."""
+Provide a direct, conversational answer without sections or bullet points unless specifically helpful for the answer. If the question is about video content, prioritize information from the transcript over what's visible in the screenshot, and mention the timestamp of the passage you rely on."""
             else:
                 user_prompt = f"""Looking at {'this screenshot' if len(images) == 1 else f'these {len(images)} screenshots'}, {query}
 
@@ -218,6 +233,7 @@ Provide a direct, conversational answer without sections or bullet points unless
                     "query": query,
                     "tab_count": len(images),
                     "youtube_transcripts_used": len(youtube_transcripts),
+                    "prompt_budget": budget.allocation,
                     "timestamp": datetime.now().isoformat()
                 }
             )
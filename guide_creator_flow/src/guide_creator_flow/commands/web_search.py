@@ -3,9 +3,7 @@ Web search command handler using Exa AI.
 """
 import time
 from typing import Optional
-import weave
 from .base import BaseHandler, CommandResult
-from guide_creator_flow.crews.poem_crew.poem_crew import SearchCrew
 
 
 class WebSearchHandler(BaseHandler):
@@ -51,6 +49,8 @@ Search the web using Exa AI's powerful semantic search engine.
         start_time = time.time()
         
         try:
+            from guide_creator_flow.crews.poem_crew.poem_crew import SearchCrew
+            
             # Initialize and run the search crew
             search_crew = SearchCrew()
             result = search_crew.execute_search(args)
@@ -0,0 +1,408 @@
+"""
+JSON file storage for the memory knowledge base.
+
+Memories live in a single JSON array (``data/memories.json``). Besides the
+whole-file load/save used by the command handlers, the store can stream
+records one at a time and append batches in place, so bulk export/import
+never has to hold the whole corpus in memory.
+"""
+import asyncio
+import codecs
+import json
+import os
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows: fall back to an in-process lock (single worker only)
+    fcntl = None
+
+
+DEFAULT_MEMORY_FILE = Path("data") / "memories.json"
+
+# Conflict policies for imported records whose id already exists
+CONFLICT_POLICIES = ("skip", "overwrite", "new_id", "fail")
+
+_READ_CHUNK_SIZE = 64 * 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+_fallback_lock = threading.Lock()
+
+
+class MemoryConflictError(Exception):
+    """Raised by an import using the ``fail`` policy when an id already exists."""
+
+    def __init__(self, memory_id: str, stats: Dict[str, int]):
+        self.memory_id = memory_id
+        self.stats = stats
+        super().__init__(f"Memory with ID {memory_id} already exists")
+
+
+def generate_memory_id() -> str:
+    """Generate an id in the same ``mem_<timestamp>`` format the handlers use, plus a random suffix."""
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"mem_{timestamp}_{uuid.uuid4().hex[:6]}"
+
+
+class MemoryStore:
+    """Reads and writes the memories JSON array.
+
+    Safe to share between worker processes on one host: every write holds an
+    exclusive ``flock`` on a sidecar lock file, whole-file saves go through an
+    atomic rename, and appends only ever rewrite the closing bracket, so readers
+    holding a shared lock (or an already-open file) see a consistent array.
+    """
+
+    def __init__(self, memory_file: Path = DEFAULT_MEMORY_FILE):
+        self.memory_file = Path(memory_file)
+        self.lock_file = self.memory_file.with_suffix(self.memory_file.suffix + ".lock")
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Hold the store lock. Not reentrant: never nest calls on the same store."""
+        self.memory_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                _fallback_lock.acquire()
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:
+                    _fallback_lock.release()
+
+    def ensure(self):
+        """Ensure the data directory and memory file exist."""
+        if self.memory_file.exists():
+            return
+        with self._locked():
+            if not self.memory_file.exists():
+                self._write_atomic([])
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load all memories from the JSON file."""
+        try:
+            with self._locked(exclusive=False):
+                with open(self.memory_file, 'r') as f:
+                    return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return []
+
+    def save(self, memories: List[Dict[str, Any]]):
+        """Save all memories to the JSON file."""
+        with self._locked():
+            self._write_atomic(memories)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield memories one at a time without loading the whole file.
+
+        The lock is only held while the file is opened; records are read from
+        that snapshot, so a long export does not block writers.
+        """
+        if not self.memory_file.exists():
+            return
+
+        with self._locked(exclusive=False):
+            f = open(self.memory_file, 'rb')
+            try:
+                end, _ = self._find_array_end(f)
+            except ValueError:
+                f.close()
+                raise
+        with f:
+            yield from self._read_records(f, end)
+
+    def ids(self) -> Set[str]:
+        """Return the set of stored memory ids."""
+        return {record.get('id') for record in self.iter_records()}
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Append records to the end of the JSON array without rewriting the file."""
+        if not records:
+            return
+        self.ensure()
+
+        payload = ",\n".join(json.dumps(record, default=str) for record in records)
+        with self._locked():
+            with open(self.memory_file, 'r+b') as f:
+                close_pos, is_empty = self._find_array_end(f)
+                f.seek(close_pos)
+                f.truncate()
+                f.write(("\n" if is_empty else ",\n").encode('utf-8'))
+                f.write(payload.encode('utf-8'))
+                f.write(b"\n]")
+
+    def delete(self, memory_id: str) -> bool:
+        """Delete every memory with the given id. Returns whether anything was removed."""
+        if not self.memory_file.exists():
+            return False
+        return self._rewrite(lambda record: record.get('id') != memory_id) > 0
+
+    def drop_superseded(self, superseded: Dict[str, int]):
+        """Remove the oldest ``n`` copies of each id in ``superseded``.
+
+        Used after an ``overwrite`` import, which appends replacements rather
+        than editing records in place.
+        """
+        if not superseded:
+            return
+
+        remaining = dict(superseded)
+
+        def keep(record: Dict[str, Any]) -> bool:
+            memory_id = record.get('id')
+            if remaining.get(memory_id, 0) > 0:
+                remaining[memory_id] -= 1
+                return False
+            return True
+
+        self._rewrite(keep)
+
+    def _rewrite(self, keep: Callable[[Dict[str, Any]], bool]) -> int:
+        """Stream the records matching ``keep`` into a new file and swap it in.
+
+        Returns the number of records dropped.
+        """
+        dropped = 0
+        tmp_file = self.memory_file.with_suffix(self.memory_file.suffix + ".tmp")
+        with self._locked():
+            with open(self.memory_file, 'rb') as src, open(tmp_file, 'w', encoding='utf-8') as out:
+                end, _ = self._find_array_end(src)
+                out.write("[")
+                first = True
+                for record in self._read_records(src, end):
+                    if not keep(record):
+                        dropped += 1
+                        continue
+                    out.write("\n" if first else ",\n")
+                    out.write(json.dumps(record, default=str))
+                    first = False
+                out.write("\n]")
+            if dropped:
+                os.replace(tmp_file, self.memory_file)
+            else:
+                tmp_file.unlink()
+        return dropped
+
+    def _write_atomic(self, memories: List[Dict[str, Any]]):
+        tmp_file = self.memory_file.with_suffix(self.memory_file.suffix + ".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(memories, f, indent=2, default=str)
+        os.replace(tmp_file, self.memory_file)
+
+    def _read_records(self, f, end: int) -> Iterator[Dict[str, Any]]:
+        """Incrementally decode array elements from the first ``end`` bytes of ``f``."""
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+        f.seek(0)
+        remaining = end
+        buffer = ""
+        pos = 0
+        opened = False
+        eof = False
+        while True:
+            # Skip whitespace, the opening bracket and separators
+            while pos < len(buffer):
+                ch = buffer[pos]
+                if ch.isspace() or ch == ',' or (ch == '[' and not opened):
+                    opened = opened or ch == '['
+                    pos += 1
+                else:
+                    break
+
+            record = None
+            if pos < len(buffer):
+                try:
+                    record, next_pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"Corrupt memory file: {self.memory_file}")
+
+            if record is not None:
+                pos = next_pos
+                yield record
+                continue
+
+            if eof:
+                return
+
+            chunk = f.read(min(_READ_CHUNK_SIZE, remaining))
+            remaining -= len(chunk)
+            eof = not chunk or remaining <= 0
+            buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+    @staticmethod
+    def _find_array_end(f) -> tuple:
+        """Locate the closing bracket of the array, scanning backwards from EOF.
+
+        Returns the byte offset of ``]`` and whether the array is empty.
+        """
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        close_pos = None
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            for i in range(len(block) - 1, -1, -1):
+                ch = block[i:i + 1]
+                if ch.isspace():
+                    continue
+                if close_pos is None:
+                    if ch != b']':
+                        raise ValueError("Memory file is not a JSON array")
+                    close_pos = pos + i
+                    continue
+                return close_pos, ch == b'['
+        raise ValueError("Memory file is not a JSON array")
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], compress: bool = False,
+                flush_size: int = _READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode records as NDJSON byte chunks, optionally gzip-compressed."""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    pending_size = 0
+    for record in records:
+        line = (json.dumps(record, default=str, ensure_ascii=False) + "\n").encode('utf-8')
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size >= flush_size:
+            data = b"".join(pending)
+            pending, pending_size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+
+    data = b"".join(pending)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterable[Any]:
+    """Decode an NDJSON byte stream, transparently handling gzip input.
+
+    Lines that are not valid JSON are yielded as ``None`` so callers can count them.
+    """
+    decompressor = None
+    sniffed = False
+    buffer = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if not sniffed:
+            sniffed = True
+            if chunk.startswith(_GZIP_MAGIC):
+                decompressor = zlib.decompressobj(wbits=47)
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+
+    if decompressor:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        if line.strip():
+            yield _decode_line(line)
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+class MemoryImporter:
+    """Writes imported records into a MemoryStore in batches.
+
+    Only the set of existing ids is kept in memory; records are appended to the
+    store as each batch fills up. Store calls do blocking file I/O under the
+    store lock, so they run in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, store: MemoryStore, on_conflict: str = "skip", batch_size: int = 500,
+                 progress: Optional[Callable[[Dict[str, int]], None]] = None):
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict}. Use one of {', '.join(CONFLICT_POLICIES)}")
+        self.store = store
+        self.on_conflict = on_conflict
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.stats = {"received": 0, "imported": 0, "overwritten": 0, "renamed": 0,
+                      "skipped": 0, "invalid": 0, "batches": 0}
+        self._known_ids: Set[str] = set()
+        self._superseded: Dict[str, int] = {}
+        self._batch: List[Dict[str, Any]] = []
+
+    async def run(self, records: AsyncIterable[Any]) -> Dict[str, int]:
+        """Import every record from the stream and return the final counts."""
+        await asyncio.to_thread(self.store.ensure)
+        self._known_ids = await asyncio.to_thread(self.store.ids)
+        try:
+            async for record in records:
+                await self.add(record)
+            await self._flush()
+        finally:
+            await asyncio.to_thread(self.store.drop_superseded, self._superseded)
+        return self.stats
+
+    async def add(self, record: Any):
+        """Queue a single record, flushing when the batch is full."""
+        self.stats["received"] += 1
+        if not isinstance(record, dict) or not isinstance(record.get("content"), str):
+            self.stats["invalid"] += 1
+            return
+
+        record = dict(record)
+        now = datetime.now()
+        record.setdefault("timestamp", now.isoformat())
+        record.setdefault("created_at", now.strftime("%Y-%m-%d %H:%M:%S"))
+
+        memory_id = record.get("id")
+        if not memory_id:
+            memory_id = record["id"] = generate_memory_id()
+        elif memory_id in self._known_ids:
+            if self.on_conflict == "skip":
+                self.stats["skipped"] += 1
+                return
+            if self.on_conflict == "fail":
+                await self._flush()
+                raise MemoryConflictError(memory_id, self.stats)
+            if self.on_conflict == "overwrite":
+                self._superseded[memory_id] = self._superseded.get(memory_id, 0) + 1
+                self.stats["overwritten"] += 1
+            else:
+                memory_id = record["id"] = generate_memory_id()
+                self.stats["renamed"] += 1
+
+        self._known_ids.add(memory_id)
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._batch:
+            return
+        await asyncio.to_thread(self.store.append, self._batch)
+        self.stats["imported"] += len(self._batch)
+        self.stats["batches"] += 1
+        self._batch = []
+        if self.progress:
+            self.progress(dict(self.stats))
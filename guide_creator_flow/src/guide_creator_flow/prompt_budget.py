@@ -0,0 +1,295 @@
+"""
+Token-budgeted prompt assembly.
+
+Handlers describe the pieces of context they would like to send to the LLM
+(memories, transcripts, DOM context, history...) as named sources with a
+priority. ``PromptBudget`` counts tokens, splits a fixed budget across the
+sources and fits each one into its share, either by keeping whole chunks
+(most relevant to the query first, or in order) or by truncating. The chosen
+allocation is exposed so handlers can record it in ``CommandResult.metadata``.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Rough characters-per-token ratio used when tiktoken is not installed
+_CHARS_PER_TOKEN = 4
+# Don't bother appending a truncated chunk smaller than this
+_MIN_PARTIAL_TOKENS = 32
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens the way the OpenAI models do (approximated without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = "...") -> str:
+    """Cut text down to at most ``max_tokens`` tokens, marking the cut with ``suffix``."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Leave room for the suffix so the result stays within max_tokens
+    keep = max(0, max_tokens - count_tokens(suffix))
+    encoding = _encoding()
+    if encoding is None:
+        return text[:keep * _CHARS_PER_TOKEN].rstrip() + suffix
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[:keep]).rstrip() + suffix
+
+
+def split_into_chunks(text: str, chunk_tokens: int = 200) -> List[str]:
+    """Split text into chunks of roughly ``chunk_tokens`` on paragraph and sentence boundaries."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        for sentence in _SENTENCE_RE.split(paragraph.strip()):
+            if not sentence:
+                continue
+            tokens = count_tokens(sentence)
+            if current and current_tokens + tokens > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def relevance_score(text: str, query_terms: set) -> float:
+    """Score a chunk by how often it mentions the query terms, normalized by length."""
+    if not query_terms:
+        return 0.0
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 0.0
+    hits = sum(1 for word in words if word in query_terms)
+    return hits / (1 + math.log(len(words)))
+
+
+def _query_terms(query: Optional[str]) -> set:
+    if not query:
+        return set()
+    return {word for word in _WORD_RE.findall(query.lower()) if len(word) > 2}
+
+
+@dataclass
+class PromptSource:
+    """One named piece of prompt context competing for the budget."""
+    name: str
+    chunks: List[str]
+    priority: int = 0
+    min_tokens: int = 0
+    max_tokens: Optional[int] = None
+    select: str = "head"
+    separator: str = "\n\n"
+    required: bool = False
+    chunk_tokens: List[int] = field(default_factory=list)
+    scores: Optional[List[float]] = None
+
+    @property
+    def requested(self) -> int:
+        total = sum(self.chunk_tokens) + count_tokens(self.separator) * max(0, len(self.chunks) - 1)
+        return min(total, self.max_tokens) if self.max_tokens is not None else total
+
+
+class PromptBudget:
+    """Split a token budget across prompt sources by priority.
+
+    Sources with a higher ``priority`` are served first; sources sharing a
+    priority split what is left evenly. ``required`` sources (the user's
+    question, fixed instructions) are always kept in full and counted first.
+    """
+
+    def __init__(self, total_tokens: int, query: Optional[str] = None):
+        self.total_tokens = total_tokens
+        self.query = query
+        self.sources: Dict[str, PromptSource] = {}
+        self.allocation: Dict[str, Any] = {}
+
+    def reserve(self, name: str, text: str) -> "PromptBudget":
+        """Count fixed text against the budget; it is never cut."""
+        return self.add(name, text, required=True)
+
+    def add(self, name: str, content: Union[str, List[str]], priority: int = 0, min_tokens: int = 0,
+            max_tokens: Optional[int] = None, select: str = "head", separator: str = "\n\n",
+            required: bool = False, chunk_tokens: int = 200,
+            scores: Optional[List[float]] = None) -> "PromptBudget":
+        """Register a source.
+
+        Args:
+            name: Key used in the assembled output and the allocation metadata
+            content: A string, or a list of pre-split chunks (e.g. one per memory)
+            priority: Higher priorities are filled first
+            min_tokens: Share guaranteed before lower priorities are served
+            max_tokens: Never give this source more than this many tokens
+            select: ``head`` keeps chunks in order; ``relevance`` keeps the chunks
+                that best match the query, then restores their original order
+            separator: Joins the kept chunks
+            required: Always keep in full (see ``reserve``)
+            chunk_tokens: Chunk size used when ``content`` is a string and
+                ``select`` is ``relevance``
+            scores: Precomputed relevance per chunk of a list ``content``
+                (e.g. from a search index); replaces the built-in term matching
+        """
+        if select not in ("head", "relevance"):
+            raise ValueError(f"Unknown select strategy: {select}")
+        if isinstance(content, str):
+            chunks = split_into_chunks(content, chunk_tokens) if select == "relevance" and not required else [content]
+        else:
+            chunks = list(content)
+        if scores is not None:
+            if isinstance(content, str) or len(scores) != len(chunks):
+                raise ValueError("scores must give one value per chunk of a list content")
+            scores = [score for chunk, score in zip(chunks, scores) if chunk]
+        chunks = [chunk for chunk in chunks if chunk]
+        self.sources[name] = PromptSource(
+            name=name,
+            chunks=chunks,
+            priority=priority,
+            min_tokens=min_tokens,
+            max_tokens=max_tokens,
+            select=select,
+            separator=separator,
+            required=required,
+            chunk_tokens=[count_tokens(chunk) for chunk in chunks],
+            scores=scores,
+        )
+        return self
+
+    def _allocate(self) -> Dict[str, int]:
+        grants = {name: 0 for name in self.sources}
+        remaining = self.total_tokens
+
+        for source in self.sources.values():
+            if source.required:
+                grants[source.name] = source.requested
+                remaining -= source.requested
+        remaining = max(0, remaining)
+
+        optional = sorted(
+            (s for s in self.sources.values() if not s.required),
+            key=lambda s: s.priority,
+            reverse=True,
+        )
+
+        # Guaranteed minimums, highest priority first
+        for source in optional:
+            grant = min(source.min_tokens, source.requested, remaining)
+            grants[source.name] = grant
+            remaining -= grant
+
+        # Fill the rest priority by priority, splitting evenly within a level
+        for priority in sorted({s.priority for s in optional}, reverse=True):
+            level = [s for s in optional if s.priority == priority]
+            while remaining > 0:
+                hungry = [s for s in level if grants[s.name] < s.requested]
+                if not hungry:
+                    break
+                share = max(1, remaining // len(hungry))
+                for source in hungry:
+                    extra = min(share, source.requested - grants[source.name], remaining)
+                    grants[source.name] += extra
+                    remaining -= extra
+        return grants
+
+    def _fit(self, source: PromptSource, grant: int) -> Dict[str, Any]:
+        total_requested = sum(source.chunk_tokens) + count_tokens(source.separator) * max(0, len(source.chunks) - 1)
+        if source.required or total_requested <= grant:
+            return {"text": source.separator.join(source.chunks), "kept": len(source.chunks), "strategy": "full"}
+
+        separator_tokens = count_tokens(source.separator)
+        order = list(range(len(source.chunks)))
+        if source.select == "relevance":
+            scores = source.scores
+            if scores is None:
+                terms = _query_terms(self.query)
+                scores = [relevance_score(chunk, terms) for chunk in source.chunks]
+            order.sort(key=lambda i: scores[i], reverse=True)
+            # Once something matches the query, unrelated chunks aren't worth their tokens
+            if any(score > 0 for score in scores):
+                order = [i for i in order if scores[i] > 0]
+
+        kept: List[int] = []
+        used = 0
+        partial = None
+        for i in order:
+            cost = source.chunk_tokens[i] + (separator_tokens if kept else 0)
+            if used + cost <= grant:
+                kept.append(i)
+                used += cost
+            elif source.select == "head":
+                # Fill the remainder with the start of the next chunk, then stop
+                room = grant - used - (separator_tokens if kept else 0)
+                if room >= _MIN_PARTIAL_TOKENS or not kept:
+                    partial = truncate_to_tokens(source.chunks[i], room)
+                break
+
+        if not kept and partial is None and order and grant > 0:
+            partial = truncate_to_tokens(source.chunks[order[0]], grant)
+
+        pieces = [source.chunks[i] for i in sorted(kept)]
+        if partial:
+            pieces.append(partial)
+        strategy = "relevance" if source.select == "relevance" else "head"
+        if partial and not kept:
+            strategy = "truncated"
+        return {"text": source.separator.join(pieces), "kept": len(kept), "strategy": strategy}
+
+    def assemble(self) -> Dict[str, str]:
+        """Fit every source into its share; returns text per source name.
+
+        Also fills ``self.allocation`` with what each source asked for and got.
+        """
+        grants = self._allocate()
+        texts: Dict[str, str] = {}
+        sources_info: Dict[str, Any] = {}
+        used_total = 0
+        for name, source in self.sources.items():
+            fitted = self._fit(source, grants[name])
+            texts[name] = fitted["text"]
+            used = count_tokens(fitted["text"])
+            used_total += used
+            sources_info[name] = {
+                "priority": "required" if source.required else source.priority,
+                "requested": source.requested,
+                "allocated": grants[name],
+                "used": used,
+                "chunks_total": len(source.chunks),
+                "chunks_kept": fitted["kept"],
+                "strategy": fitted["strategy"],
+            }
+        self.allocation = {
+            "total_budget": self.total_tokens,
+            "used": used_total,
+            "tokenizer": "tiktoken" if _encoding() is not None else "approximate",
+            "sources": sources_info,
+        }
+        return texts
@@ -4,20 +4,51 @@ FastAPI server for the Universal Command Center
 Provides REST API endpoints for chat, web search, memory, and more
 """
 
+import argparse
+import itertools
 import os
+import threading
 import time
+from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
-import weave
 
+from guide_creator_flow.cache import CACHE_BACKEND_ENV
 from guide_creator_flow.commands.router import CommandRouter
+from guide_creator_flow.memory_store import (
+    CONFLICT_POLICIES,
+    MemoryConflictError,
+    MemoryImporter,
+    MemoryStore,
+    iter_ndjson,
+    parse_ndjson,
+)
+
+def _init_weave():
+    """Initialize Weave for tracing LLM calls"""
+    try:
+        import weave
+        weave.init("guide-creator-flow")
+        print("✅ Weave tracing initialized")
+    except Exception as e:
+        print(f"⚠️  Weave initialization failed: {e}")
+        print("   Continuing without tracing...")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services; Weave is initialized off the startup critical path"""
+    if os.getenv("WEAVE_DISABLED", "").lower() in ("1", "true"):
+        print("ℹ️  Weave tracing disabled via WEAVE_DISABLED")
+    else:
+        threading.Thread(target=_init_weave, name="weave-init", daemon=True).start()
+    yield
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,7 +56,8 @@ app = FastAPI(
     description="AI-powered command center with chat, web search, memory, and more using CrewAI",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add exception handler for validation errors
@@ -411,6 +443,8 @@ async def get_api_info():
             "GET /search/{query}": "Simple endpoint with query as URL parameter", 
             "GET /memories": "Get all memories in structured JSON format",
             "DELETE /memories/{id}": "Delete a specific memory by ID",
+            "GET /memories/export": "Stream all memories as NDJSON (add ?gzip=true to compress)",
+            "POST /memories/import": "Bulk-load memories from an NDJSON (optionally gzip) body",
             "POST /save_page": "Save web page with AI summary (for browser extensions)",
             "POST /analyze_tabs": "Analyze multiple tab screenshots with AI vision (includes YouTube transcript extraction)",
             "GET /health": "Health check endpoint",
@@ -427,6 +461,8 @@ async def get_api_info():
             "web_search": "curl -X POST 'http://localhost:8000/search' -H 'Content-Type: application/json' -d '{\"query\": \"/web latest AI developments\"}'", 
             "memory": "curl -X POST 'http://localhost:8000/search' -H 'Content-Type: application/json' -d '{\"query\": \"/memory save Important note\"}'",
             "memories_api": "curl 'http://localhost:8000/memories?limit=10&offset=0'",
+            "memories_export": "curl 'http://localhost:8000/memories/export?gzip=true' -o memories.ndjson.gz",
+            "memories_import": "curl -X POST 'http://localhost:8000/memories/import?on_conflict=skip' --data-binary @memories.ndjson.gz",
             "simple_get": "curl 'http://localhost:8000/search/Hello%20AI'"
         }
     }
@@ -492,6 +528,116 @@ async def get_memories(
              detail=f"Failed to retrieve memories: {str(e)}"
          )
 
+# Memories export endpoint
+@app.get("/memories/export")
+async def export_memories(type: Optional[str] = None, gzip: bool = False):
+    """
+    Stream every memory as newline-delimited JSON, one record per line
+    
+    Records are read from the store one at a time, so the export never holds
+    the whole knowledge base in memory.
+    
+    - **type**: Only export memories of this type (optional)
+    - **gzip**: Gzip-compress the stream (default: false)
+    """
+    store = MemoryStore()
+    if not store.memory_file.exists() or store.memory_file.stat().st_size == 0:
+        raise HTTPException(status_code=404, detail="No memories stored yet")
+    
+    # Read the first record before the response starts, so a file that is not
+    # a readable JSON array fails with a 500 rather than an empty 200
+    source = store.iter_records()
+    try:
+        first = next(source, None)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to export memories: {str(e)}"
+        )
+    
+    def records():
+        count = 0
+        try:
+            for record in itertools.chain(
+                [] if first is None else [first], source
+            ):
+                if type and record.get('type') != type:
+                    continue
+                count += 1
+                if count % 1000 == 0:
+                    print(f"📤 Exported {count} memories...")
+                yield record
+        except ValueError as e:
+            # Too late for an error status; aborting the response keeps the
+            # client from taking a truncated export for a complete one
+            print(f"❌ Memory export failed after {count} memories: {e}")
+            raise
+        print(f"✅ Memory export finished: {count} memories")
+    
+    filename = "memories.ndjson.gz" if gzip else "memories.ndjson"
+    return StreamingResponse(
+        iter_ndjson(records(), compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Memories import endpoint
+@app.post("/memories/import")
+async def import_memories(request: Request, on_conflict: str = "skip", batch_size: int = 500):
+    """
+    Bulk-load memories from a newline-delimited JSON body (plain or gzip)
+    
+    The body is consumed as a stream and written to the store in batches.
+    
+    - **on_conflict**: What to do when a memory id already exists: `skip` (default),
+      `overwrite`, `new_id` (import under a fresh id) or `fail` (stop with 409;
+      batches written before the conflict are kept)
+    - **batch_size**: Number of records appended per write (default: 500)
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid on_conflict '{on_conflict}'. Use one of: {', '.join(CONFLICT_POLICIES)}"
+        )
+    
+    start_time = time.time()
+    
+    def report_progress(stats: Dict[str, int]):
+        print(f"📥 Memory import batch {stats['batches']}: "
+              f"{stats['imported']} imported, {stats['skipped']} skipped, {stats['invalid']} invalid")
+    
+    importer = MemoryImporter(
+        MemoryStore(),
+        on_conflict=on_conflict,
+        batch_size=batch_size,
+        progress=report_progress
+    )
+    
+    try:
+        stats = await importer.run(parse_ndjson(request.stream()))
+    except MemoryConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": str(e),
+                "memory_id": e.memory_id,
+                "stats": e.stats
+            }
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to import memories: {str(e)}"
+        )
+    
+    return {
+        "success": True,
+        "on_conflict": on_conflict,
+        "stats": stats,
+        "processing_time": round(time.time() - start_time, 2),
+        "timestamp": datetime.now().isoformat()
+    }
+
 # Delete memory endpoint
 @app.delete("/memories/{memory_id}")
 async def delete_memory(memory_id: str):
@@ -528,29 +674,62 @@ async def delete_memory(memory_id: str):
             detail=f"Failed to delete memory: {str(e)}"
         )
 
-def start_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
-    """Start the FastAPI server"""
+def start_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False, workers: int = 1):
+    """
+    Start the FastAPI server
+    
+    - **reload**: Development mode, restarts on code changes (single worker)
+    - **workers**: Number of uvicorn worker processes. With more than one worker,
+      each process has its own router and handlers; shared state lives on disk:
+      the memory store uses file locking, and caches default to the SQLite
+      backend (``COMMAND_CENTER_CACHE=sqlite``) unless configured otherwise.
+    """
     print(f"🚀 Starting Universal Command Center API server...")
     print(f"📡 Server will be available at: http://{host}:{port}")
     print(f"📚 API Documentation: http://{host}:{port}/docs")
     print(f"💬 Example chat: http://{host}:{port}/search/Hello%20AI")
     print(f"🔍 Example web search: http://{host}:{port}/search/%2Fweb%20latest%20AI%20news")
     
-    # Initialize Weave for tracing LLM calls
-    try:
-        weave.init("guide-creator-flow")
-        print("✅ Weave tracing initialized")
-    except Exception as e:
-        print(f"⚠️  Weave initialization failed: {e}")
-        print("   Continuing without tracing...")
+    if reload and workers > 1:
+        print("⚠️  Auto-reload runs a single worker; ignoring --workers")
+        workers = 1
+    print(f"⚙️  Mode: {'development (auto-reload)' if reload else f'production ({workers} worker(s))'}")
+    
+    if workers > 1:
+        # Worker processes inherit the environment, so they all pick the shared tier
+        os.environ.setdefault(CACHE_BACKEND_ENV, "sqlite")
+        if os.environ[CACHE_BACKEND_ENV] == "local":
+            print("⚠️  COMMAND_CENTER_CACHE=local: each worker keeps its own cache")
+        else:
+            print(f"🗄️  Shared cache backend: {os.environ[CACHE_BACKEND_ENV]}")
     
     uvicorn.run(
         "guide_creator_flow.server:app", 
         host=host, 
         port=port, 
         reload=reload,
+        workers=workers,
         log_level="info"
     )
 
+def main():
+    """Command line entry point for the server"""
+    parser = argparse.ArgumentParser(description="Universal Command Center API server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"), help="Interface to bind (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")), help="Port to listen on (default: 8000)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Number of worker processes (default: $WEB_CONCURRENCY or 1)")
+    parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import cost and exit")
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        from guide_creator_flow.startup_profile import profile_startup
+        profile_startup()
+        return
+    
+    start_server(host=args.host, port=args.port, reload=args.reload, workers=args.workers)
+
 if __name__ == "__main__":
-    start_server(reload=True) 
\ No newline at end of file
+    main()
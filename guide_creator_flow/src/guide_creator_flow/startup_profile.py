@@ -0,0 +1,98 @@
+"""
+Startup profiling for the Universal Command Center server.
+
+Runs a fresh interpreter with ``python -X importtime`` and reports how much
+each package costs to import, split into the server's critical path and the
+heavyweight handler dependencies that are only loaded on first use.
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+SERVER_MODULE = "guide_creator_flow.server"
+
+# Dependencies the command handlers import lazily, on first request
+DEFERRED_MODULES = [
+    "weave",
+    "crewai",
+    "openai",
+    "exa_py",
+    "youtube_transcript_api",
+]
+
+
+def _run_importtime(modules: List[str]) -> str:
+    """Import modules in a clean interpreter and return the raw importtime log."""
+    script = (
+        "import importlib\n"
+        f"for name in {modules!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception as e:\n"
+        "        print(f'skipped {name}: {e}')\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+    )
+    if result.stdout.strip():
+        print(result.stdout.strip())
+    return result.stderr
+
+
+def parse_importtime(log: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Parse an importtime log.
+
+    Returns ``(top_level, by_package)``: cumulative microseconds for every
+    module imported directly by the profiling script, and self microseconds
+    summed per root package.
+    """
+    top_level: Dict[str, int] = {}
+    by_package: Dict[str, int] = {}
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            # Header line
+            continue
+
+        depth = len(name) - len(name.lstrip(" "))
+        module = name.strip()
+        root = module.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+        if depth <= 1:
+            top_level[module] = top_level.get(module, 0) + cumulative_us
+    return top_level, by_package
+
+
+def profile_startup(limit: int = 20) -> Dict[str, int]:
+    """Print a per-module import cost report and return the top-level timings."""
+    print(f"⏱️  Profiling import cost of {SERVER_MODULE}...")
+    top_level, by_package = parse_importtime(_run_importtime([SERVER_MODULE] + DEFERRED_MODULES))
+
+    # Drop what the interpreter imports on its own before our code runs
+    baseline, _ = parse_importtime(_run_importtime([]))
+    for module in baseline:
+        top_level.pop(module, None)
+
+    critical = {m: us for m, us in top_level.items() if m.split(".")[0] not in DEFERRED_MODULES}
+    deferred = {m: us for m, us in top_level.items() if m.split(".")[0] in DEFERRED_MODULES}
+
+    print(f"\n🚀 Critical path (server import): {sum(critical.values()) / 1000:.1f} ms")
+    for module, us in sorted(critical.items(), key=lambda x: x[1], reverse=True)[:limit]:
+        print(f"   {us / 1000:9.1f} ms  {module}")
+
+    print(f"\n💤 Deferred until first use: {sum(deferred.values()) / 1000:.1f} ms")
+    for module, us in sorted(deferred.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {us / 1000:9.1f} ms  {module}")
+
+    print(f"\n📦 Heaviest packages (self time, both phases):")
+    for package, us in sorted(by_package.items(), key=lambda x: x[1], reverse=True)[:limit]:
+        print(f"   {us / 1000:9.1f} ms  {package}")
+
+    return top_level
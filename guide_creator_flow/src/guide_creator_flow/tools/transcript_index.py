@@ -0,0 +1,133 @@
+"""
+Timestamped chunking and BM25 retrieval for video transcripts.
+
+``YouTubeTranscriptApi.get_transcript`` returns short caption segments with
+start times. We group them into windows of a few sentences, keep the time
+range of each window, and rank the windows against the user's question so
+the relevant passages can be pulled from anywhere in a long video.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+# Target length of one chunk; long enough to carry a thought, short enough to rank well
+CHUNK_SECONDS = 45.0
+CHUNK_MAX_CHARS = 800
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Common words that would otherwise dominate the scores of short queries
+_STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from has have how i in is it its "
+    "me my of on or so that the their them there they this to was we what when "
+    "where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as ``m:ss`` or ``h:mm:ss``."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def chunk_segments(segments: Sequence[Dict[str, Any]], chunk_seconds: float = CHUNK_SECONDS,
+                   max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, Any]]:
+    """Group caption segments into chunks of roughly ``chunk_seconds``.
+
+    Args:
+        segments: Items with ``text``, ``start`` and ``duration`` as returned
+            by ``YouTubeTranscriptApi.get_transcript``
+        chunk_seconds: Start a new chunk once the current one spans this long
+        max_chars: Start a new chunk once the current one gets this long
+
+    Returns:
+        List of ``{"start": float, "end": float, "text": str}``
+    """
+    chunks: List[Dict[str, Any]] = []
+    texts: List[str] = []
+    start = end = 0.0
+    length = 0
+    for segment in segments:
+        text = " ".join(str(segment.get("text", "")).split())
+        if not text:
+            continue
+        seg_start = float(segment.get("start", end))
+        seg_end = seg_start + float(segment.get("duration", 0.0))
+        if texts and (seg_start - start >= chunk_seconds or length + len(text) > max_chars):
+            chunks.append({"start": start, "end": end, "text": " ".join(texts)})
+            texts, length = [], 0
+        if not texts:
+            start = seg_start
+        texts.append(text)
+        length += len(text) + 1
+        end = max(end, seg_end)
+    if texts:
+        chunks.append({"start": start, "end": end, "text": " ".join(texts)})
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(doc)) for doc in documents]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(self.term_freqs)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """Score every document against the query, in document order."""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        results = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+
+class TranscriptIndex:
+    """Searchable timestamped chunks of one transcript."""
+
+    def __init__(self, chunks: List[Dict[str, Any]]):
+        self.chunks = chunks
+        self._bm25 = BM25Index([chunk["text"] for chunk in chunks])
+
+    def passages(self) -> List[str]:
+        """Chunk texts prefixed with their start timestamp, in video order."""
+        return [f"[{format_timestamp(chunk['start'])}] {chunk['text']}" for chunk in self.chunks]
+
+    def scores(self, query: str) -> List[float]:
+        """BM25 score of each chunk, in video order."""
+        return self._bm25.scores(query)
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the ``k`` best matching chunks with their scores, best first."""
+        scored = sorted(zip(self.scores(query), range(len(self.chunks))), reverse=True)
+        return [
+            {**self.chunks[i], "score": score}
+            for score, i in scored[:k]
+            if score > 0
+        ]
@@ -2,14 +2,33 @@
 YouTube transcript extraction tool
 """
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urlparse, parse_qs
 
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi
-    YOUTUBE_API_AVAILABLE = True
-except ImportError:
-    YOUTUBE_API_AVAILABLE = False
+from ..cache import get_cache
+from ..prompt_budget import truncate_to_tokens
+from .transcript_index import TranscriptIndex, chunk_segments
+
+# Transcripts don't change, so successful fetches can be reused for a day
+TRANSCRIPT_CACHE_TTL = 24 * 60 * 60
+# Transcript size when the caller doesn't fit it into its own prompt budget
+DEFAULT_TRANSCRIPT_TOKENS = 500
+# Bump when the cached result format changes so stale entries are refetched
+TRANSCRIPT_CACHE_VERSION = 2
+
+_youtube_transcript_api = None
+
+
+def _load_transcript_api():
+    """Import youtube-transcript-api on first use; returns None if it is not installed."""
+    global _youtube_transcript_api
+    if _youtube_transcript_api is None:
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            _youtube_transcript_api = YouTubeTranscriptApi
+        except ImportError:
+            _youtube_transcript_api = False
+    return _youtube_transcript_api or None
 
 
 class YouTubeTranscriptExtractor:
@@ -29,7 +48,8 @@ class YouTubeTranscriptExtractor:
     
     def get_transcript(self, url: str) -> Dict[str, Any]:
         """Get transcript from YouTube video"""
-        if not YOUTUBE_API_AVAILABLE:
+        YouTubeTranscriptApi = _load_transcript_api()
+        if YouTubeTranscriptApi is None:
             return {
                 "success": False,
                 "error": "youtube-transcript-api not installed. Run: pip install youtube-transcript-api"
@@ -49,6 +69,12 @@ class YouTubeTranscriptExtractor:
                     "error": "Could not extract video ID from URL"
                 }
             
+            cache = get_cache("youtube_transcripts")
+            cache_key = f"v{TRANSCRIPT_CACHE_VERSION}:{video_id}"
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Get transcript
             transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
             
@@ -58,15 +84,19 @@ class YouTubeTranscriptExtractor:
             # Get video info from URL
             video_info = self._get_video_info(url)
             
-            return {
+            result = {
                 "success": True,
                 "transcript": full_text,
                 "video_id": video_id,
                 "url": url,
                 "video_info": video_info,
                 "transcript_length": len(full_text),
-                "segments": len(transcript_list)
+                "segments": len(transcript_list),
+                # Timestamped windows of segments used for retrieval
+                "chunks": chunk_segments(transcript_list)
             }
+            cache.set(cache_key, result, ttl=TRANSCRIPT_CACHE_TTL)
+            return result
             
         except Exception as e:
             return {
@@ -88,17 +118,34 @@ class YouTubeTranscriptExtractor:
         except:
             return {}
     
-    def format_transcript_for_chat(self, transcript_result: Dict[str, Any]) -> str:
-        """Format transcript result for chat context"""
+    def relevant_passages(self, transcript_result: Dict[str, Any], query: str) -> Tuple[List[str], List[float]]:
+        """
+        Rank the transcript's timestamped chunks against a query
+        
+        Returns the passages in video order, each prefixed with its start
+        time, and their BM25 scores; pass both to ``PromptBudget.add`` with
+        ``select="relevance"`` to keep the best ones that fit.
+        """
+        index = TranscriptIndex(transcript_result.get("chunks") or [])
+        return index.passages(), index.scores(query)
+    
+    def format_transcript_for_chat(self, transcript_result: Dict[str, Any], excerpt: Optional[str] = None) -> str:
+        """
+        Format transcript result for chat context
+        
+        Args:
+            transcript_result: Result from get_transcript
+            excerpt: Transcript passages already fitted to the caller's prompt budget;
+                defaults to the first DEFAULT_TRANSCRIPT_TOKENS tokens
+        """
         if not transcript_result["success"]:
             return f"❌ YouTube transcript error: {transcript_result['error']}"
         
-        transcript = transcript_result["transcript"]
         video_id = transcript_result["video_id"]
-        
-        # Truncate if too long (keep first 2000 chars)
-        if len(transcript) > 2000:
-            transcript = transcript[:2000] + "..."
+        if excerpt is None:
+            passages = TranscriptIndex(transcript_result.get("chunks") or []).passages()
+            excerpt = truncate_to_tokens("\n".join(passages) or transcript_result["transcript"], DEFAULT_TRANSCRIPT_TOKENS)
+        transcript = excerpt
         
         return f"""
 🎥 YouTube Video Transcript (ID: {video_id}):
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the cache backends shared between workers
+"""
+import multiprocessing
+import sys
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from guide_creator_flow.cache import LocalCache, SQLiteCache
+
+
+def test_sqlite_cache_round_trips_json_values():
+    """Values come back as they were stored, per namespace"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cache.sqlite3"
+        cache = SQLiteCache("tabs", path)
+        other = SQLiteCache("search", path)
+
+        cache.set("k", {"title": "Tab", "ids": [1, 2]})
+        assert SQLiteCache("tabs", path).get("k") == {"title": "Tab", "ids": [1, 2]}
+        assert other.get("k", "missing") == "missing"
+
+        other.set("k", "other")
+        cache.clear()
+        assert cache.get("k") is None
+        assert other.get("k") == "other"
+        assert other.delete("k") and not other.delete("k")
+
+
+def test_caches_expire_entries():
+    """Entries past their TTL are treated as missing"""
+    with tempfile.TemporaryDirectory() as directory:
+        for cache in (LocalCache("ttl"), SQLiteCache("ttl", Path(directory) / "c.db")):
+            cache.set("short", 1, ttl=0.01)
+            cache.set("long", 2, ttl=60)
+            time.sleep(0.05)
+            assert cache.get("short") is None
+            assert cache.get("long") == 2
+
+
+def _write_entries(path, worker, count):
+    cache = SQLiteCache("shared", Path(path))
+    for i in range(count):
+        cache.set(f"w{worker}-{i}", {"worker": worker, "i": i})
+        assert cache.get(f"w{worker}-{i}") == {"worker": worker, "i": i}
+
+
+def test_concurrent_processes_share_one_sqlite_cache():
+    """Writers in separate processes each see every entry afterwards"""
+    workers, count = 4, 50
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cache.sqlite3"
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=_write_entries, args=(path, worker, count))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        cache = SQLiteCache("shared", path)
+        for worker in range(workers):
+            for i in range(count):
+                assert cache.get(f"w{worker}-{i}") == {"worker": worker, "i": i}
+
+
+def test_threads_share_one_sqlite_cache_instance():
+    """Each thread gets its own connection to the same cache"""
+    workers, count = 4, 50
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SQLiteCache("shared", Path(directory) / "cache.sqlite3")
+        errors = []
+
+        def write(worker):
+            try:
+                for i in range(count):
+                    cache.set(f"t{worker}-{i}", i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert all(
+            cache.get(f"t{w}-{i}") == i for w in range(workers) for i in range(count)
+        )
+
+
+if __name__ == "__main__":
+    test_sqlite_cache_round_trips_json_values()
+    test_caches_expire_entries()
+    test_concurrent_processes_share_one_sqlite_cache()
+    test_threads_share_one_sqlite_cache_instance()
+    print("✅ Cache tests passed")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for memory export/import and concurrent writes to the memory store
+"""
+import asyncio
+import multiprocessing
+import sys
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from guide_creator_flow.memory_store import (
+    MemoryConflictError,
+    MemoryImporter,
+    MemoryStore,
+    iter_ndjson,
+    parse_ndjson,
+)
+
+EXISTING = [
+    {"id": "a", "content": "old a"},
+    {"id": "b", "content": "old b"},
+]
+IMPORTED = [
+    {"id": "a", "content": "new a"},
+    {"id": "c", "content": "new c"},
+    {"content": "no id yet"},
+    ["not", "a", "memory"],
+]
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _import(store, records, **kwargs):
+    """Import ``records`` the way the endpoint does, via an NDJSON byte stream"""
+    chunks = iter_ndjson(records, compress=True, flush_size=16)
+    importer = MemoryImporter(store, **kwargs)
+    return asyncio.run(importer.run(parse_ndjson(_stream(chunks))))
+
+
+def _store(directory, memories=EXISTING):
+    store = MemoryStore(Path(directory) / "memories.json")
+    store.save(memories)
+    return store
+
+
+def _contents(store):
+    return sorted((m["id"], m["content"]) for m in store.load())
+
+
+def test_export_round_trips_through_gzip_ndjson():
+    """Exported records parse back unchanged"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory, EXISTING + [{"id": "é", "content": "ünïcode"}])
+        chunks = list(iter_ndjson(store.iter_records(), compress=True, flush_size=8))
+
+        async def parse():
+            return [record async for record in parse_ndjson(_stream(chunks))]
+
+        assert asyncio.run(parse()) == store.load()
+
+
+def test_import_skip_keeps_existing_records():
+    """``skip`` leaves records whose id exists untouched"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        stats = _import(store, IMPORTED, on_conflict="skip")
+
+        assert stats["skipped"] == 1
+        assert stats["imported"] == 2
+        assert stats["invalid"] == 1
+        memories = store.load()
+        assert [m["content"] for m in memories if m["id"] == "a"] == ["old a"]
+        assert len(memories) == 4
+
+
+def test_import_overwrite_replaces_existing_records():
+    """``overwrite`` keeps one copy of each id, with the imported content"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        stats = _import(store, IMPORTED, on_conflict="overwrite", batch_size=1)
+
+        assert stats["overwritten"] == 1
+        assert stats["imported"] == 3
+        memories = store.load()
+        assert [m["content"] for m in memories if m["id"] == "a"] == ["new a"]
+        assert len(memories) == 4
+
+
+def test_import_new_id_keeps_both_records():
+    """``new_id`` stores the imported record under a fresh id"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        stats = _import(store, IMPORTED, on_conflict="new_id")
+
+        assert stats["renamed"] == 1
+        memories = store.load()
+        renamed = [m for m in memories if m["content"] == "new a"]
+        assert len(renamed) == 1 and renamed[0]["id"] not in ("a", "b", "c")
+        assert len({m["id"] for m in memories}) == len(memories) == 5
+
+
+def test_import_fail_keeps_batches_written_before_the_conflict():
+    """``fail`` stops at the first existing id after flushing earlier records"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        records = [{"id": "c", "content": "new c"}, {"id": "b", "content": "new b"}]
+        try:
+            _import(store, records, on_conflict="fail", batch_size=10)
+        except MemoryConflictError as e:
+            assert e.memory_id == "b"
+            assert e.stats["imported"] == 1
+        else:
+            raise AssertionError("expected a MemoryConflictError")
+        assert _contents(store) == [("a", "old a"), ("b", "old b"), ("c", "new c")]
+
+
+def test_import_does_file_io_off_the_event_loop():
+    """Store calls run in worker threads, not on the loop's thread"""
+    threads = set()
+
+    class RecordingStore(MemoryStore):
+        def ids(self):
+            threads.add(threading.get_ident())
+            return super().ids()
+
+        def append(self, records):
+            threads.add(threading.get_ident())
+            super().append(records)
+
+        def drop_superseded(self, superseded):
+            threads.add(threading.get_ident())
+            super().drop_superseded(superseded)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = RecordingStore(Path(directory) / "memories.json")
+        _import(store, IMPORTED, on_conflict="overwrite")
+
+    assert threads and threading.get_ident() not in threads
+
+
+def _append_memories(path, worker, count):
+    store = MemoryStore(Path(path))
+    for i in range(count):
+        store.append([{"id": f"w{worker}-{i}", "content": "x" * 200}])
+
+
+def test_concurrent_writers_do_not_corrupt_the_store():
+    """Appends from several processes all land in one valid JSON array"""
+    workers, count = 4, 25
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "memories.json"
+        store = _store(directory)
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=_append_memories, args=(path, worker, count))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        # Rewrites from this process interleave with the appends
+        for _ in range(5):
+            store.delete("a")
+            store.append([{"id": "a", "content": "old a"}])
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        ids = [m["id"] for m in store.load()]
+        expected = {f"w{w}-{i}" for w in range(workers) for i in range(count)}
+        assert set(ids) == expected | {"a", "b"}
+        assert len(ids) == len(expected) + 2
+
+
+if __name__ == "__main__":
+    test_export_round_trips_through_gzip_ndjson()
+    test_import_skip_keeps_existing_records()
+    test_import_overwrite_replaces_existing_records()
+    test_import_new_id_keeps_both_records()
+    test_import_fail_keeps_batches_written_before_the_conflict()
+    test_import_does_file_io_off_the_event_loop()
+    test_concurrent_writers_do_not_corrupt_the_store()
+    print("✅ Memory store tests passed")
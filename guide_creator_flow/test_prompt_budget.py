@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for token-budgeted prompt assembly
+"""
+import sys
+import os
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from guide_creator_flow.prompt_budget import PromptBudget, count_tokens
+
+
+def test_required_sources_are_kept_in_full():
+    """Reserved text is never cut, even when it uses the whole budget"""
+    question = "What did I save about the quarterly planning meeting? " * 5
+    budget = PromptBudget(10)
+    budget.reserve("query", question)
+    budget.add("memories", ["Memory about something else entirely"])
+    texts = budget.assemble()
+
+    assert texts["query"] == question
+    assert texts["memories"] == ""
+    assert budget.allocation["sources"]["query"]["strategy"] == "full"
+
+
+def test_relevance_selection_prefers_matching_chunks():
+    """With a tight budget, the chunks mentioning the query survive"""
+    memories = [
+        "Recipe for banana bread with walnuts and cinnamon " * 4,
+        "Python snippet for data processing with pandas",
+        "Notes from the gardening workshop about tomatoes " * 4,
+    ]
+    budget = PromptBudget(40, query="python data processing")
+    budget.add("memories", memories, select="relevance")
+    texts = budget.assemble()
+
+    assert "Python snippet" in texts["memories"]
+    assert "banana" not in texts["memories"]
+    info = budget.allocation["sources"]["memories"]
+    assert info["chunks_kept"] == 1
+    assert info["used"] <= info["allocated"] <= 40
+
+
+def test_priorities_and_even_split():
+    """Higher priority sources fill first; equal priorities share the remainder"""
+    budget = PromptBudget(300)
+    budget.add("dom_context", "element " * 1000, priority=1, max_tokens=100)
+    budget.add("transcript_a", "alpha " * 1000)
+    budget.add("transcript_b", "beta " * 1000)
+    budget.assemble()
+
+    sources = budget.allocation["sources"]
+    assert sources["dom_context"]["allocated"] == 100
+    assert sources["transcript_a"]["allocated"] == sources["transcript_b"]["allocated"] == 100
+    assert budget.allocation["used"] <= 300
+    for info in sources.values():
+        assert info["used"] <= info["allocated"]
+
+
+def test_head_truncation_fits_budget():
+    """A single long text is cut to its allocation"""
+    budget = PromptBudget(50)
+    budget.add("page_content", "word " * 2000)
+    text = budget.assemble()["page_content"]
+
+    assert text.endswith("...")
+    assert count_tokens(text) <= 50
+    assert budget.allocation["sources"]["page_content"]["strategy"] == "truncated"
+
+
+if __name__ == "__main__":
+    test_required_sources_are_kept_in_full()
+    test_relevance_selection_prefers_matching_chunks()
+    test_priorities_and_even_split()
+    test_head_truncation_fits_budget()
+    print("✅ Prompt budget tests passed")
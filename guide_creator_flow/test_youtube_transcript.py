@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from guide_creator_flow.tools.youtube_transcript import YouTubeTranscriptExtractor
+from guide_creator_flow.tools.transcript_index import chunk_segments, format_timestamp
 
 def test_youtube_transcript():
     """Test YouTube transcript extraction"""
@@ -44,5 +45,26 @@ def test_youtube_transcript():
         elif "No transcript found" in result['error']:
             print("\n💡 This video may not have captions available")
 
+def test_transcript_retrieval():
+    """Test that relevant passages are found anywhere in a long transcript (offline)"""
+    extractor = YouTubeTranscriptExtractor()
+    
+    # One hour of filler with a single relevant sentence near the end
+    segments = [{"text": f"intro chatter part {i}", "start": i * 6.0, "duration": 6.0} for i in range(600)]
+    segments[550]["text"] = "now we configure the ingress controller for the cluster"
+    chunks = chunk_segments(segments)
+    result = {"success": True, "video_id": "offline", "transcript": "", "chunks": chunks}
+    
+    passages, scores = extractor.relevant_passages(result, "How do I set up the ingress controller?")
+    best = max(range(len(scores)), key=lambda i: scores[i])
+    
+    assert len(chunks) > 1
+    assert "ingress controller" in passages[best]
+    assert passages[best].startswith(f"[{format_timestamp(chunks[best]['start'])}]")
+    assert format_timestamp(3300) == "55:00"
+    assert format_timestamp(3723) == "1:02:03"
+    print(f"✅ Best passage: {passages[best][:80]}")
+
 if __name__ == "__main__":
+    test_transcript_retrieval()
     test_youtube_transcript() 
\ No newline at end of file